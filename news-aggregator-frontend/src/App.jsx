@@ -25,8 +25,8 @@ function App() {
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000/api';
 
-  // Fetch articles
-  const fetchArticles = async () => {
+  // Fetch the first article page, trending keywords and category stats in one round trip
+  const fetchDashboard = async () => {
     try {
       setLoading(true)
       setError(null)
@@ -37,45 +37,21 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000
       if (filters.sentiment) params.append('sentiment', filters.sentiment)
       if (filters.source) params.append('source', filters.source)
       
-      const response = await fetch(`${API_BASE_URL}/articles?${params}`)
+      const response = await fetch(`${API_BASE_URL}/dashboard?${params}`)
       if (!response.ok) throw new Error('Failed to fetch articles')
       
       const data = await response.json()
-      setArticles(data.articles || [])
+      setArticles(data.articles?.articles || [])
+      setTrendingKeywords(data.trending_keywords || [])
+      setCategoryStats(data.category_distribution || [])
     } catch (err) {
       setError(err.message)
-      console.error('Error fetching articles:', err)
+      console.error('Error fetching dashboard:', err)
     } finally {
       setLoading(false)
     }
   }
 
-  // Fetch trending keywords
-  const fetchTrendingKeywords = async () => {
-    try {
-      const response = await fetch(`${API_BASE_URL}/ai/trending-keywords`)
-      if (response.ok) {
-        const data = await response.json()
-        setTrendingKeywords(data.trending_keywords || [])
-      }
-    } catch (err) {
-      console.error('Error fetching trending keywords:', err)
-    }
-  }
-
-  // Fetch category statistics
-  const fetchCategoryStats = async () => {
-    try {
-      const response = await fetch(`${API_BASE_URL}/ai/category-stats`)
-      if (response.ok) {
-        const data = await response.json()
-        setCategoryStats(data.category_distribution || [])
-      }
-    } catch (err) {
-      console.error('Error fetching category stats:', err)
-    }
-  }
-
   // Fetch sample news data
   const fetchSampleNews = async () => {
     try {
@@ -94,9 +70,7 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000
         })
         
         // Refresh the articles list
-        await fetchArticles()
-        await fetchTrendingKeywords()
-        await fetchCategoryStats()
+        await fetchDashboard()
       }
     } catch (err) {
       console.error('Error fetching sample news:', err)
@@ -107,9 +81,7 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000
   }
 
   useEffect(() => {
-    fetchArticles()
-    fetchTrendingKeywords()
-    fetchCategoryStats()
+    fetchDashboard()
   }, [filters])
 
   const handleSearch = (query) => {
@@ -130,9 +102,7 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000
   }
 
   const handleRefresh = () => {
-    fetchArticles()
-    fetchTrendingKeywords()
-    fetchCategoryStats()
+    fetchDashboard()
   }
 
   return (
@@ -9,29 +9,59 @@ from src.models.user import db
 from src.models.article import Article
 from src.models.user_interest import UserInterest
 from src.models.reading_history import ReadingHistory
+from src.models.news_source import NewsSource
+from src.models.notification import Notification
+from src.models.migrations import run_migrations
 from src.routes.user import user_bp
 from src.routes.articles import articles_bp
-from src.routes.news import news_bp
+from src.routes.news import news_bp, trending_service
 from src.routes.ai_analysis import ai_bp
+from src.routes.admin import admin_bp
+from src.routes.dashboard import dashboard_bp
+from src.services.reading_events import reading_event_buffer
+from src.services.embedding_index import semantic_index
+from src.services.category_learner import category_learner
+from src.services.source_registry import source_registry
+from src.services.facet_index import facet_index
+from src.services.interest_percolator import interest_percolator
+from src.services.retention import retention_service
+from src.services.backup import backup_service
+from src.services.admission import admission_controller
+from src.services.profiling import request_profiler
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
 # Enable CORS for all routes
 CORS(app)
+admission_controller.init_app(app)
+request_profiler.init_app(app)
 
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(articles_bp, url_prefix='/api')
 app.register_blueprint(news_bp, url_prefix='/api')
 app.register_blueprint(ai_bp, url_prefix='/api')
+app.register_blueprint(admin_bp, url_prefix='/api')
+app.register_blueprint(dashboard_bp, url_prefix='/api')
 
 # uncomment if you need to use database
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 with app.app_context():
+    run_migrations()
     db.create_all()
 
+retention_service.init_app(app)
+backup_service.init_app(app, {'archive': retention_service.archive_path})
+source_registry.init_app(app)
+reading_event_buffer.init_app(app)
+trending_service.init_app(app)
+semantic_index.init_app(app)
+category_learner.init_app(app)
+facet_index.init_app(app)
+interest_percolator.init_app(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
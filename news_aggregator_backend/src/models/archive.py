@@ -0,0 +1,36 @@
+from src.models.user import db
+from src.models.article import Article
+
+ARCHIVE_SCHEMA = 'archive'
+
+# Separate metadata: these live in the attached archive database and are
+# created by the retention service, not by db.create_all()
+archive_metadata = db.MetaData()
+
+
+def _archive_copy(table):
+    """``table`` in the archive schema, with its unique constraints turned into plain indexes.
+
+    An article fetched again after its first copy was archived is archived
+    as a separate row (same url, its own reading history), not a conflict.
+    """
+    archived = table.to_metadata(archive_metadata, schema=ARCHIVE_SCHEMA)
+    for constraint in [c for c in archived.constraints if isinstance(c, db.UniqueConstraint)]:
+        archived.constraints.discard(constraint)
+        for column in constraint.columns:
+            column.unique = False
+            db.Index(f'ix_{ARCHIVE_SCHEMA}_{table.name}_{column.name}', column)
+    return archived
+
+
+archived_articles = _archive_copy(Article.__table__)
+
+# Same columns as reading_history, without foreign keys into the main database
+archived_reading_history = db.Table(
+    'reading_history', archive_metadata,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('user_id', db.Integer, nullable=False, index=True),
+    db.Column('article_id', db.Integer, nullable=False, index=True),
+    db.Column('read_at', db.DateTime, nullable=False),
+    schema=ARCHIVE_SCHEMA
+)
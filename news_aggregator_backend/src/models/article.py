@@ -1,30 +1,49 @@
 from src.models.user import db
+from src.models.types import PublicId, CompressedText, compressed_property, new_public_id, is_public_id
 from datetime import datetime
-import uuid
+from flask import abort
 
 class Article(db.Model):
     __tablename__ = 'articles'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.Integer, primary_key=True)
+    public_id = db.Column(PublicId, nullable=False, unique=True, default=new_public_id)
     title = db.Column(db.Text, nullable=False)
     url = db.Column(db.Text, nullable=False, unique=True)
     source = db.Column(db.String(100), nullable=False)
     author = db.Column(db.String(100), nullable=True)
-    published_date = db.Column(db.DateTime, nullable=False)
-    content = db.Column(db.Text, nullable=False)
-    summary = db.Column(db.Text, nullable=True)
+    published_date = db.Column(db.DateTime, nullable=False, index=True)
+    content_data = db.Column('content', CompressedText, nullable=False)
+    summary_data = db.Column('summary', CompressedText, nullable=True)
     category = db.Column(db.String(50), nullable=True)
     sentiment = db.Column(db.String(20), nullable=True)
     is_fake = db.Column(db.Boolean, nullable=False, default=False)
     image_url = db.Column(db.Text, nullable=True)
+    view_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # Full-page enrichment state (see ContentEnricher)
+    enriched_at = db.Column(db.DateTime, nullable=True)
+    http_etag = db.Column(db.String(255), nullable=True)
+    http_last_modified = db.Column(db.String(64), nullable=True)
+
+    # Decompressed lazily on attribute access
+    content = compressed_property('content_data')
+    summary = compressed_property('summary_data')
+
     def __repr__(self):
         return f'<Article {self.title[:50]}...>'
 
+    @classmethod
+    def get_by_public_id_or_404(cls, public_id):
+        """Look up an article by the identifier exposed through the API"""
+        if not is_public_id(public_id):
+            abort(404)
+        return cls.query.filter_by(public_id=public_id).first_or_404()
+
     def to_dict(self):
         return {
-            'id': self.id,
+            'id': self.public_id,
             'title': self.title,
             'url': self.url,
             'source': self.source,
@@ -36,6 +55,7 @@ class Article(db.Model):
             'sentiment': self.sentiment,
             'is_fake': self.is_fake,
             'image_url': self.image_url,
+            'view_count': self.view_count or 0,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
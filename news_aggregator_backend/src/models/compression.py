@@ -0,0 +1,114 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional
+import os
+import re
+import zlib
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Values shorter than this are stored uncompressed; zlib overhead isn't worth it
+MIN_COMPRESS_BYTES = 96
+
+# First byte of every stored value says how the rest is encoded. Codecs
+# 0x10-0x1f are zlib streams primed with preset dictionary <codec - 0x10>.
+CODEC_PLAIN = 0x00
+CODEC_ZLIB_DICT_BASE = 0x10
+
+# Dictionaries are append-only: rows written with an id must stay readable,
+# so a retrained dictionary gets a new id rather than replacing a file.
+# news-v1 was built with train_dictionary() from the SampleNewsGenerator
+# corpus plus common wire-copy phrasing.
+DICTIONARY_DIR = os.path.join(os.path.dirname(__file__), 'dictionaries')
+DICTIONARY_FILES = {
+    1: 'news-v1.zdict',
+}
+CURRENT_DICTIONARY_ID = 1
+
+_dictionaries: Dict[int, bytes] = {}
+
+
+def _load_dictionary(dictionary_id: int) -> bytes:
+    zdict = _dictionaries.get(dictionary_id)
+    if zdict is None:
+        with open(os.path.join(DICTIONARY_DIR, DICTIONARY_FILES[dictionary_id]), 'rb') as f:
+            zdict = f.read()
+        _dictionaries[dictionary_id] = zdict
+    return zdict
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """Encode text for storage, compressing it with the shared dictionary when it pays off"""
+    if text is None:
+        return None
+
+    raw = text.encode('utf-8')
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        zdict = _load_dictionary(CURRENT_DICTIONARY_ID)
+        compressor = zlib.compressobj(level=6, zdict=zdict)
+        packed = compressor.compress(raw) + compressor.flush()
+        if len(packed) < len(raw):
+            return bytes([CODEC_ZLIB_DICT_BASE + CURRENT_DICTIONARY_ID]) + packed
+
+    return bytes([CODEC_PLAIN]) + raw
+
+
+def decompress_text(value) -> Optional[str]:
+    """Decode a stored value. Plain strings (rows written before compression) pass through"""
+    if value is None or isinstance(value, str):
+        return value
+
+    value = bytes(value)
+    if not value:
+        return ''
+
+    codec, payload = value[0], value[1:]
+    if codec == CODEC_PLAIN:
+        return payload.decode('utf-8')
+    if codec >= CODEC_ZLIB_DICT_BASE:
+        decompressor = zlib.decompressobj(zdict=_load_dictionary(codec - CODEC_ZLIB_DICT_BASE))
+        return (decompressor.decompress(payload) + decompressor.flush()).decode('utf-8')
+
+    raise ValueError(f'Unknown text codec {codec:#x}')
+
+
+def train_dictionary(texts: Iterable[str], size: int = 32 * 1024, max_ngram: int = 4) -> bytes:
+    """Build a zlib preset dictionary from a sample of article text.
+
+    Word n-grams are ranked by how many bytes they would save (frequency x
+    length) and packed so the most valuable ones sit at the end of the
+    dictionary, where zlib back-references are cheapest.
+    """
+    counts = Counter()
+    for text in texts:
+        words = re.findall(r"\S+", text or '')
+        for n in range(1, max_ngram + 1):
+            for i in range(len(words) - n + 1):
+                counts[' '.join(words[i:i + n])] += 1
+
+    ranked = sorted(
+        (gram for gram, count in counts.items() if count > 1),
+        key=lambda gram: counts[gram] * len(gram),
+        reverse=True
+    )
+
+    chosen = []
+    used = 0
+    for gram in ranked:
+        chunk = (gram + ' ').encode('utf-8')
+        if used + len(chunk) > size:
+            continue
+        # Skip grams already covered by a more valuable chosen one
+        if any(gram in existing for existing in chosen):
+            continue
+        chosen.append(gram)
+        used += len(chunk)
+
+    return ' '.join(reversed(chosen)).encode('utf-8')[-size:]
+
+
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """Expose unpack_text() to SQL so LIKE searches can see compressed columns"""
+    if hasattr(dbapi_connection, 'create_function'):
+        dbapi_connection.create_function('unpack_text', 1, decompress_text, deterministic=True)
@@ -0,0 +1,169 @@
+from src.models.user import db
+from src.models.article import Article
+from src.models.user_interest import UserInterest
+from src.models.reading_history import ReadingHistory
+from src.models.types import is_public_id, new_public_id
+from src.models.compression import compress_text
+import uuid
+
+BATCH_SIZE = 5000
+
+# PRAGMA user_version values recording one-off data migrations that are too
+# slow to re-check at every startup (each implies the ones before it)
+TEXT_COMPRESSED_VERSION = 1
+
+
+def run_migrations():
+    """Bring an existing SQLite database up to the current schema (idempotent)"""
+    with db.engine.begin() as conn:
+        _use_incremental_vacuum_if_new(conn)
+        _migrate_integer_surrogate_keys(conn)
+        _add_column(conn, 'articles', 'view_count', 'INTEGER NOT NULL DEFAULT 0')
+        _add_index(conn, 'articles', 'ix_articles_view_count', 'view_count')
+        _compress_article_text(conn)
+        _add_column(conn, 'articles', 'enriched_at', 'DATETIME')
+        _add_column(conn, 'articles', 'http_etag', 'VARCHAR(255)')
+        _add_column(conn, 'articles', 'http_last_modified', 'VARCHAR(64)')
+        _add_index(conn, 'articles', 'ix_articles_published_date', 'published_date')
+
+
+def _use_incremental_vacuum_if_new(conn):
+    """Create new databases in incremental auto-vacuum mode, so retention can free pages.
+
+    The mode can only be set before the first table exists; existing
+    databases are converted separately (a full VACUUM), see RetentionService.
+    """
+    if not conn.exec_driver_sql("SELECT count(*) FROM main.sqlite_master").scalar():
+        conn.exec_driver_sql('PRAGMA main.auto_vacuum = INCREMENTAL')
+
+
+def _table_columns(conn, table: str) -> dict:
+    """Return {column_name: declared_type} for a table, or {} if it doesn't exist"""
+    rows = conn.exec_driver_sql(f'PRAGMA table_info("{table}")').fetchall()
+    return {row[1]: (row[2] or '').upper() for row in rows}
+
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    """Add a column to an existing table if it's missing"""
+    columns = _table_columns(conn, table)
+    if columns and column not in columns:
+        conn.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {ddl}')
+
+
+def _add_index(conn, table: str, name: str, columns: str):
+    """Create an index on an existing table if it's missing"""
+    if _table_columns(conn, table):
+        conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+
+
+def _copy_rows(conn, select_sql: str, insert_sql: str, transform):
+    """Stream rows from a legacy table into its replacement in batches"""
+    result = conn.exec_driver_sql(select_sql)
+    while True:
+        rows = result.fetchmany(BATCH_SIZE)
+        if not rows:
+            break
+        batch = [transform(row) for row in rows]
+        batch = [row for row in batch if row is not None]
+        if batch:
+            conn.exec_driver_sql(insert_sql, batch)
+
+
+def _migrate_integer_surrogate_keys(conn):
+    """Replace UUID string primary keys with integer surrogate keys.
+
+    Articles keep their old UUID as the external ``public_id`` (stored as 16
+    bytes), and reading history is re-pointed at the new integer article ids.
+    """
+    article_columns = _table_columns(conn, 'articles')
+    if not article_columns or 'public_id' in article_columns:
+        return
+
+    print("Migrating articles, user_interests and reading_history to integer keys")
+
+    legacy_tables = ['articles', 'user_interests', 'reading_history']
+    existing = [t for t in legacy_tables if _table_columns(conn, t)]
+    for table in existing:
+        conn.exec_driver_sql(f'ALTER TABLE "{table}" RENAME TO "{table}_legacy"')
+    for model in (Article, UserInterest, ReadingHistory):
+        model.__table__.create(conn, checkfirst=True)
+
+    def article_row(row):
+        legacy_id = row[0]
+        public_id = legacy_id if is_public_id(legacy_id) else new_public_id()
+        return (uuid.UUID(public_id).bytes,) + tuple(row[1:])
+
+    # Oldest first, so integer ids follow insertion order
+    _copy_rows(
+        conn,
+        'SELECT id, title, url, source, author, published_date, content, summary, '
+        'category, sentiment, is_fake, image_url, created_at '
+        'FROM articles_legacy ORDER BY created_at, rowid',
+        'INSERT INTO articles (public_id, title, url, source, author, published_date, '
+        'content, summary, category, sentiment, is_fake, image_url, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        article_row
+    )
+
+    if 'user_interests' in existing:
+        _copy_rows(
+            conn,
+            'SELECT user_id, keyword, category, source, created_at '
+            'FROM user_interests_legacy ORDER BY created_at, rowid',
+            'INSERT INTO user_interests (user_id, keyword, category, source, created_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            tuple
+        )
+
+    if 'reading_history' in existing:
+        # Resolve legacy string article ids through the preserved public ids
+        id_map = {}
+        for new_id, public_id in conn.exec_driver_sql('SELECT id, public_id FROM articles'):
+            id_map[str(uuid.UUID(bytes=public_id))] = new_id
+
+        def history_row(row):
+            article_id = id_map.get(row[1])
+            if article_id is None:
+                return None
+            return (row[0], article_id, row[2])
+
+        _copy_rows(
+            conn,
+            'SELECT user_id, article_id, read_at FROM reading_history_legacy ORDER BY read_at, rowid',
+            'INSERT INTO reading_history (user_id, article_id, read_at) VALUES (?, ?, ?)',
+            history_row
+        )
+
+    for table in reversed(existing):
+        conn.exec_driver_sql(f'DROP TABLE "{table}_legacy"')
+
+
+def _compress_article_text(conn):
+    """Rewrite content/summary values stored as plain TEXT into the compressed encoding.
+
+    Checking needs a full scan of articles, so completion is recorded in
+    PRAGMA user_version and later startups skip it. New databases are
+    marked straight away: the model only ever writes compressed values.
+    """
+    if conn.exec_driver_sql('PRAGMA main.user_version').scalar() >= TEXT_COMPRESSED_VERSION:
+        return
+    if not _table_columns(conn, 'articles'):
+        conn.exec_driver_sql(f'PRAGMA main.user_version = {TEXT_COMPRESSED_VERSION}')
+        return
+
+    def encode(value):
+        return compress_text(value) if isinstance(value, str) else value
+
+    while True:
+        rows = conn.exec_driver_sql(
+            "SELECT id, content, summary FROM articles "
+            "WHERE typeof(content) = 'text' OR typeof(summary) = 'text' LIMIT ?",
+            (BATCH_SIZE,)
+        ).fetchall()
+        if not rows:
+            break
+        conn.exec_driver_sql(
+            'UPDATE articles SET content = ?, summary = ? WHERE id = ?',
+            [(encode(content), encode(summary), id) for id, content, summary in rows]
+        )
+    conn.exec_driver_sql(f'PRAGMA main.user_version = {TEXT_COMPRESSED_VERSION}')
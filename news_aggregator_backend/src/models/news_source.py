@@ -0,0 +1,28 @@
+from src.models.user import db
+from datetime import datetime
+
+class NewsSource(db.Model):
+    __tablename__ = 'news_sources'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Normalized name (see source_registry.normalize_source_key)
+    key = db.Column(db.String(100), nullable=False, unique=True)
+    name = db.Column(db.String(100), nullable=False)
+    # Comma-separated normalized alternative names
+    aliases = db.Column(db.Text, nullable=True)
+    reliability_prior = db.Column(db.Float, nullable=False, default=0.5)
+
+    # Aggregates over stored articles, maintained by SourceRegistry
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    fake_count = db.Column(db.Integer, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+    neutral_count = db.Column(db.Integer, nullable=False, default=0)
+    stats_updated_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NewsSource {self.key}>'
+
+    def alias_list(self):
+        return [alias for alias in (self.aliases or '').split(',') if alias]
@@ -0,0 +1,33 @@
+from src.models.user import db
+from datetime import datetime
+
+class Notification(db.Model):
+    __tablename__ = 'notifications'
+    # One notification per article per user, however many interests it matched
+    __table_args__ = (db.UniqueConstraint('user_id', 'article_id', name='uq_notifications_user_article'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    article_id = db.Column(db.Integer, db.ForeignKey('articles.id'), nullable=False, index=True)
+    # The matching interest; kept as plain values so deleting the interest leaves the notification
+    interest_id = db.Column(db.Integer, nullable=True)
+    keyword = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime, nullable=True)
+
+    article = db.relationship('Article')
+
+    def __repr__(self):
+        return f'<Notification User:{self.user_id} Article:{self.article_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'article_id': self.article.public_id if self.article else None,
+            'title': self.article.title if self.article else None,
+            'interest_id': self.interest_id,
+            'keyword': self.keyword,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'read_at': self.read_at.isoformat() if self.read_at else None
+        }
@@ -0,0 +1,92 @@
+from src.models.user import db
+from src.models.compression import compress_text, decompress_text
+import os
+import time
+import uuid
+
+
+def new_public_id() -> str:
+    """Generate a time-ordered UUIDv7 string for use as an external identifier"""
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+
+    value = (unix_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76                          # version 7
+    value |= ((rand >> 62) & 0xFFF) << 64       # rand_a
+    value |= 0x2 << 62                          # RFC 4122 variant
+    value |= rand & ((1 << 62) - 1)             # rand_b
+
+    return str(uuid.UUID(int=value))
+
+
+def is_public_id(value) -> bool:
+    """Check whether a value can be stored in a PublicId column"""
+    try:
+        uuid.UUID(str(value))
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+class PublicId(db.TypeDecorator):
+    """UUID exposed as a string but stored as a compact 16-byte blob"""
+
+    impl = db.LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return value
+        return uuid.UUID(str(value)).bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Rows written before the 16-byte encoding was introduced
+            return value
+        return str(uuid.UUID(bytes=value))
+
+
+class CompressedText(db.TypeDecorator):
+    """Text stored as a compressed blob (see src.models.compression).
+
+    Strings are compressed on the way in. Loaded values are returned as the
+    raw stored bytes and only decompressed when the mapped attribute is read
+    (see ``compressed_property``), so list queries don't pay for bodies they
+    never touch.
+    """
+
+    impl = db.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return compress_text(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return value
+
+
+def compressed_property(column_attr: str):
+    """Instance-level str view of a CompressedText column, decompressed on first access"""
+    cache_attr = f'_{column_attr}_cache'
+
+    def getter(self):
+        stored = getattr(self, column_attr)
+        if stored is None or isinstance(stored, str):
+            return stored
+        cached = self.__dict__.get(cache_attr)
+        if cached is not None and cached[0] is stored:
+            return cached[1]
+        text = decompress_text(stored)
+        self.__dict__[cache_attr] = (stored, text)
+        return text
+
+    def setter(self, value):
+        setattr(self, column_attr, value)
+
+    return db.synonym(column_attr, descriptor=property(getter, setter))
@@ -1,12 +1,11 @@
 from src.models.user import db
 from datetime import datetime
-import uuid
 
 class UserInterest(db.Model):
     __tablename__ = 'user_interests'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     keyword = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50), nullable=True)
     source = db.Column(db.String(100), nullable=True)
@@ -0,0 +1,131 @@
+from flask import Blueprint, Response, jsonify, request
+from src.services.profiling import admin_required, memory_tracker, request_profiler
+from src.services.retention import retention_service
+from src.services.backup import backup_service
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """List stored per-request profiles, newest first"""
+    return jsonify({'profiles': request_profiler.list_profiles()})
+
+@admin_bp.route('/admin/profiles/<string:profile_id>', methods=['GET'])
+@admin_required
+def get_profile(profile_id):
+    """Get a stored profile as a pstats text report (?sort=cumulative|tottime|calls)"""
+    report = request_profiler.report(profile_id, request.args.get('sort', 'cumulative'))
+    if report is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(report, mimetype='text/plain')
+
+@admin_bp.route('/admin/memory', methods=['GET'])
+@admin_required
+def get_memory_status():
+    """Get tracemalloc state and the snapshots held for diffing"""
+    return jsonify(memory_tracker.status())
+
+@admin_bp.route('/admin/memory/start', methods=['POST'])
+@admin_required
+def start_memory_tracing():
+    """Start tracemalloc (tracing slows allocation-heavy code down while it runs)"""
+    data = request.json or {}
+    return jsonify(memory_tracker.start(data.get('frames')))
+
+@admin_bp.route('/admin/memory/stop', methods=['POST'])
+@admin_required
+def stop_memory_tracing():
+    """Stop tracemalloc and drop the stored snapshots"""
+    return jsonify(memory_tracker.stop())
+
+@admin_bp.route('/admin/memory/snapshot', methods=['POST'])
+@admin_required
+def take_memory_snapshot():
+    """Take a snapshot; returns its id and the largest allocation sites"""
+    data = request.json or {}
+    
+    try:
+        return jsonify(memory_tracker.snapshot(
+            scope=data.get('scope', 'all'),
+            limit=min(int(data.get('limit', 25)), 200)
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@admin_bp.route('/admin/memory/diff', methods=['GET'])
+@admin_required
+def diff_memory_snapshots():
+    """Diff two snapshots (default: the last two), largest growth first
+
+    ?scope=analyzer|sqlalchemy|all narrows to allocations made from the
+    NewsAIAnalyzer or SQLAlchemy session code paths.
+    """
+    try:
+        return jsonify(memory_tracker.diff(
+            request.args.get('from'),
+            request.args.get('to'),
+            scope=request.args.get('scope', 'all'),
+            group_by=request.args.get('group_by', 'lineno'),
+            limit=min(int(request.args.get('limit', 25)), 200)
+        ))
+    except KeyError as e:
+        return jsonify({'error': str(e.args[0])}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@admin_bp.route('/admin/retention', methods=['GET'])
+@admin_required
+def get_retention_status():
+    """Get the retention policy, live/eligible/archived counts and the last archiving pass"""
+    return jsonify(retention_service.status())
+
+@admin_bp.route('/admin/retention/run', methods=['POST'])
+@admin_required
+def run_retention():
+    """Archive expired articles now (optionally at most max_batches batches)"""
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    
+    max_batches = data.get('max_batches')
+    # bool is an int subclass; true would otherwise mean one batch
+    if max_batches is not None and (
+        isinstance(max_batches, bool) or not isinstance(max_batches, int) or max_batches < 1
+    ):
+        return jsonify({'error': 'max_batches must be a positive integer'}), 400
+    
+    try:
+        return jsonify(retention_service.run(max_batches))
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': f'Archiving failed: {str(e)}'}), 500
+
+@admin_bp.route('/admin/retention/incremental-vacuum', methods=['POST'])
+@admin_required
+def convert_to_incremental_vacuum():
+    """One-time switch to incremental auto-vacuum (a full VACUUM that blocks writers while it runs)"""
+    try:
+        return jsonify(retention_service.convert_to_incremental_vacuum())
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
+
+@admin_bp.route('/admin/backups', methods=['GET'])
+@admin_required
+def list_backups():
+    """List database snapshots, newest first, and the last backup run"""
+    return jsonify({'snapshots': backup_service.list_snapshots(), 'last_run': backup_service.last_run})
+
+@admin_bp.route('/admin/backups', methods=['POST'])
+@admin_required
+def create_backup():
+    """Snapshot the databases now (restores go through the command line, with the app stopped)"""
+    try:
+        return jsonify(backup_service.create()), 201
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': f'Backup failed: {str(e)}'}), 500
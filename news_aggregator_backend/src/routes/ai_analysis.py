@@ -1,12 +1,48 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from src.services.ai_analyzer import NewsAIAnalyzer
+from src.services.category_learner import category_learner
+from src.services.micro_batcher import MicroBatcher
+from src.services.article_stats import article_stats
 from src.models.article import Article, db
+from src.services.article_events import article_events, ARTICLE_ANALYZED
+from src.services.admission import admission_controller, cost_class
 from datetime import datetime
+import json
+import os
+import queue
 
 ai_bp = Blueprint('ai', __name__)
 ai_analyzer = NewsAIAnalyzer()
 
+# Limits for /ai/analyze-batch
+MAX_BATCH_ITEMS = 1000
+MAX_BATCH_BYTES = 5 * 1024 * 1024
+BATCH_CHUNK_SIZE = 50
+
+ITEM_FIELDS = ('title', 'content', 'source')
+
+def _analyze_articles(items):
+    """Analysis per title/content/source item, or a RuntimeError for an item that failed"""
+    articles = ai_analyzer.batch_analyze_articles(
+        [{field: item[field] for field in ITEM_FIELDS} for item in items], defaults_on_error=False
+    )
+    return [
+        RuntimeError(article['error']) if 'error' in article
+        else {key: value for key, value in article.items() if key not in ITEM_FIELDS}
+        for article in articles
+    ]
+
+# Concurrent single-item calls are coalesced into batched analyzer calls.
+# Fake news detection stays direct: it's cheaper than the hand-off to a batch worker.
+AI_BATCH_MAX_SIZE = int(os.getenv('AI_BATCH_MAX_SIZE', 32))
+AI_BATCH_MAX_WAIT = float(os.getenv('AI_BATCH_MAX_WAIT_MS', 5)) / 1000
+sentiment_batcher = MicroBatcher(ai_analyzer.analyze_sentiment_batch, AI_BATCH_MAX_SIZE, AI_BATCH_MAX_WAIT,
+                                 name='ai-sentiment-batcher')
+article_batcher = MicroBatcher(_analyze_articles, AI_BATCH_MAX_SIZE, AI_BATCH_MAX_WAIT,
+                               name='ai-article-batcher')
+
 @ai_bp.route('/ai/analyze-article', methods=['POST'])
+@cost_class('compute')
 def analyze_single_article():
     """Analyze a single article with AI"""
     data = request.json
@@ -15,21 +51,102 @@ def analyze_single_article():
         return jsonify({'error': 'Missing required fields: title, content, source'}), 400
     
     try:
-        analysis = ai_analyzer.analyze_article(
-            title=data['title'],
-            content=data['content'],
-            source=data['source']
-        )
+        analysis = article_batcher({
+            'title': data['title'],
+            'content': data['content'],
+            'source': data['source']
+        })
         
         return jsonify({
             'message': 'Article analyzed successfully',
             'analysis': analysis
         }), 200
         
+    except queue.Full:
+        return jsonify({'error': 'Analyzer is overloaded, try again shortly'}), 503
     except Exception as e:
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@ai_bp.route('/ai/analyze-batch', methods=['POST'])
+@cost_class('heavy')
+def analyze_batch():
+    """Analyze many title/content/source items, streaming NDJSON results as each chunk completes"""
+    if request.content_length is not None and request.content_length > MAX_BATCH_BYTES:
+        return jsonify({'error': f'Request body must be at most {MAX_BATCH_BYTES} bytes'}), 413
+    
+    # Chunked uploads have no Content-Length; read one byte past the limit to catch them
+    body = request.stream.read(MAX_BATCH_BYTES + 1)
+    if len(body) > MAX_BATCH_BYTES:
+        return jsonify({'error': f'Request body must be at most {MAX_BATCH_BYTES} bytes'}), 413
+    
+    try:
+        items = _parse_batch_items(body)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'At most {MAX_BATCH_ITEMS} items per batch'}), 413
+    
+    def generate():
+        errors = 0
+        for start in range(0, len(items), BATCH_CHUNK_SIZE):
+            chunk = list(enumerate(items[start:start + BATCH_CHUNK_SIZE], start=start))
+            valid = [(index, item) for index, item in chunk if not isinstance(item, ValueError)]
+            results = dict(zip(
+                [index for index, _ in valid],
+                _analyze_articles([item for _, item in valid])
+            ))
+            
+            lines = []
+            for index, item in chunk:
+                result = item if isinstance(item, ValueError) else results[index]
+                if isinstance(result, Exception):
+                    errors += 1
+                    lines.append(json.dumps({'index': index, 'error': str(result)}))
+                else:
+                    lines.append(json.dumps({'index': index, 'analysis': result}))
+            yield '\n'.join(lines) + '\n'
+        
+        yield json.dumps({'done': True, 'count': len(items), 'errors': errors}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _parse_batch_items(body):
+    """Parse a JSON array ({"items": [...]} also works) or NDJSON body.
+
+    Items that can't be analyzed are replaced by a ValueError so they are
+    reported in place without failing the batch.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        raw_items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                raw_items.append(json.loads(line))
+            except ValueError:
+                raw_items.append(ValueError('Invalid JSON line'))
+    else:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise ValueError('Body must be a JSON array or NDJSON')
+        raw_items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(raw_items, list):
+            raise ValueError('Body must be a JSON array of items')
+    
+    items = []
+    for item in raw_items:
+        if isinstance(item, ValueError):
+            items.append(item)
+        elif not isinstance(item, dict) or not all(isinstance(item.get(key), str) for key in ('title', 'content', 'source')):
+            items.append(ValueError('Missing required fields: title, content, source'))
+        else:
+            items.append(item)
+    return items
+
 @ai_bp.route('/ai/analyze-stored-articles', methods=['POST'])
+@cost_class('heavy')
 def analyze_stored_articles():
     """Analyze all stored articles that haven't been analyzed yet"""
     try:
@@ -45,13 +162,22 @@ def analyze_stored_articles():
             }), 200
         
         analyzed_count = 0
+        analyzed_articles = []
+        sentiments = ai_analyzer.analyze_sentiment_batch([
+            f"{article.title} {article.content}" for article in unanalyzed_articles
+        ])
+        categories = ai_analyzer.classify_categories([
+            (article.title, article.content) for article in unanalyzed_articles
+        ])
         
-        for article in unanalyzed_articles:
+        for article, sentiment_data, category in zip(unanalyzed_articles, sentiments, categories):
             try:
                 analysis = ai_analyzer.analyze_article(
                     title=article.title,
                     content=article.content,
-                    source=article.source
+                    source=article.source,
+                    sentiment_data=sentiment_data,
+                    category=category
                 )
                 
                 # Update article with analysis results
@@ -61,6 +187,7 @@ def analyze_stored_articles():
                 article.summary = analysis['summary']
                 
                 analyzed_count += 1
+                analyzed_articles.append(article)
                 
             except Exception as e:
                 print(f"Error analyzing article {article.id}: {e}")
@@ -68,6 +195,7 @@ def analyze_stored_articles():
         
         # Commit all changes
         db.session.commit()
+        article_events.publish(ARTICLE_ANALYZED, analyzed_articles)
         
         return jsonify({
             'message': f'Successfully analyzed {analyzed_count} articles',
@@ -80,10 +208,11 @@ def analyze_stored_articles():
         return jsonify({'error': f'Batch analysis failed: {str(e)}'}), 500
 
 @ai_bp.route('/ai/analyze-article/<string:article_id>', methods=['POST'])
+@cost_class('compute')
 def analyze_article_by_id(article_id):
     """Analyze a specific stored article by ID"""
     try:
-        article = Article.query.get_or_404(article_id)
+        article = Article.get_by_public_id_or_404(article_id)
         
         analysis = ai_analyzer.analyze_article(
             title=article.title,
@@ -98,6 +227,7 @@ def analyze_article_by_id(article_id):
         article.summary = analysis['summary']
         
         db.session.commit()
+        article_events.publish(ARTICLE_ANALYZED, [article])
         
         return jsonify({
             'message': 'Article analyzed and updated successfully',
@@ -110,6 +240,7 @@ def analyze_article_by_id(article_id):
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
 @ai_bp.route('/ai/sentiment-analysis', methods=['POST'])
+@cost_class('compute')
 def sentiment_analysis():
     """Perform sentiment analysis on provided text"""
     data = request.json
@@ -118,17 +249,20 @@ def sentiment_analysis():
         return jsonify({'error': 'Missing required field: text'}), 400
     
     try:
-        sentiment_data = ai_analyzer.analyze_sentiment(data['text'])
+        sentiment_data = sentiment_batcher(data['text'])
         
         return jsonify({
             'message': 'Sentiment analysis completed',
             'sentiment': sentiment_data
         }), 200
         
+    except queue.Full:
+        return jsonify({'error': 'Analyzer is overloaded, try again shortly'}), 503
     except Exception as e:
         return jsonify({'error': f'Sentiment analysis failed: {str(e)}'}), 500
 
 @ai_bp.route('/ai/summarize', methods=['POST'])
+@cost_class('compute')
 def summarize_text():
     """Summarize provided text"""
     data = request.json
@@ -152,6 +286,7 @@ def summarize_text():
         return jsonify({'error': f'Summarization failed: {str(e)}'}), 500
 
 @ai_bp.route('/ai/detect-fake-news', methods=['POST'])
+@cost_class('compute')
 def detect_fake_news():
     """Detect if news content might be fake"""
     data = request.json
@@ -178,81 +313,53 @@ def detect_fake_news():
 def get_trending_keywords():
     """Get trending keywords from recent articles"""
     try:
-        # Get recent articles (last 7 days)
-        from datetime import datetime, timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        
-        recent_articles = Article.query.filter(
-            Article.created_at >= week_ago
-        ).all()
+        # Cached until the next article change (shared with /api/dashboard); after one, the previous
+        # keywords are served while they are recomputed in the background
+        trending = article_stats.trending_keywords(ai_analyzer, app=current_app._get_current_object())
         
-        if not recent_articles:
+        if not trending['articles_analyzed']:
             return jsonify({
                 'message': 'No recent articles found',
                 'trending_keywords': []
             }), 200
         
-        # Convert to dict format for analyzer
-        articles_data = [
-            {
-                'title': article.title,
-                'content': article.content
-            }
-            for article in recent_articles
-        ]
-        
-        trending_keywords = ai_analyzer.get_trending_keywords(articles_data)
-        
         return jsonify({
-            'message': f'Found trending keywords from {len(recent_articles)} recent articles',
-            'trending_keywords': [
-                {'keyword': keyword, 'frequency': freq}
-                for keyword, freq in trending_keywords
-            ],
-            'articles_analyzed': len(recent_articles)
+            'message': f"Found trending keywords from {trending['articles_analyzed']} recent articles",
+            **trending
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Trending keywords analysis failed: {str(e)}'}), 500
 
+@ai_bp.route('/ai/batching-stats', methods=['GET'])
+def get_batching_stats():
+    """Get micro-batching counters (batches run, average batch size) per endpoint"""
+    return jsonify({
+        'sentiment_analysis': sentiment_batcher.get_stats(),
+        'analyze_article': article_batcher.get_stats()
+    })
+
+@ai_bp.route('/ai/admission-stats', methods=['GET'])
+def get_admission_stats():
+    """Get admission control counters and in-flight requests per cost class"""
+    return jsonify(admission_controller.get_stats())
+
+@ai_bp.route('/ai/category-model', methods=['GET'])
+def get_category_model_status():
+    """Get the state of the category classifier learned from editorial corrections"""
+    return jsonify(category_learner.status())
+
 @ai_bp.route('/ai/category-stats', methods=['GET'])
 def get_category_statistics():
     """Get statistics about article categories"""
     try:
-        # Get category distribution
-        category_stats = db.session.query(
-            Article.category,
-            db.func.count(Article.id).label('count')
-        ).filter(
-            Article.category.isnot(None)
-        ).group_by(Article.category).all()
-        
-        # Get sentiment distribution
-        sentiment_stats = db.session.query(
-            Article.sentiment,
-            db.func.count(Article.id).label('count')
-        ).filter(
-            Article.sentiment.isnot(None)
-        ).group_by(Article.sentiment).all()
-        
-        # Get fake news statistics
-        fake_news_count = Article.query.filter(Article.is_fake == True).count()
-        total_articles = Article.query.count()
+        # Category, sentiment and fake news counts come from one cached GROUP BY
+        distributions = article_stats.distributions()
         
         return jsonify({
-            'category_distribution': [
-                {'category': cat, 'count': count}
-                for cat, count in category_stats
-            ],
-            'sentiment_distribution': [
-                {'sentiment': sent, 'count': count}
-                for sent, count in sentiment_stats
-            ],
-            'fake_news_stats': {
-                'fake_count': fake_news_count,
-                'total_articles': total_articles,
-                'fake_percentage': (fake_news_count / total_articles * 100) if total_articles > 0 else 0
-            }
+            'category_distribution': distributions['category_distribution'],
+            'sentiment_distribution': distributions['sentiment_distribution'],
+            'fake_news_stats': distributions['fake_news_stats']
         }), 200
         
     except Exception as e:
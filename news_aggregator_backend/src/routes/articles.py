@@ -1,49 +1,126 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from src.models.article import Article, db
+from src.models.reading_history import ReadingHistory
+from src.services.article_events import article_events, ARTICLE_CREATED, ARTICLE_UPDATED, ARTICLE_DELETED
+from src.services.embedding_index import semantic_index
+from src.services.category_learner import category_learner
+from src.services.admission import cost_class
+from src.services.facet_index import FACETS, facet_index, parse_day
+from src.services.hot_articles import HOT_FILTERS, hot_articles
+from src.services.retention import retention_service
+from src.models.types import is_public_id
+from sqlalchemy.orm import load_only
 from datetime import datetime
+import json
+import math
+import time
 
 articles_bp = Blueprint('articles', __name__)
 
+# Fields bulk-update may set, and the columns they write (summary is stored compressed)
+BULK_UPDATE_COLUMNS = {
+    'category': Article.category,
+    'sentiment': Article.sentiment,
+    'is_fake': Article.is_fake,
+    'summary': Article.summary_data
+}
+BULK_FILTER_FIELDS = ('category', 'source', 'sentiment', 'search')
+BULK_MAX_IDS = 10000
+
+SSE_RETRY_MS = 3000
+SSE_HEARTBEAT_SECONDS = 15
+
 @articles_bp.route('/articles', methods=['GET'])
 def get_articles():
     """Get all articles with optional filtering"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    category = request.args.get('category')
-    source = request.args.get('source')
-    sentiment = request.args.get('sentiment')
-    search = request.args.get('search')
+    return Response(article_page_json(request.args), mimetype='application/json')
+
+def article_page_json(args):
+    """``article_page`` as JSON bytes, served from the in-memory hot set when it covers the page"""
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', 20, type=int)
+    filters = {field: args.get(field) for field in HOT_FILTERS if args.get(field)}
     
-    query = Article.query
+    fast_path = not args.get('search') and not include_archived(args)
+    if fast_path and page >= 1 and per_page >= 1 and facet_index.ready():
+        items = hot_articles.page(filters, page, per_page)
+        if items is not None:
+            total = facet_index.total({field: [value] for field, value in filters.items()})
+            meta = current_app.json.dumps({
+                'total': total,
+                'pages': math.ceil(total / per_page) if total else 0,
+                'current_page': page,
+                'per_page': per_page
+            })
+            # 'articles' sorts first, as jsonify would put it
+            return b'{"articles":[' + b','.join(items) + b'],' + meta[1:].lstrip().encode()
     
-    # Apply filters
-    if category:
-        query = query.filter(Article.category == category)
-    if source:
-        query = query.filter(Article.source == source)
-    if sentiment:
-        query = query.filter(Article.sentiment == sentiment)
-    if search:
-        query = query.filter(Article.title.contains(search) | Article.content.contains(search))
+    return current_app.json.dumps(article_page(args)).encode()
+
+def article_page(args):
+    """One page of articles matching the category/source/sentiment/search filters in ``args``
+
+    ``include_archived=true`` pages over archived articles too, each
+    flagged with ``archived``.
+    """
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', 20, type=int)
+    
+    if include_archived(args):
+        entity, archived = retention_service.articles_with_archived()
+        query = db.session.query(entity, archived)
+    else:
+        entity = Article
+        query = Article.query
+    query = apply_article_filters(query, args, entity)
     
-    # Order by published date (newest first)
-    query = query.order_by(Article.published_date.desc())
+    # Order by published date (newest first), by id within the same date
+    query = query.order_by(entity.published_date.desc(), entity.id.desc())
     
     # Paginate results
     articles = query.paginate(page=page, per_page=per_page, error_out=False)
     
-    return jsonify({
-        'articles': [article.to_dict() for article in articles.items],
+    if entity is Article:
+        items = [article.to_dict() for article in articles.items]
+    else:
+        items = [{**article.to_dict(), 'archived': bool(archived)} for article, archived in articles.items]
+    
+    return {
+        'articles': items,
         'total': articles.total,
         'pages': articles.pages,
         'current_page': page,
         'per_page': per_page
-    })
+    }
+
+def include_archived(args):
+    return args.get('include_archived', '').lower() in ('1', 'true', 'yes') and retention_service.attached
+
+def apply_article_filters(query, args, entity=Article):
+    """Narrow an Article query (or one over an Article alias ``entity``) by the filters in ``args``"""
+    category = args.get('category')
+    source = args.get('source')
+    sentiment = args.get('sentiment')
+    search = args.get('search')
+    
+    if category:
+        query = query.filter(entity.category == category)
+    if source:
+        query = query.filter(entity.source == source)
+    if sentiment:
+        query = query.filter(entity.sentiment == sentiment)
+    if search:
+        # Bodies are stored compressed; unpack_text() is registered on every SQLite connection
+        query = query.filter(
+            entity.title.contains(search) |
+            db.func.unpack_text(entity.content_data, type_=db.Text).contains(search)
+        )
+    return query
 
 @articles_bp.route('/articles/<string:article_id>', methods=['GET'])
 def get_article(article_id):
     """Get a specific article by ID"""
-    article = Article.query.get_or_404(article_id)
+    article = Article.get_by_public_id_or_404(article_id)
     return jsonify(article.to_dict())
 
 @articles_bp.route('/articles', methods=['POST'])
@@ -76,6 +153,7 @@ def create_article():
     try:
         db.session.add(article)
         db.session.commit()
+        article_events.publish(ARTICLE_CREATED, [article])
         return jsonify(article.to_dict()), 201
     except Exception as e:
         db.session.rollback()
@@ -84,7 +162,7 @@ def create_article():
 @articles_bp.route('/articles/<string:article_id>', methods=['PUT'])
 def update_article(article_id):
     """Update an existing article"""
-    article = Article.query.get_or_404(article_id)
+    article = Article.get_by_public_id_or_404(article_id)
     data = request.json
     
     # Update fields if provided
@@ -93,6 +171,9 @@ def update_article(article_id):
     if 'summary' in data:
         article.summary = data['summary']
     if 'category' in data:
+        # An editor changing the category is a labelled example for the classifier
+        if data['category'] and data['category'] != article.category:
+            category_learner.record_correction(article.title, article.content, data['category'])
         article.category = data['category']
     if 'sentiment' in data:
         article.sentiment = data['sentiment']
@@ -100,16 +181,263 @@ def update_article(article_id):
         article.is_fake = data['is_fake']
     
     db.session.commit()
+    article_events.publish(ARTICLE_UPDATED, [article])
     return jsonify(article.to_dict())
 
 @articles_bp.route('/articles/<string:article_id>', methods=['DELETE'])
 def delete_article(article_id):
     """Delete an article"""
-    article = Article.query.get_or_404(article_id)
+    article = Article.get_by_public_id_or_404(article_id)
+    ReadingHistory.query.filter_by(article_id=article.id).delete()
     db.session.delete(article)
     db.session.commit()
+    article_events.publish(ARTICLE_DELETED, [article])
     return '', 204
 
+@articles_bp.route('/articles/bulk-update', methods=['POST'])
+@cost_class('heavy')
+def bulk_update_articles():
+    """Set category/sentiment/is_fake/summary on every article selected by ids or filter, in one transaction"""
+    data = request.json or {}
+    changes = data.get('set') or {}
+    
+    unknown = set(changes) - set(BULK_UPDATE_COLUMNS)
+    if not changes or unknown:
+        return jsonify({'error': f"'set' must contain only: {', '.join(BULK_UPDATE_COLUMNS)}"}), 400
+    if 'is_fake' in changes and not isinstance(changes['is_fake'], bool):
+        return jsonify({'error': 'is_fake must be true or false'}), 400
+    for field in ('category', 'sentiment', 'summary'):
+        if field in changes and changes[field] is not None and not isinstance(changes[field], str):
+            return jsonify({'error': f'{field} must be a string or null'}), 400
+    
+    try:
+        article_ids = _bulk_target_ids(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        old_categories = {}
+        if 'category' in changes:
+            for ids in _chunks(article_ids):
+                old_categories.update(db.session.query(Article.id, Article.category).filter(Article.id.in_(ids)))
+        
+        values = {BULK_UPDATE_COLUMNS[field]: value for field, value in changes.items()}
+        updated = 0
+        for ids in _chunks(article_ids):
+            updated += Article.query.filter(Article.id.in_(ids)).update(values, synchronize_session=False)
+        db.session.commit()
+        
+        # Reload so event listeners (stream, feed index, stats) see the committed values
+        articles = []
+        for ids in _chunks(article_ids):
+            articles.extend(Article.query.filter(Article.id.in_(ids)))
+        
+        new_category = changes.get('category')
+        if new_category and 'ids' in data:
+            # Same as a single PUT: editorial re-categorization of hand-picked articles trains
+            # the classifier. A filter match is a blanket relabel, not per-article judgement.
+            for article in articles:
+                if old_categories.get(article.id) != new_category:
+                    category_learner.record_correction(article.title, article.content, new_category)
+        
+        article_events.publish(ARTICLE_UPDATED, articles)
+        return jsonify({'matched': len(article_ids), 'updated': updated})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Bulk update failed: {str(e)}'}), 500
+
+@articles_bp.route('/articles/bulk-delete', methods=['POST'])
+@cost_class('heavy')
+def bulk_delete_articles():
+    """Delete every article selected by ids or filter (with its reading history) in one transaction"""
+    data = request.json or {}
+    
+    try:
+        article_ids = _bulk_target_ids(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        # Only what the delete listeners read (id, public_id, source)
+        articles = []
+        for ids in _chunks(article_ids):
+            articles.extend(Article.query.options(
+                load_only(Article.id, Article.public_id, Article.source)
+            ).filter(Article.id.in_(ids)))
+        # Detached objects aren't expired by the commit, so listeners can still read them
+        for article in articles:
+            db.session.expunge(article)
+        
+        deleted = 0
+        for ids in _chunks(article_ids):
+            ReadingHistory.query.filter(ReadingHistory.article_id.in_(ids)).delete(synchronize_session=False)
+            deleted += Article.query.filter(Article.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        
+        article_events.publish(ARTICLE_DELETED, articles)
+        return jsonify({'matched': len(article_ids), 'deleted': deleted})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Bulk delete failed: {str(e)}'}), 500
+
+def _bulk_target_ids(data):
+    """Integer ids selected by a bulk request's "ids" (public ids) or "filter" (as in GET /articles)"""
+    if ('ids' in data) == ('filter' in data):
+        raise ValueError('Provide exactly one of "ids" or "filter"')
+    
+    if 'ids' in data:
+        if not isinstance(data['ids'], list) or len(data['ids']) > BULK_MAX_IDS:
+            raise ValueError(f'"ids" must be a list of at most {BULK_MAX_IDS} article ids')
+        public_ids = [i for i in data['ids'] if is_public_id(i)]
+        article_ids = []
+        for chunk in _chunks(public_ids):
+            article_ids.extend(row[0] for row in db.session.query(Article.id).filter(Article.public_id.in_(chunk)))
+        return article_ids
+    
+    filters = data['filter']
+    # A misspelt key would otherwise match every article
+    if not isinstance(filters, dict) or not filters or set(filters) - set(BULK_FILTER_FIELDS):
+        raise ValueError(f'"filter" must be a non-empty object with keys from: {", ".join(BULK_FILTER_FIELDS)}')
+    if not any(filters.values()):
+        raise ValueError('"filter" must set at least one value')
+    article_ids = [
+        row[0] for row in apply_article_filters(db.session.query(Article.id), filters).limit(BULK_MAX_IDS + 1)
+    ]
+    if len(article_ids) > BULK_MAX_IDS:
+        raise ValueError(f'"filter" matches more than {BULK_MAX_IDS} articles; narrow it or split the request')
+    return article_ids
+
+def _chunks(ids, size=500):
+    """Split id lists to stay under SQLite's bound-parameter limit"""
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+@articles_bp.route('/articles/stream', methods=['GET'])
+def stream_articles():
+    """Server-sent events for newly stored and analyzed articles"""
+    filters = {
+        field: request.args[field]
+        for field in ('category', 'source', 'sentiment')
+        if request.args.get(field)
+    }
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    def generate():
+        with article_events.open_stream(filters, last_event_id) as subscription:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            if subscription.needs_reset:
+                # Too far behind to replay; the client should reload the list
+                yield f'id: {article_events.last_event_id()}\nevent: reset\ndata: {{}}\n\n'
+            else:
+                for event in subscription.backlog:
+                    yield _format_sse(event)
+            
+            while not subscription.overflowed:
+                event = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield _format_sse(event)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _format_sse(event):
+    return f'id: {article_events.stream_id(event)}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n'
+
+@articles_bp.route('/articles/most-read', methods=['GET'])
+def get_most_read_articles():
+    """Get the most viewed articles"""
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    articles = Article.query.filter(Article.view_count > 0).order_by(
+        Article.view_count.desc()
+    ).limit(limit).all()
+    return jsonify([article.to_dict() for article in articles])
+
+@articles_bp.route('/articles/<string:article_id>/related', methods=['GET'])
+@cost_class('compute')
+def get_related_articles(article_id):
+    """Get the articles most semantically similar to this one"""
+    article = Article.get_by_public_id_or_404(article_id)
+    if not semantic_index.available():
+        return jsonify({'error': 'Semantic search is not configured'}), 503
+    
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    try:
+        hits = semantic_index.related(article, limit=limit)
+        return jsonify({'articles': _articles_with_similarity(hits)})
+    except Exception as e:
+        return jsonify({'error': f'Related articles lookup failed: {str(e)}'}), 500
+
+@articles_bp.route('/articles/semantic-search', methods=['GET'])
+@cost_class('compute')
+def semantic_search_articles():
+    """Search articles by meaning rather than exact words"""
+    query_text = (request.args.get('q') or '').strip()
+    if not query_text:
+        return jsonify({'error': 'q is required'}), 400
+    if not semantic_index.available():
+        return jsonify({'error': 'Semantic search is not configured'}), 503
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    category = request.args.get('category')
+    try:
+        # Over-fetch when filtering so the filtered page is still full
+        hits = semantic_index.search(query_text, limit=limit * 5 if category else limit)
+        articles = _articles_with_similarity(hits, category=category)[:limit]
+        return jsonify({'query': query_text, 'articles': articles})
+    except Exception as e:
+        return jsonify({'error': f'Semantic search failed: {str(e)}'}), 500
+
+def _articles_with_similarity(hits, category=None):
+    """Load the hit articles in rank order, each with its similarity score"""
+    if not hits:
+        return []
+    query = Article.query.filter(Article.id.in_([article_id for article_id, _ in hits]))
+    if category:
+        query = query.filter(Article.category == category)
+    by_id = {article.id: article for article in query}
+    
+    results = []
+    for article_id, score in hits:
+        article = by_id.get(article_id)
+        if article is not None:
+            results.append({**article.to_dict(), 'similarity': round(score, 4)})
+    return results
+
+@articles_bp.route('/articles/facets', methods=['GET'])
+def get_article_facets():
+    """Get article counts per category, source, sentiment, is_fake and day under the given filters
+
+    Each facet accepts several values, comma-separated or repeated
+    (?category=tech,science&sentiment=positive); days can also be given
+    as a from/to range. A facet's counts ignore its own selection.
+    """
+    selected = {}
+    for facet in FACETS:
+        values = [value for raw in request.args.getlist(facet) for value in raw.split(',') if value]
+        if values:
+            selected[facet] = values
+
+    try:
+        start, end = parse_day(request.args.get('from')), parse_day(request.args.get('to'))
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+
+    try:
+        started = time.perf_counter()
+        if start or end:
+            days = facet_index.day_range(start, end)
+            # '' matches no day, so an empty range gives zero counts rather than no filter
+            selected['day'] = [day for day in selected.get('day', days) if day in days] or ['']
+        result = facet_index.counts(selected)
+        result['took_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': f'Facet counts failed: {str(e)}'}), 500
+
 @articles_bp.route('/articles/categories', methods=['GET'])
 def get_categories():
     """Get all unique categories"""
@@ -0,0 +1,48 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.routes.articles import article_page_json
+from src.routes.ai_analysis import ai_analyzer
+from src.services.article_stats import article_stats
+from concurrent.futures import ThreadPoolExecutor
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Aggregates are computed off the request thread, next to the article page query
+dashboard_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='dashboard')
+
+def _in_app_context(app, fn, *args):
+    with app.app_context():
+        return fn(*args)
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+def get_dashboard():
+    """Get everything the front page renders on load in one response
+
+    Takes the same filters as /articles for the first page. Keyword and
+    distribution parts share the /ai/trending-keywords and
+    /ai/category-stats cache, and may lag the latest change by one refresh.
+    """
+    app = current_app._get_current_object()
+    
+    try:
+        # After an article change the previous aggregates are served while they're recomputed
+        distributions = dashboard_executor.submit(_in_app_context, app, article_stats.distributions, app)
+        trending = dashboard_executor.submit(
+            _in_app_context, app, article_stats.trending_keywords, ai_analyzer, 20, app
+        )
+        
+        articles = article_page_json(request.args)
+        stats = distributions.result()
+        
+        rest = current_app.json.dumps({
+            'trending_keywords': trending.result()['trending_keywords'],
+            'category_distribution': stats['category_distribution'],
+            'sentiment_distribution': stats['sentiment_distribution'],
+            'fake_news_stats': stats['fake_news_stats'],
+            'filter_options': stats['filter_options']
+        })
+        # The article page is already serialized; 'articles' sorts first, as jsonify would put it
+        body = b'{"articles":' + articles + b',' + rest[1:].lstrip().encode()
+        return Response(body, status=200, mimetype='application/json')
+        
+    except Exception as e:
+        return jsonify({'error': f'Dashboard failed: {str(e)}'}), 500
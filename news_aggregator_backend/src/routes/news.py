@@ -1,103 +1,210 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from src.services.news_fetcher import NewsFetcher
 from src.services.sample_news_generator import SampleNewsGenerator
 from src.models.article import Article, db
-from datetime import datetime
+from src.models.types import is_public_id
+from src.services.article_store import store_articles
+from src.services.content_enricher import content_enricher
+from src.services.ingestion_pipeline import IngestionPipeline
+from src.services.source_registry import source_registry
+from src.services.trending import TrendingService
+from src.services.admission import cost_class
 
 news_bp = Blueprint('news', __name__)
 news_fetcher = NewsFetcher()
 sample_generator = SampleNewsGenerator()
+ingestion_pipeline = IngestionPipeline(news_fetcher)
+trending_service = TrendingService(news_fetcher)
+
+def _positive_int(data, key, default):
+    """An integer body field (1 or more); raises ValueError with a client-facing message"""
+    try:
+        value = int(data.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be a positive integer')
+    if value < 1:
+        raise ValueError(f'{key} must be a positive integer')
+    return value
 
 @news_bp.route('/news/fetch', methods=['POST'])
+@cost_class('heavy')
 def fetch_news():
     """Fetch news from external APIs and store in database"""
     data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
     
     query = data.get('query')
     category = data.get('category')
     source_api = data.get('source_api', 'newsapi')  # 'newsapi' or 'serpapi'
     language = data.get('language', 'en')
+    # Walk through result pages (NewsAPI only) instead of taking the first one
+    max_articles = None
+    if data.get('max_articles') is not None:
+        try:
+            max_articles = min(_positive_int(data, 'max_articles', None), news_fetcher.newsapi_max_articles)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     articles = []
     
     try:
-        if source_api == 'newsapi':
+        if source_api == 'newsapi' and max_articles:
             if query:
-                # Use everything endpoint for search queries
-                articles = news_fetcher.fetch_everything_newsapi(
-                    query=query, 
-                    language=language
+                pages = news_fetcher.iter_everything_newsapi(
+                    query=query,
+                    language=language,
+                    max_articles=max_articles
                 )
             else:
-                # Use top headlines for category-based fetching
-                articles = news_fetcher.fetch_from_newsapi(
+                pages = news_fetcher.iter_newsapi_top_headlines(
                     category=category,
-                    language=language
-                )
-        elif source_api == 'serpapi':
-            if query:
-                articles = news_fetcher.fetch_from_serpapi_google_news(
-                    query=query,
-                    hl=language
+                    language=language,
+                    max_articles=max_articles
                 )
+        else:
+            if source_api == 'newsapi':
+                if query:
+                    # Use everything endpoint for search queries
+                    articles = news_fetcher.fetch_everything_newsapi(
+                        query=query, 
+                        language=language
+                    )
+                else:
+                    # Use top headlines for category-based fetching
+                    articles = news_fetcher.fetch_from_newsapi(
+                        category=category,
+                        language=language
+                    )
+            elif source_api == 'serpapi':
+                if query:
+                    articles = news_fetcher.fetch_from_serpapi_google_news(
+                        query=query,
+                        hl=language
+                    )
+            pages = [articles]
         
-        # Store articles in database
+        # Store articles in database, one page (and one commit) at a time
         stored_count = 0
         skipped_count = 0
+        total_fetched = 0
         
-        for article_data in articles:
-            # Check if article already exists
-            existing_article = Article.query.filter_by(url=article_data['url']).first()
-            if existing_article:
-                skipped_count += 1
-                continue
-            
-            # Create new article
-            article = Article(
-                title=article_data['title'],
-                url=article_data['url'],
-                source=article_data['source'],
-                author=article_data.get('author'),
-                published_date=article_data.get('published_date') or datetime.utcnow(),
-                content=article_data.get('content', article_data.get('description', '')),
-                image_url=article_data.get('image_url')
-            )
-            
-            db.session.add(article)
-            stored_count += 1
-        
-        db.session.commit()
+        for page in pages:
+            stored_articles, skipped = store_articles(page)
+            stored_count += len(stored_articles)
+            skipped_count += skipped
+            total_fetched += len(page)
         
         return jsonify({
             'message': f'Successfully fetched and stored {stored_count} articles',
             'stored': stored_count,
             'skipped': skipped_count,
-            'total_fetched': len(articles)
+            'total_fetched': total_fetched
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to fetch news: {str(e)}'}), 500
 
+@news_bp.route('/news/enrich', methods=['POST'])
+@cost_class('heavy')
+def enrich_articles():
+    """Start fetching full article pages in the background to replace truncated API content"""
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    try:
+        limit = min(_positive_int(data, 'limit', 50), 500)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if data.get('article_ids') is not None and not isinstance(data['article_ids'], list):
+        return jsonify({'error': 'article_ids must be a list of article ids'}), 400
+    
+    article_ids = None
+    if data.get('article_ids'):
+        article_ids = [
+            row[0] for row in db.session.query(Article.id).filter(
+                Article.public_id.in_([i for i in data['article_ids'] if is_public_id(i)])
+            )
+        ]
+        if not article_ids:
+            return jsonify({'error': 'No matching articles'}), 404
+    
+    if not content_enricher.start(current_app._get_current_object(), article_ids=article_ids, limit=limit):
+        return jsonify({'error': 'An enrichment run is already in progress'}), 409
+    
+    return jsonify({
+        'message': 'Enrichment started',
+        **content_enricher.status()
+    }), 202
+
+@news_bp.route('/news/enrich/status', methods=['GET'])
+def get_enrichment_status():
+    """Get whether an enrichment run is going, and the last run's counts"""
+    return jsonify(content_enricher.status())
+
+@news_bp.route('/news/ingest', methods=['POST'])
+def start_ingestion():
+    """Start a background fetch -> analyze -> store run over the pipeline"""
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    language = data.get('language', 'en')
+    try:
+        max_articles = min(_positive_int(data, 'max_articles', 500), news_fetcher.newsapi_max_articles)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if news_fetcher.newsapi_key == 'your_newsapi_key_here':
+        print("Using sample data since API keys are not configured")
+        sources = [{'type': 'sample', 'articles': sample_generator.generate_sample_articles(min(max_articles, 100))}]
+    elif data.get('query'):
+        sources = [{'type': 'everything', 'query': data['query'], 'language': language, 'max_articles': max_articles}]
+    else:
+        categories = data.get('categories') or ['business', 'technology', 'science', 'health', 'sports']
+        sources = [
+            {'type': 'top-headlines', 'category': category, 'language': language, 'max_articles': max_articles}
+            for category in categories
+        ]
+    
+    if not ingestion_pipeline.run(current_app._get_current_object(), sources):
+        return jsonify({'error': 'An ingestion run is already in progress'}), 409
+    
+    return jsonify({
+        'message': 'Ingestion started',
+        **ingestion_pipeline.status()
+    }), 202
+
+@news_bp.route('/news/ingest/status', methods=['GET'])
+def get_ingestion_status():
+    """Get per-stage throughput and queue depth of the current or last ingestion run"""
+    return jsonify(ingestion_pipeline.status())
+
 @news_bp.route('/news/trending', methods=['GET'])
 def get_trending_topics():
-    """Get trending topics from Google News"""
+    """Get trending topics from Google News (served from the background-refreshed snapshot)"""
     try:
-        topics = news_fetcher.fetch_trending_topics()
-        return jsonify({'trending_topics': topics})
+        snapshot = trending_service.get()
+        return jsonify({
+            'trending_topics': [t['topic'] for t in snapshot['topics']],
+            **snapshot
+        })
     except Exception as e:
         return jsonify({'error': f'Failed to fetch trending topics: {str(e)}'}), 500
 
+@news_bp.route('/news/cache-stats', methods=['GET'])
+def get_fetch_cache_stats():
+    """Get upstream response cache counters (hit ratio, API calls saved)"""
+    return jsonify(news_fetcher.get_cache_stats())
+
 @news_bp.route('/news/sources', methods=['GET'])
 def get_available_sources():
-    """Get available news sources"""
-    # This is a simplified list - in practice, you'd fetch from NewsAPI sources endpoint
-    sources = [
-        'BBC News', 'CNN', 'Reuters', 'Associated Press', 'The Guardian',
-        'The New York Times', 'The Washington Post', 'Al Jazeera English',
-        'TechCrunch', 'Ars Technica', 'The Verge', 'Wired'
-    ]
-    return jsonify({'sources': sources})
+    """Get known news sources with reliability and article stats, most articles first"""
+    sources = source_registry.sources()
+    return jsonify({
+        'sources': [source.name for source in sources],
+        'details': [source.to_dict() for source in sources]
+    })
 
 @news_bp.route('/news/categories', methods=['GET'])
 def get_available_categories():
@@ -109,6 +216,7 @@ def get_available_categories():
     return jsonify({'categories': categories})
 
 @news_bp.route('/news/bulk-fetch', methods=['POST'])
+@cost_class('heavy')
 def bulk_fetch_news():
     """Fetch news from multiple sources and categories"""
     try:
@@ -121,28 +229,9 @@ def bulk_fetch_news():
             # Use sample data instead
             print("Using sample data since API keys are not configured")
             sample_articles = sample_generator.generate_sample_articles(10)
-            
-            for article_data in sample_articles:
-                # Check if article already exists
-                existing_article = Article.query.filter_by(url=article_data['url']).first()
-                if existing_article:
-                    total_skipped += 1
-                    continue
-                
-                # Create new article
-                article = Article(
-                    title=article_data['title'],
-                    url=article_data['url'],
-                    source=article_data['source'],
-                    author=article_data.get('author'),
-                    published_date=article_data.get('published_date') or datetime.utcnow(),
-                    content=article_data.get('content', ''),
-                    category=article_data.get('category'),
-                    image_url=article_data.get('image_url')
-                )
-                
-                db.session.add(article)
-                total_stored += 1
+            stored, skipped = store_articles(sample_articles)
+            total_stored += len(stored)
+            total_skipped += skipped
         else:
             # Use real API data
             categories = ['business', 'technology', 'science', 'health', 'sports']
@@ -150,30 +239,9 @@ def bulk_fetch_news():
             for category in categories:
                 # Fetch from NewsAPI
                 articles = news_fetcher.fetch_from_newsapi(category=category)
-                
-                for article_data in articles:
-                    # Check if article already exists
-                    existing_article = Article.query.filter_by(url=article_data['url']).first()
-                    if existing_article:
-                        total_skipped += 1
-                        continue
-                    
-                    # Create new article
-                    article = Article(
-                        title=article_data['title'],
-                        url=article_data['url'],
-                        source=article_data['source'],
-                        author=article_data.get('author'),
-                        published_date=article_data.get('published_date') or datetime.utcnow(),
-                        content=article_data.get('content', article_data.get('description', '')),
-                        category=category,  # Set the category
-                        image_url=article_data.get('image_url')
-                    )
-                    
-                    db.session.add(article)
-                    total_stored += 1
-        
-        db.session.commit()
+                stored, skipped = store_articles(articles, category=category)
+                total_stored += len(stored)
+                total_skipped += skipped
         
         return jsonify({
             'message': f'Bulk fetch completed. Stored {total_stored} articles',
@@ -1,8 +1,18 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.models.user_interest import UserInterest
+from src.models.reading_history import ReadingHistory
+from src.models.notification import Notification
+from src.services.feed_engine import feed_engine
+from src.services.interest_percolator import interest_percolator
+from src.services.reading_events import reading_event_buffer, ReadingQueueFull
+from datetime import datetime, timezone
+import uuid
 
 user_bp = Blueprint('user', __name__)
 
+MAX_READING_EVENTS_PER_REQUEST = 1000
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
     users = User.query.all()
@@ -34,6 +44,144 @@ def update_user(user_id):
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     user = User.query.get_or_404(user_id)
+    UserInterest.query.filter_by(user_id=user_id).delete()
+    ReadingHistory.query.filter_by(user_id=user_id).delete()
+    Notification.query.filter_by(user_id=user_id).delete()
     db.session.delete(user)
     db.session.commit()
+    feed_engine.invalidate_user(user_id)
+    interest_percolator.remove_user(user_id)
+    return '', 204
+
+@user_bp.route('/users/<int:user_id>/interests', methods=['GET'])
+def get_user_interests(user_id):
+    User.query.get_or_404(user_id)
+    interests = UserInterest.query.filter_by(user_id=user_id).all()
+    return jsonify([interest.to_dict() for interest in interests])
+
+@user_bp.route('/users/<int:user_id>/interests', methods=['POST'])
+def create_user_interest(user_id):
+    User.query.get_or_404(user_id)
+    data = request.json or {}
+    
+    if not data.get('keyword'):
+        return jsonify({'error': 'Missing required field: keyword'}), 400
+    
+    interest = UserInterest(
+        user_id=user_id,
+        keyword=data['keyword'],
+        category=data.get('category'),
+        source=data.get('source')
+    )
+    db.session.add(interest)
+    db.session.commit()
+    feed_engine.invalidate_user(user_id)
+    interest_percolator.add_interest(interest)
+    return jsonify(interest.to_dict()), 201
+
+@user_bp.route('/users/<int:user_id>/interests/<int:interest_id>', methods=['DELETE'])
+def delete_user_interest(user_id, interest_id):
+    interest = UserInterest.query.filter_by(id=interest_id, user_id=user_id).first_or_404()
+    db.session.delete(interest)
+    db.session.commit()
+    feed_engine.invalidate_user(user_id)
+    interest_percolator.remove_interest(interest_id)
     return '', 204
+
+@user_bp.route('/users/<int:user_id>/feed', methods=['GET'])
+def get_user_feed(user_id):
+    """Get a personalized feed of unread articles ranked by the user's interests"""
+    User.query.get_or_404(user_id)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    
+    feed = feed_engine.get_feed(user_id, page=page, per_page=per_page)
+    feed.update({
+        'user_id': user_id,
+        'current_page': page,
+        'per_page': per_page
+    })
+    return jsonify(feed)
+
+@user_bp.route('/users/<int:user_id>/notifications', methods=['GET'])
+def get_notifications(user_id):
+    """Get the newest articles that matched one of the user's interests"""
+    User.query.get_or_404(user_id)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    query = Notification.query.options(db.joinedload(Notification.article)).filter_by(user_id=user_id)
+    if request.args.get('unread', '').lower() == 'true':
+        query = query.filter(Notification.read_at.is_(None))
+    
+    notifications = query.order_by(Notification.id.desc()).limit(limit).all()
+    unread = db.session.query(db.func.count(Notification.id)).filter(
+        Notification.user_id == user_id, Notification.read_at.is_(None)
+    ).scalar()
+    return jsonify({
+        'notifications': [notification.to_dict() for notification in notifications],
+        'unread': unread
+    })
+
+@user_bp.route('/users/<int:user_id>/notifications/read', methods=['POST'])
+def mark_notifications_read(user_id):
+    """Mark the given notification ids (or all of them) as read"""
+    User.query.get_or_404(user_id)
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+        return jsonify({'error': 'ids must be a list of notification ids'}), 400
+    
+    query = Notification.query.filter(Notification.user_id == user_id, Notification.read_at.is_(None))
+    if ids is not None:
+        query = query.filter(Notification.id.in_(ids))
+    marked = query.update({'read_at': datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return jsonify({'marked': marked})
+
+@user_bp.route('/users/<int:user_id>/reading-history', methods=['GET'])
+def get_reading_history(user_id):
+    User.query.get_or_404(user_id)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    # The entries serialize their article; load them in the same query
+    history = ReadingHistory.query.options(db.joinedload(ReadingHistory.article)).filter_by(
+        user_id=user_id
+    ).order_by(ReadingHistory.read_at.desc()).limit(limit).all()
+    return jsonify([entry.to_dict() for entry in history])
+
+@user_bp.route('/reading-events', methods=['POST'])
+def record_reading_events():
+    """Queue a batch of article-open events for bulk insertion"""
+    data = request.json
+    events = data.get('events') if isinstance(data, dict) else data
+    
+    if not isinstance(events, list) or not events:
+        return jsonify({'error': 'Expected a non-empty list of events'}), 400
+    if len(events) > MAX_READING_EVENTS_PER_REQUEST:
+        return jsonify({'error': f'At most {MAX_READING_EVENTS_PER_REQUEST} events per request'}), 413
+    
+    parsed = []
+    for event in events:
+        try:
+            read_at = event.get('read_at')
+            parsed.append({
+                'user_id': int(event['user_id']),
+                'article_id': str(uuid.UUID(str(event['article_id']))),
+                'read_at': _parse_utc(read_at) if read_at else None
+            })
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return jsonify({'error': 'Each event needs user_id, article_id and an optional ISO read_at'}), 400
+    
+    try:
+        result = reading_event_buffer.submit(parsed)
+    except ReadingQueueFull:
+        response = jsonify({'error': 'Reading event queue is full, retry shortly'})
+        response.headers['Retry-After'] = str(int(reading_event_buffer.flush_interval) + 1)
+        return response, 503
+    
+    return jsonify(result), 202
+
+def _parse_utc(value):
+    """Naive UTC datetime from an ISO timestamp; one without an offset is taken as UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
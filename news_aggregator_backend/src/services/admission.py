@@ -0,0 +1,158 @@
+from typing import Dict, Optional, Tuple
+import math
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+DEFAULT_CLASS = 'read'
+
+
+class CostClass:
+    """Limits shared by every route tagged with the same cost class"""
+
+    def __init__(self, name: str, max_concurrent: Optional[int] = None, rate: Optional[float] = None,
+                 burst: int = 1, max_body_bytes: Optional[int] = None, busy_retry_after: int = 1):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        # Per-client token bucket: ``rate`` tokens per second, holding at most ``burst``
+        self.rate = rate
+        self.burst = burst
+        self.max_body_bytes = max_body_bytes
+        self.busy_retry_after = busy_retry_after
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.in_flight = 0
+
+
+DEFAULT_CLASSES = [
+    # Plain reads are never shed
+    CostClass('read'),
+    # Single-item analysis: CPU-bound, so a few at a time is all the GIL can use anyway
+    CostClass('compute', max_concurrent=4, rate=10.0, burst=20, max_body_bytes=256 * 1024),
+    # Whole-table or upstream-bound jobs
+    CostClass('heavy', max_concurrent=2, rate=0.1, burst=3, max_body_bytes=6 * 1024 * 1024,
+              busy_retry_after=10),
+]
+
+
+def cost_class(name: str):
+    """Tag a view function with its admission cost class"""
+    def decorator(view):
+        view.cost_class = name
+        return view
+    return decorator
+
+
+class AdmissionController:
+    """Sheds load on expensive routes before it can starve cheap reads.
+
+    Each view is tagged with a cost class (``@cost_class('heavy')``;
+    untagged views are 'read'). Before a request runs, its class's limits
+    are checked in order: body size (413), the client's token bucket (429)
+    and a free slot in the class's concurrency pool (503). Rejections are
+    immediate and carry Retry-After. The slot is released when the request
+    context is torn down, so streamed responses hold it until they finish.
+    CORS preflights (OPTIONS) are never counted against the route they
+    precede.
+    """
+
+    def __init__(self, classes=None, max_clients: int = 10_000):
+        self.classes: Dict[str, CostClass] = {c.name: c for c in (classes or DEFAULT_CLASSES)}
+        self.max_clients = max_clients
+
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._bucket_lock = threading.Lock()
+        self.stats = {'admitted': 0, 'too_large': 0, 'rate_limited': 0, 'busy': 0}
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'classes': {
+                name: {
+                    'max_concurrent': c.max_concurrent,
+                    'in_flight': c.in_flight,
+                    'rate': c.rate,
+                    'burst': c.burst,
+                    'max_body_bytes': c.max_body_bytes
+                }
+                for name, c in self.classes.items()
+            }
+        }
+
+    def _class_for_request(self) -> CostClass:
+        view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+        return self.classes.get(getattr(view, 'cost_class', DEFAULT_CLASS), self.classes[DEFAULT_CLASS])
+
+    def _count(self, stat: str):
+        # Request threads update these concurrently
+        with self._bucket_lock:
+            self.stats[stat] += 1
+
+    def _before_request(self):
+        if request.method == 'OPTIONS':
+            # Preflights resolve to the tagged view but run none of it
+            return None
+        cost = self._class_for_request()
+        if cost.rate is None and cost.slots is None and cost.max_body_bytes is None:
+            return None
+
+        if cost.max_body_bytes is not None:
+            if request.content_length is not None and request.content_length > cost.max_body_bytes:
+                self._count('too_large')
+                return jsonify({'error': f'Request body must be at most {cost.max_body_bytes} bytes'}), 413
+            # Chunked bodies are cut off while they're read
+            request.max_content_length = cost.max_body_bytes
+
+        if cost.rate is not None:
+            wait = self._take_token(cost)
+            if wait > 0:
+                self._count('rate_limited')
+                return self._reject('Too many requests', 429, wait)
+
+        if cost.slots is not None:
+            if not cost.slots.acquire(blocking=False):
+                self._count('busy')
+                return self._reject('Server is busy, try again shortly', 503, cost.busy_retry_after)
+            with self._bucket_lock:
+                cost.in_flight += 1
+            g.admission_slot = cost
+
+        self._count('admitted')
+        return None
+
+    def _teardown_request(self, exc=None):
+        cost = g.pop('admission_slot', None)
+        if cost is not None:
+            with self._bucket_lock:
+                cost.in_flight -= 1
+            cost.slots.release()
+
+    def _take_token(self, cost: CostClass) -> float:
+        """Spend one token; returns 0, or the seconds until a token is available"""
+        key = (cost.name, request.remote_addr or '')
+        now = time.monotonic()
+        with self._bucket_lock:
+            tokens, updated = self._buckets.get(key, (float(cost.burst), now))
+            tokens = min(float(cost.burst), tokens + (now - updated) * cost.rate)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now)
+                return (1.0 - tokens) / cost.rate
+            if len(self._buckets) >= self.max_clients and key not in self._buckets:
+                # Buckets of idle clients would be full again anyway
+                self._buckets.clear()
+            self._buckets[key] = (tokens - 1.0, now)
+        return 0.0
+
+    @staticmethod
+    def _reject(message: str, status: int, retry_after: float):
+        response = jsonify({'error': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+
+admission_controller = AdmissionController()
@@ -9,6 +9,11 @@ import pickle
 import os
 from typing import Dict, List, Optional, Tuple
 import logging
+from functools import lru_cache
+
+from src.services.sentiment_engine import LexiconSentimentEngine, default_lexicon_path, sentiment_label
+from src.services.category_learner import category_learner
+from src.services.source_registry import source_registry
 
 # Download required NLTK data
 try:
@@ -31,6 +36,8 @@ class NewsAIAnalyzer:
     def __init__(self):
         self.stop_words = set(stopwords.words('english'))
         self.stemmer = PorterStemmer()
+        self._stem = lru_cache(maxsize=100_000)(self.stemmer.stem)
+        self.sentiment_engine = self._load_sentiment_engine()
         self.category_classifier = None
         self.fake_news_classifier = None
         self.model_path = os.path.join(os.path.dirname(__file__), '..', 'models')
@@ -39,6 +46,17 @@ class NewsAIAnalyzer:
         # Initialize or load models
         self._initialize_models()
     
+    def _load_sentiment_engine(self) -> Optional[LexiconSentimentEngine]:
+        """Vectorized lexicon scorer; falls back to per-call TextBlob if the lexicon is missing"""
+        path = default_lexicon_path()
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return LexiconSentimentEngine(path)
+        except Exception as e:
+            logging.error(f"Could not load sentiment lexicon {path}: {e}")
+            return None
+    
     def _initialize_models(self):
         """Initialize or load pre-trained models"""
         # For now, we'll create simple rule-based classifiers
@@ -85,13 +103,47 @@ class NewsAIAnalyzer:
         
         # Remove stopwords and stem
         processed_words = [
-            self.stemmer.stem(word) for word in words 
+            self._stem(word) for word in words 
             if word not in self.stop_words and len(word) > 2
         ]
         
         return ' '.join(processed_words)
     
+    def extract_terms(self, text: str) -> List[str]:
+        """Fast stopword-filtered, stemmed term list for indexing (no NLTK tokenizer)"""
+        if not text:
+            return []
+        
+        return [
+            self._stem(word) for word in re.findall(r'[a-z]+', text.lower())
+            if word not in self.stop_words and len(word) > 2
+        ]
+    
+    def extract_term_pairs(self, text: str) -> List[Tuple[str, str]]:
+        """Like extract_terms, but keeps each (word, stem) pair for display"""
+        if not text:
+            return []
+        
+        return [
+            (word, self._stem(word.lower())) for word in re.findall(r'[A-Za-z]+', text)
+            if word.lower() not in self.stop_words and len(word) > 2
+        ]
+    
     def classify_category(self, title: str, content: str) -> str:
+        """Classify news article category (learned model when confident, else keywords)"""
+        return self.classify_categories([(title, content)])[0]
+    
+    def classify_categories(self, items: List[Tuple[str, str]]) -> List[str]:
+        """Classify many (title, content) pairs, predicting with the learned model in one batch"""
+        learned = category_learner.predict_batch([
+            category_learner.text_for(title, content) for title, content in items
+        ])
+        return [
+            prediction[0] if prediction is not None else self._classify_category_keywords(title, content)
+            for (title, content), prediction in zip(items, learned)
+        ]
+    
+    def _classify_category_keywords(self, title: str, content: str) -> str:
         """Classify news article category using keyword matching"""
         text = f"{title} {content}".lower()
         
@@ -111,28 +163,29 @@ class NewsAIAnalyzer:
             return 'general'
     
     def analyze_sentiment(self, text: str) -> Dict[str, any]:
-        """Analyze sentiment of text using TextBlob"""
+        """Analyze sentiment of text (lexicon engine, or TextBlob as a fallback)"""
         if not text:
             return {'sentiment': 'neutral', 'polarity': 0.0, 'subjectivity': 0.0}
         
+        if self.sentiment_engine is not None:
+            return self.sentiment_engine.score(text)
+        
         blob = TextBlob(text)
         polarity = blob.sentiment.polarity
         subjectivity = blob.sentiment.subjectivity
         
-        # Classify sentiment based on polarity
-        if polarity > 0.1:
-            sentiment = 'positive'
-        elif polarity < -0.1:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
-        
         return {
-            'sentiment': sentiment,
+            'sentiment': sentiment_label(polarity),
             'polarity': polarity,
             'subjectivity': subjectivity
         }
     
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        """Analyze sentiment of many texts in one vectorized pass"""
+        if self.sentiment_engine is not None:
+            return self.sentiment_engine.score_batch(texts)
+        return [self.analyze_sentiment(text) for text in texts]
+    
     def detect_fake_news(self, title: str, content: str, source: str) -> Dict[str, any]:
         """Simple fake news detection based on indicators"""
         text = f"{title} {content}".lower()
@@ -149,13 +202,9 @@ class NewsAIAnalyzer:
         # Simple scoring system
         fake_score = indicator_count / len(self.fake_news_indicators)
         
-        # Check source reliability (simplified)
-        reliable_sources = [
-            'bbc', 'cnn', 'reuters', 'associated press', 'the guardian', 
-            'the new york times', 'the washington post', 'npr', 'pbs'
-        ]
-        
-        source_reliable = any(reliable in source.lower() for reliable in reliable_sources)
+        # Source reputation: the registry's prior, discounted by the source's fake-flag rate
+        source_reliable = source_registry.is_reliable(source)
+        source_reliability = source_registry.reliability(source)
         
         # Determine if likely fake
         is_fake = fake_score > 0.3 and not source_reliable
@@ -164,7 +213,8 @@ class NewsAIAnalyzer:
             'is_fake': is_fake,
             'fake_score': fake_score,
             'indicators_found': found_indicators,
-            'source_reliable': source_reliable
+            'source_reliable': source_reliable,
+            'source_reliability': round(source_reliability, 4)
         }
     
     def summarize_text(self, text: str, max_sentences: int = 3) -> str:
@@ -213,14 +263,18 @@ class NewsAIAnalyzer:
         
         return ' '.join(summary_sentences)
     
-    def analyze_article(self, title: str, content: str, source: str) -> Dict[str, any]:
+    def analyze_article(self, title: str, content: str, source: str,
+                        sentiment_data: Optional[Dict] = None,
+                        category: Optional[str] = None) -> Dict[str, any]:
         """Comprehensive analysis of a news article"""
         
         # Category classification
-        category = self.classify_category(title, content)
+        if category is None:
+            category = self.classify_category(title, content)
         
-        # Sentiment analysis
-        sentiment_data = self.analyze_sentiment(f"{title} {content}")
+        # Sentiment analysis (batch callers pass it in precomputed)
+        if sentiment_data is None:
+            sentiment_data = self.analyze_sentiment(f"{title} {content}")
         
         # Fake news detection
         fake_news_data = self.detect_fake_news(title, content, source)
@@ -237,19 +291,39 @@ class NewsAIAnalyzer:
             'fake_score': fake_news_data['fake_score'],
             'fake_indicators': fake_news_data['indicators_found'],
             'source_reliable': fake_news_data['source_reliable'],
+            'source_reliability': fake_news_data['source_reliability'],
             'summary': summary
         }
     
-    def batch_analyze_articles(self, articles: List[Dict]) -> List[Dict]:
-        """Analyze multiple articles in batch"""
-        analyzed_articles = []
+    def batch_analyze_articles(self, articles: List[Dict], defaults_on_error: bool = True) -> List[Dict]:
+        """Analyze multiple articles in batch, updating each article dict with its analysis.
+
+        Sentiment and category are scored for the whole batch at once, then
+        each article is summarized and checked on its own. An article whose
+        analysis fails gets default values, or an ``error`` message when
+        ``defaults_on_error`` is False.
+        """
+        try:
+            sentiments = self.analyze_sentiment_batch([
+                f"{article.get('title', '')} {article.get('content', '')}" for article in articles
+            ])
+            categories = self.classify_categories([
+                (article.get('title', ''), article.get('content', '')) for article in articles
+            ])
+        except Exception as e:
+            # Let the per-article path find out which articles are bad
+            logging.error(f"Batch sentiment/category pass failed, analyzing articles one by one: {e}")
+            sentiments = categories = [None] * len(articles)
         
-        for article in articles:
+        analyzed_articles = []
+        for article, sentiment_data, category in zip(articles, sentiments, categories):
             try:
                 analysis = self.analyze_article(
                     article.get('title', ''),
                     article.get('content', ''),
-                    article.get('source', '')
+                    article.get('source', ''),
+                    sentiment_data=sentiment_data,
+                    category=category
                 )
                 
                 # Update article with analysis results
@@ -258,6 +332,10 @@ class NewsAIAnalyzer:
                 
             except Exception as e:
                 logging.error(f"Error analyzing article {article.get('title', 'Unknown')}: {e}")
+                if not defaults_on_error:
+                    article['error'] = str(e)
+                    analyzed_articles.append(article)
+                    continue
                 # Add default values if analysis fails
                 article.update({
                     'category': 'general',
@@ -268,6 +346,7 @@ class NewsAIAnalyzer:
                     'fake_score': 0.0,
                     'fake_indicators': [],
                     'source_reliable': True,
+                    'source_reliability': source_registry.reliability(article.get('source', '')),
                     'summary': article.get('content', '')[:200] + '...' if len(article.get('content', '')) > 200 else article.get('content', '')
                 })
                 analyzed_articles.append(article)
@@ -0,0 +1,157 @@
+from collections import defaultdict, deque
+from typing import Callable, Dict, List, Optional
+import queue
+import threading
+import uuid
+
+# Event types published by the write paths
+ARTICLE_CREATED = 'article.created'
+ARTICLE_ANALYZED = 'article.analyzed'
+ARTICLE_UPDATED = 'article.updated'
+ARTICLE_DELETED = 'article.deleted'
+
+
+class ArticleEvent:
+    """A single published change, with an id increasing within this process"""
+
+    __slots__ = ('id', 'type', 'data')
+
+    def __init__(self, id: int, type: str, data: Dict):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def matches(self, filters: Dict[str, str]) -> bool:
+        # Deletions only carry an id, so every stream receives them
+        if self.type == ARTICLE_DELETED:
+            return True
+        return all(self.data.get(field) == value for field, value in filters.items())
+
+
+class Subscription:
+    """A stream subscriber's bounded inbox"""
+
+    def __init__(self, bus: 'ArticleEventBus', filters: Dict[str, str], max_queue: int):
+        self.bus = bus
+        self.filters = filters
+        self.backlog: List[ArticleEvent] = []
+        self.needs_reset = False
+        self.overflowed = False
+        self._queue: 'queue.Queue[ArticleEvent]' = queue.Queue(maxsize=max_queue)
+
+    def offer(self, event: ArticleEvent):
+        if self.overflowed or not event.matches(self.filters):
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # A slow client; it gets disconnected and resumes via Last-Event-ID
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[ArticleEvent]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArticleEventBus:
+    """In-process pub/sub for article changes.
+
+    Write paths call ``publish`` after committing. In-process services
+    register callbacks with ``subscribe`` and receive the ORM objects, while
+    streaming clients ``open_stream`` and receive serialized events. The last
+    ``history_size`` events are retained so a reconnecting client can resume
+    from its Last-Event-ID. Stream ids carry a per-process boot prefix
+    (``<boot>-<seq>``), so an id from before a restart is never mistaken
+    for a current one.
+    """
+
+    def __init__(self, history_size: int = 2000, subscriber_queue_size: int = 500):
+        self.subscriber_queue_size = subscriber_queue_size
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._history: 'deque[ArticleEvent]' = deque(maxlen=history_size)
+        self._listeners: Dict[str, List[Callable]] = defaultdict(list)
+        self._streams = set()
+
+    def subscribe(self, event_type: str, callback: Callable):
+        """Call ``callback(articles)`` whenever ``event_type`` is published"""
+        self._listeners[event_type].append(callback)
+
+    def publish(self, event_type: str, articles: List):
+        """Notify listeners and stream subscribers about committed articles"""
+        if not articles:
+            return
+
+        for callback in self._listeners.get(event_type, []):
+            try:
+                callback(articles)
+            except Exception as e:
+                print(f"Error in {event_type} listener {getattr(callback, '__qualname__', callback)}: {e}")
+
+        if event_type == ARTICLE_DELETED:
+            payloads = [{'id': article.public_id} for article in articles]
+        else:
+            payloads = [article.to_dict() for article in articles]
+
+        with self._lock:
+            for payload in payloads:
+                event = ArticleEvent(self._next_id, event_type, payload)
+                self._next_id += 1
+                self._history.append(event)
+                for stream in self._streams:
+                    stream.offer(event)
+
+    def open_stream(self, filters: Dict[str, str], last_event_id: Optional[str] = None) -> Subscription:
+        """Register a stream subscriber, replaying retained events after the stream id ``last_event_id``"""
+        subscription = Subscription(self, filters, self.subscriber_queue_size)
+        with self._lock:
+            if last_event_id:
+                seq = self._parse_stream_id(last_event_id)
+                oldest = self._history[0].id if self._history else self._next_id
+                # The id comes from before a restart (or is malformed), or events
+                # between the client's last id and our oldest were lost
+                if seq is None or seq >= self._next_id or seq + 1 < oldest:
+                    subscription.needs_reset = True
+                else:
+                    subscription.backlog = [
+                        event for event in self._history
+                        if event.id > seq and event.matches(filters)
+                    ]
+            self._streams.add(subscription)
+        return subscription
+
+    def stream_id(self, event: ArticleEvent) -> str:
+        """The SSE id for ``event``"""
+        return f'{self.boot_id}-{event.id}'
+
+    def subscriber_count(self) -> int:
+        return len(self._streams)
+
+    def last_event_id(self) -> str:
+        return f'{self.boot_id}-{self._next_id - 1}'
+
+    def _parse_stream_id(self, stream_id: str) -> Optional[int]:
+        """Sequence number of one of this process's stream ids; None for any other"""
+        boot_id, _, seq = stream_id.partition('-')
+        if boot_id != self.boot_id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._streams.discard(subscription)
+
+
+article_events = ArticleEventBus()
@@ -0,0 +1,142 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+import threading
+import time
+
+from src.models.article import Article, db
+from src.models.compression import decompress_text
+from src.services.article_events import (
+    article_events, ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_UPDATED, ARTICLE_DELETED
+)
+
+
+class ArticleStats:
+    """Cached dashboard aggregates, shared by /dashboard and the /ai stats endpoints.
+
+    Entries are tagged with a data version that every article event bumps,
+    so they're recomputed after the next change instead of after a fixed
+    delay; ``ttl`` only bounds how stale time-windowed results (the last
+    ``trending_days`` of keywords) can get. A per-entry lock makes
+    concurrent misses wait for one computation instead of all running it,
+    and callers that pass the app get the previous value while a single
+    background refresh runs.
+    """
+
+    def __init__(self, ttl: float = 300.0, trending_days: int = 7):
+        self.ttl = ttl
+        self.trending_days = trending_days
+
+        self._version = 0
+        self._cache: Dict[str, Tuple[int, float, object]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0}
+
+    def invalidate(self, articles=None):
+        """Event callback: the next read of every entry recomputes"""
+        self._version += 1
+
+    def distributions(self, app=None) -> Dict:
+        """Category, sentiment and fake-news counts plus filter options, from one GROUP BY scan"""
+        return self._cached('distributions', self._compute_distributions, app)
+
+    def trending_keywords(self, analyzer, top_n: int = 20, app=None) -> Dict:
+        return self._cached(f'trending:{top_n}', lambda: self._compute_trending(analyzer, top_n), app)
+
+    def _cached(self, key: str, compute: Callable[[], object], app=None):
+        """Cached value for ``key``. Given ``app``, a stale entry is returned as is and refreshed in the background"""
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == self._version and entry[1] > time.monotonic():
+            self.stats['hits'] += 1
+            return entry[2]
+
+        with self._locks_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        if entry is not None and app is not None:
+            if lock.acquire(blocking=False):
+                threading.Thread(target=self._refresh, args=(app, key, compute, lock), daemon=True).start()
+            self.stats['stale'] += 1
+            return entry[2]
+
+        with lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == self._version and entry[1] > time.monotonic():
+                self.stats['hits'] += 1
+                return entry[2]
+            self.stats['misses'] += 1
+            return self._store(key, compute)
+
+    def _store(self, key: str, compute: Callable[[], object]):
+        # Read the version first: a change landing mid-computation leaves the entry stale
+        version = self._version
+        value = compute()
+        self._cache[key] = (version, time.monotonic() + self.ttl, value)
+        return value
+
+    def _refresh(self, app, key: str, compute: Callable[[], object], lock: threading.Lock):
+        try:
+            with app.app_context():
+                self._store(key, compute)
+        except Exception as e:
+            print(f"Error refreshing {key} stats: {e}")
+        finally:
+            lock.release()
+
+    def _compute_distributions(self) -> Dict:
+        rows = db.session.query(
+            Article.category, Article.sentiment, Article.is_fake, Article.source, db.func.count(Article.id)
+        ).group_by(Article.category, Article.sentiment, Article.is_fake, Article.source).all()
+
+        categories = Counter()
+        sentiments = Counter()
+        sources = set()
+        fake_count = total = 0
+        for category, sentiment, is_fake, source, count in rows:
+            total += count
+            if category is not None:
+                categories[category] += count
+            if sentiment is not None:
+                sentiments[sentiment] += count
+            if is_fake:
+                fake_count += count
+            sources.add(source)
+
+        return {
+            'category_distribution': [
+                {'category': category, 'count': count} for category, count in sorted(categories.items())
+            ],
+            'sentiment_distribution': [
+                {'sentiment': sentiment, 'count': count} for sentiment, count in sorted(sentiments.items())
+            ],
+            'fake_news_stats': {
+                'fake_count': fake_count,
+                'total_articles': total,
+                'fake_percentage': (fake_count / total * 100) if total > 0 else 0
+            },
+            'filter_options': {
+                'categories': sorted(categories),
+                'sentiments': sorted(sentiments),
+                'sources': sorted(source for source in sources if source)
+            }
+        }
+
+    def _compute_trending(self, analyzer, top_n: int) -> Dict:
+        week_ago = datetime.utcnow() - timedelta(days=self.trending_days)
+        # Only the two text columns, not whole Article rows
+        rows = db.session.query(Article.title, Article.content_data).filter(
+            Article.created_at >= week_ago
+        ).all()
+
+        articles_data = [{'title': title, 'content': decompress_text(content)} for title, content in rows]
+        keywords = analyzer.get_trending_keywords(articles_data, top_n) if articles_data else []
+        return {
+            'trending_keywords': [{'keyword': keyword, 'frequency': freq} for keyword, freq in keywords],
+            'articles_analyzed': len(articles_data)
+        }
+
+
+article_stats = ArticleStats()
+for event_type in (ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_UPDATED, ARTICLE_DELETED):
+    article_events.subscribe(event_type, article_stats.invalidate)
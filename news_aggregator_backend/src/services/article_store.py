@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from src.models.article import Article, db
+from src.services.article_events import article_events, ARTICLE_CREATED
+
+
+def store_articles(articles_data: List[Dict], category: str = None) -> Tuple[List[Article], int]:
+    """Store fetched articles, skipping known URLs. Returns (stored_articles, skipped_count)
+
+    Analysis fields (sentiment, summary, is_fake) are stored too when the
+    article dicts already carry them.
+    """
+    urls = [a['url'] for a in articles_data if a.get('url')]
+    existing_urls = {
+        row[0] for row in db.session.query(Article.url).filter(Article.url.in_(urls))
+    } if urls else set()
+
+    stored_articles = []
+    skipped_count = 0
+
+    for article_data in articles_data:
+        # Skip articles we already have (or that repeat within this batch)
+        if article_data['url'] in existing_urls:
+            skipped_count += 1
+            continue
+        existing_urls.add(article_data['url'])
+
+        article = Article(
+            title=article_data['title'],
+            url=article_data['url'],
+            source=article_data['source'],
+            author=article_data.get('author'),
+            published_date=article_data.get('published_date') or datetime.utcnow(),
+            content=article_data.get('content') or article_data.get('description', ''),
+            summary=article_data.get('summary'),
+            category=category or article_data.get('category'),
+            sentiment=article_data.get('sentiment'),
+            is_fake=bool(article_data.get('is_fake', False)),
+            image_url=article_data.get('image_url')
+        )
+
+        db.session.add(article)
+        stored_articles.append(article)
+
+    db.session.commit()
+    article_events.publish(ARTICLE_CREATED, stored_articles)
+
+    return stored_articles, skipped_count
@@ -0,0 +1,333 @@
+"""Online backups of the SQLite databases.
+
+Also a command line tool, run from news_aggregator_backend/ with the app stopped for restores:
+
+    python -m src.services.backup create
+    python -m src.services.backup list
+    python -m src.services.backup verify src/database/backups/app-20260101T030000000000Z.db.gz
+    python -m src.services.backup restore src/database/backups/app-20260101T030000000000Z.db.gz
+"""
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Optional
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
+SNAPSHOT_SUFFIX = '.db.gz'
+
+
+class _BackupRestarted(Exception):
+    """Raised from the progress callback once writers have restarted a throttled backup too often"""
+
+
+class _HashingWriter:
+    """File wrapper that hashes what's written, so the gzip output is checksummed in one pass"""
+
+    def __init__(self, file):
+        self.file = file
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+
+class BackupService:
+    """Compressed, checksummed snapshots taken with SQLite's online backup API.
+
+    Pages are copied ``pages_per_step`` at a time with a ``step_pause``
+    between steps, and compression rests between chunks, so the source
+    is only read-locked briefly and requests keep running. A write from another connection makes SQLite restart
+    the copy; after ``max_restarts`` the attempt is abandoned and retried
+    after a growing pause (``retry_backoff``, doubled each time), up to
+    ``max_attempts``. It is never finished in a single step: the database
+    uses a rollback journal, so that would hold a read lock that blocks
+    every commit until the whole file is copied. Each snapshot is checked with
+    ``PRAGMA quick_check``, gzipped next to a ``sha256sum``-format
+    checksum file, and only the newest ``keep`` per database are kept.
+    """
+
+    def __init__(self, directory: Optional[str] = None, keep: int = 7, interval: float = 0.0,
+                 pages_per_step: int = 256, step_pause: float = 0.01, max_restarts: int = 3,
+                 max_attempts: int = 5, retry_backoff: float = 2.0):
+        self.directory = directory or os.path.join(DATABASE_DIR, 'backups')
+        self.keep = keep
+        self.interval = interval
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self.max_restarts = max_restarts
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+        self.databases: Dict[str, str] = {}
+        self.last_run: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def init_app(self, app, extra_databases: Optional[Dict[str, Optional[str]]] = None):
+        """Back up the app's SQLite database (plus ``extra_databases``), on a schedule if ``interval`` is set"""
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+        if uri.startswith('sqlite:///'):
+            self.databases['app'] = uri[len('sqlite:///'):]
+        for name, path in (extra_databases or {}).items():
+            if path:
+                self.databases[name] = path
+
+        if self.interval > 0 and self.databases and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='database-backup', daemon=True)
+            self._thread.start()
+
+    def create(self) -> Dict:
+        """Snapshot every configured database; raises RuntimeError if a backup is already running"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError('A backup is already running')
+        try:
+            started = time.monotonic()
+            snapshots = [
+                self.snapshot(name, path) for name, path in self.databases.items() if os.path.exists(path)
+            ]
+            self.last_run = {
+                'finished_at': datetime.utcnow().isoformat(),
+                'seconds': round(time.monotonic() - started, 3),
+                'snapshots': snapshots
+            }
+            return self.last_run
+        finally:
+            self._lock.release()
+
+    def snapshot(self, name: str, path: str) -> Dict:
+        """Back up one database file to ``<name>-<UTC timestamp>.db.gz`` plus its checksum"""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')
+        filename = f'{name}-{stamp}{SNAPSHOT_SUFFIX}'
+        target = os.path.join(self.directory, filename)
+        partial = os.path.join(self.directory, f'.{name}-{stamp}.db.partial')
+
+        started = time.monotonic()
+        try:
+            steps, restarts = self._copy(path, partial)
+            copied = time.monotonic()
+
+            with closing(sqlite3.connect(partial)) as check:
+                result = check.execute('PRAGMA quick_check').fetchone()[0]
+            if result != 'ok':
+                raise RuntimeError(f'Backup of {name} failed its integrity check: {result}')
+
+            with open(target + '.partial', 'wb') as raw:
+                writer = _HashingWriter(raw)
+                # Level 1: article text is already zlib-compressed, higher levels barely help
+                with open(partial, 'rb') as source, gzip.GzipFile(filename=filename[:-3], mode='wb',
+                                                                    fileobj=writer, compresslevel=1) as out:
+                    # Compression is the CPU-heavy part: rest at least as long as each chunk took,
+                    # so it never takes more than about half a core from request threads
+                    for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                        chunk_started = time.monotonic()
+                        out.write(chunk)
+                        time.sleep(max(self.step_pause, time.monotonic() - chunk_started))
+            digest = writer.sha256.hexdigest()
+            with open(target + '.sha256', 'w') as checksum:
+                checksum.write(f'{digest}  {filename}\n')
+            os.replace(target + '.partial', target)
+            size = os.path.getsize(partial)
+        finally:
+            for leftover in (partial, target + '.partial'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+        self._rotate(name)
+        return {
+            'database': name,
+            'file': filename,
+            'sha256': digest,
+            'bytes': size,
+            'compressed_bytes': os.path.getsize(target),
+            'steps': steps,
+            'restarts': restarts,
+            'copy_seconds': round(copied - started, 3),
+            'seconds': round(time.monotonic() - started, 3)
+        }
+
+    def list_snapshots(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        snapshots = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if filename.endswith(SNAPSHOT_SUFFIX):
+                path = os.path.join(self.directory, filename)
+                snapshots.append({
+                    'file': filename,
+                    'database': filename.rsplit('-', 1)[0],
+                    'compressed_bytes': os.path.getsize(path),
+                    'created_at': datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat(),
+                    'checksum': os.path.exists(path + '.sha256')
+                })
+        return snapshots
+
+    def _copy(self, source_path: str, target_path: str):
+        """Online backup into ``target_path``; returns (steps, restarts)"""
+        progress = {'steps': 0, 'restarts': 0, 'attempt_restarts': 0, 'remaining': None}
+
+        def throttle(status, remaining, total):
+            progress['steps'] += 1
+            # Remaining pages going up means a write from another connection restarted the copy
+            if progress['remaining'] is not None and remaining > progress['remaining']:
+                progress['restarts'] += 1
+                progress['attempt_restarts'] += 1
+                if progress['attempt_restarts'] > self.max_restarts:
+                    raise _BackupRestarted()
+            progress['remaining'] = remaining
+            if remaining:
+                time.sleep(self.step_pause)
+
+        source = sqlite3.connect(source_path, timeout=30)
+        try:
+            target = sqlite3.connect(target_path)
+            try:
+                for attempt in range(self.max_attempts):
+                    if attempt:
+                        # Wait for the burst of writes to pass, then start over
+                        time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                    progress['attempt_restarts'] = 0
+                    progress['remaining'] = None
+                    try:
+                        source.backup(target, pages=self.pages_per_step, progress=throttle)
+                        return progress['steps'], progress['restarts']
+                    except _BackupRestarted:
+                        continue
+            finally:
+                target.close()
+        finally:
+            source.close()
+        raise RuntimeError(
+            f'{source_path} kept changing during {self.max_attempts} backup attempts; try again later'
+        )
+
+    def _rotate(self, name: str):
+        prefix = f'{name}-'
+        snapshots = sorted(
+            (f for f in os.listdir(self.directory) if f.startswith(prefix) and f.endswith(SNAPSHOT_SUFFIX)),
+            reverse=True
+        )
+        for stale in snapshots[self.keep:]:
+            for path in (stale, stale + '.sha256'):
+                path = os.path.join(self.directory, path)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.create()
+            except Exception as e:
+                print(f"Error backing up databases: {e}")
+
+
+def verify_snapshot(snapshot_path: str) -> str:
+    """Check a snapshot against its .sha256 file; returns the digest or raises ValueError"""
+    checksum_path = snapshot_path + '.sha256'
+    if not os.path.exists(checksum_path):
+        raise ValueError(f'No checksum file {checksum_path}')
+    with open(checksum_path) as checksum:
+        expected = checksum.read().split()[0]
+
+    sha256 = hashlib.sha256()
+    with open(snapshot_path, 'rb') as snapshot:
+        for chunk in iter(lambda: snapshot.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    if sha256.hexdigest() != expected:
+        raise ValueError(f'Checksum mismatch for {snapshot_path}')
+    return expected
+
+
+def restore_snapshot(snapshot_path: str, target_path: str) -> Dict:
+    """Replace ``target_path`` with a verified snapshot; the app must be stopped.
+
+    The current file (and any journal/WAL next to it, which would otherwise
+    be replayed into the restored database) is kept as ``*.pre-restore-<time>``.
+    """
+    digest = verify_snapshot(snapshot_path)
+    partial = target_path + '.restore-partial'
+    with gzip.open(snapshot_path, 'rb') as source, open(partial, 'wb') as out:
+        shutil.copyfileobj(source, out, 1024 * 1024)
+    with closing(sqlite3.connect(partial)) as check:
+        result = check.execute('PRAGMA integrity_check').fetchone()[0]
+    if result != 'ok':
+        os.remove(partial)
+        raise ValueError(f'Restored database failed its integrity check: {result}')
+
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    kept = []
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        if os.path.exists(target_path + suffix):
+            os.replace(target_path + suffix, f'{target_path}{suffix}.pre-restore-{stamp}')
+            kept.append(f'{target_path}{suffix}.pre-restore-{stamp}')
+    os.replace(partial, target_path)
+    return {'restored': target_path, 'sha256': digest, 'previous': kept}
+
+
+def _default_target(snapshot_path: str) -> str:
+    name = os.path.basename(snapshot_path).rsplit('-', 1)[0]
+    if name == 'archive' and os.getenv('ARCHIVE_DB_PATH'):
+        return os.getenv('ARCHIVE_DB_PATH')
+    return os.path.join(DATABASE_DIR, f'{name}.db')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.services.backup', description=__doc__.split('\n')[0])
+    parser.add_argument('--dir', default=os.getenv('BACKUP_DIR'), help='snapshot directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('create', help='snapshot app.db (and archive.db if present) now')
+    commands.add_parser('list', help='list snapshots, newest first')
+    verify = commands.add_parser('verify', help='check a snapshot against its checksum')
+    verify.add_argument('snapshot')
+    restore = commands.add_parser('restore', help='replace a database with a snapshot (stop the app first)')
+    restore.add_argument('snapshot')
+    restore.add_argument('--to', help='database file to replace (default: derived from the snapshot name)')
+    args = parser.parse_args(argv)
+
+    service = BackupService(args.dir, keep=int(os.getenv('BACKUP_KEEP', '7')))
+    try:
+        if args.command == 'create':
+            service.databases = {
+                'app': os.path.join(DATABASE_DIR, 'app.db'),
+                'archive': os.getenv('ARCHIVE_DB_PATH') or os.path.join(DATABASE_DIR, 'archive.db')
+            }
+            for snapshot in service.create()['snapshots']:
+                print(f"{snapshot['file']}: {snapshot['bytes']} -> {snapshot['compressed_bytes']} bytes "
+                      f"in {snapshot['seconds']}s ({snapshot['steps']} steps, {snapshot['restarts']} restarts)")
+        elif args.command == 'list':
+            for snapshot in service.list_snapshots():
+                print(f"{snapshot['file']}  {snapshot['compressed_bytes']} bytes  {snapshot['created_at']}")
+        elif args.command == 'verify':
+            print(f'OK {verify_snapshot(args.snapshot)}')
+        elif args.command == 'restore':
+            result = restore_snapshot(args.snapshot, args.to or _default_target(args.snapshot))
+            print(f"Restored {result['restored']} (sha256 {result['sha256']})")
+            for path in result['previous']:
+                print(f'Previous file kept as {path}')
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+backup_service = BackupService(
+    os.getenv('BACKUP_DIR') or None,
+    keep=int(os.getenv('BACKUP_KEEP', '7')),
+    interval=float(os.getenv('BACKUP_INTERVAL_SECONDS', '86400'))
+)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import copy
+import json
+import os
+import queue
+import threading
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'category_model')
+
+# Fixed label set: partial_fit needs every class up front
+CATEGORIES = [
+    'business', 'entertainment', 'general', 'health',
+    'politics', 'science', 'sports', 'technology'
+]
+
+
+class CategoryLearner:
+    """Category classifier that learns online from editorial corrections.
+
+    Text is hashed (no vocabulary to re-fit) and fed to a logistic-loss
+    SGD model with ``partial_fit``. Corrections are queued by the request
+    path and applied in batches by a background worker. After each batch
+    the model is written as a new numbered snapshot, keeping the last
+    ``keep_versions``. Updates are copy-on-write: a batch is fitted on a
+    copy of the model and swapped in, so predictions only wait for the
+    swap, never for training or the snapshot write. Predictions are only served once the model has seen
+    ``min_examples`` corrections covering at least two categories.
+    """
+
+    def __init__(self, model_dir: str = DEFAULT_MODEL_DIR, min_examples: int = 20,
+                 min_confidence: float = 0.5, batch_size: int = 64, flush_interval: float = 5.0,
+                 keep_versions: int = 5):
+        self.model_dir = model_dir
+        self.min_examples = min_examples
+        self.min_confidence = min_confidence
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.keep_versions = keep_versions
+
+        self.vectorizer = HashingVectorizer(
+            n_features=2 ** 18, ngram_range=(1, 2), alternate_sign=False,
+            stop_words='english', norm='l2'
+        )
+        self.classes = np.array(CATEGORIES)
+        self.model = None
+        self.version = 0
+        self.examples = 0
+        self.class_counts: Dict[str, int] = {}
+
+        self._lock = threading.Lock()
+        # Serializes learn() calls; the model in use is only replaced, never modified
+        self._learn_lock = threading.Lock()
+        self._queue: 'queue.Queue[Tuple[str, str]]' = queue.Queue(maxsize=10_000)
+        self._thread = None
+        self.stats = {'queued': 0, 'ignored': 0, 'learned': 0, 'batches': 0}
+
+        self._load_latest()
+
+    def init_app(self, app):
+        """Start the background trainer"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='category-learner', daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def text_for(title: str, content: Optional[str]) -> str:
+        # Titles carry most of the topic signal; count them twice
+        return f"{title} {title} {content or ''}"
+
+    def record_correction(self, title: str, content: Optional[str], category: str):
+        """Queue an editor-confirmed (text, category) example"""
+        if category not in CATEGORIES:
+            self.stats['ignored'] += 1
+            return
+        try:
+            self._queue.put_nowait((self.text_for(title, content), category))
+            self.stats['queued'] += 1
+        except queue.Full:
+            self.stats['ignored'] += 1
+
+    def is_ready(self) -> bool:
+        return (self.model is not None and self.examples >= self.min_examples
+                and sum(1 for count in self.class_counts.values() if count) >= 2)
+
+    def predict_batch(self, texts: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """(category, probability) per text, or None where the model isn't confident enough"""
+        if not texts:
+            return []
+        with self._lock:
+            if not self.is_ready():
+                return [None] * len(texts)
+            probabilities = self.model.predict_proba(self.vectorizer.transform(texts))
+
+        best = probabilities.argmax(axis=1)
+        return [
+            (str(self.classes[index]), float(p[index])) if p[index] >= self.min_confidence else None
+            for index, p in zip(best, probabilities)
+        ]
+
+    def learn(self, examples: List[Tuple[str, str]]):
+        """Apply one batch of examples and snapshot the result"""
+        if not examples:
+            return
+        texts, labels = zip(*examples)
+        features = self.vectorizer.transform(texts)
+
+        with self._learn_lock:
+            if self.model is None:
+                model = SGDClassifier(loss='log_loss', alpha=1e-5, random_state=0)
+            else:
+                model = copy.deepcopy(self.model)
+            model.partial_fit(features, np.array(labels), classes=self.classes)
+            class_counts = dict(self.class_counts)
+            for label in labels:
+                class_counts[label] = class_counts.get(label, 0) + 1
+
+            with self._lock:
+                self.model = model
+                self.examples += len(examples)
+                self.class_counts = class_counts
+                self.version += 1
+                version, examples_seen = self.version, self.examples
+
+            self._save_snapshot(version, model, examples_seen, class_counts)
+
+        self.stats['learned'] += len(examples)
+        self.stats['batches'] += 1
+
+    def status(self) -> Dict:
+        return {
+            'ready': self.is_ready(),
+            'version': self.version,
+            'examples': self.examples,
+            'class_counts': self.class_counts,
+            'pending': self._queue.qsize(),
+            **self.stats
+        }
+
+    def _run(self):
+        while True:
+            examples = []
+            try:
+                examples.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                continue
+            while len(examples) < self.batch_size:
+                try:
+                    examples.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.learn(examples)
+            except Exception as e:
+                print(f"Error updating category model: {e}")
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.model_dir, 'manifest.json')
+
+    def _save_snapshot(self, version: int, model, examples: int, class_counts: Dict[str, int]):
+        os.makedirs(self.model_dir, exist_ok=True)
+        filename = f'category-v{version:06d}.joblib'
+        joblib.dump({
+            'model': model,
+            'examples': examples,
+            'class_counts': class_counts
+        }, os.path.join(self.model_dir, filename))
+
+        manifest = self._read_manifest()
+        manifest['current'] = version
+        manifest['versions'].append({
+            'version': version,
+            'file': filename,
+            'examples': examples,
+            'created_at': datetime.utcnow().isoformat()
+        })
+        for old in manifest['versions'][:-self.keep_versions]:
+            path = os.path.join(self.model_dir, old['file'])
+            if os.path.exists(path):
+                os.remove(path)
+        manifest['versions'] = manifest['versions'][-self.keep_versions:]
+
+        with open(self._manifest_path() + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self._manifest_path() + '.tmp', self._manifest_path())
+
+    def _read_manifest(self) -> Dict:
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        return {'current': 0, 'versions': []}
+
+    def _load_latest(self):
+        manifest = self._read_manifest()
+        # Version numbers keep increasing even if we fall back to an older snapshot
+        self.version = manifest['current']
+        for entry in reversed(manifest['versions']):
+            try:
+                state = joblib.load(os.path.join(self.model_dir, entry['file']))
+            except Exception as e:
+                print(f"Could not load category model v{entry['version']}: {e}")
+                continue
+            self.model = state['model']
+            self.examples = state['examples']
+            self.class_counts = state['class_counts']
+            return
+
+
+category_learner = CategoryLearner()
@@ -0,0 +1,340 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import ipaddress
+import socket
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+from src.models.user import db
+from src.models.article import Article
+from src.services.article_events import article_events, ARTICLE_UPDATED
+
+USER_AGENT = 'NewsAI-Enricher/1.0'
+
+# Elements that never hold article body text
+_BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'figure', 'iframe']
+
+
+def extract_main_text(html: str, min_paragraph_chars: int = 40) -> str:
+    """Pull the main body text out of an article page.
+
+    Uses the page's <article> element when there is one; otherwise picks
+    the element whose direct <p> children hold the most text, which is
+    where the body lives on most news templates.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+
+    container = soup.find('article')
+    if container is None:
+        scores = {}
+        for paragraph in soup.find_all('p'):
+            parent = paragraph.parent
+            scores[parent] = scores.get(parent, 0) + len(paragraph.get_text(strip=True))
+        if not scores:
+            return ''
+        container = max(scores, key=scores.get)
+
+    paragraphs = [
+        p.get_text(' ', strip=True) for p in container.find_all('p')
+    ]
+    return '\n\n'.join(p for p in paragraphs if len(p) >= min_paragraph_chars)
+
+
+def is_public_address(address: str) -> bool:
+    """False for private, loopback, link-local, reserved and other non-internet addresses"""
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def host_is_public(host: str) -> bool:
+    """True if every address ``host`` resolves to is public (False if it doesn't resolve)"""
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return False
+    return bool(infos) and all(is_public_address(info[4][0]) for info in infos)
+
+
+class _PublicOnlyMixin:
+    """Checks the address a socket actually connected to.
+
+    Article URLs come from clients, so a page fetch must not reach the
+    server's own network. Checking the connected peer (rather than only a
+    lookup beforehand) covers every redirect hop and DNS answers that
+    change between the check and the connect.
+    """
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        address = sock.getpeername()[0]
+        if not is_public_address(address):
+            sock.close()
+            raise NewConnectionError(self, f'Refusing to fetch from non-public address {address}')
+        return sock
+
+
+class _PublicHTTPConnection(_PublicOnlyMixin, HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicOnlyMixin, HTTPSConnection):
+    pass
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class _PublicOnlyAdapter(HTTPAdapter):
+    """A requests adapter whose connections refuse non-public peers"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _PublicHTTPConnectionPool,
+            'https': _PublicHTTPSConnectionPool
+        }
+
+
+class _HostLimiter:
+    """Per-host concurrency cap plus a minimum interval between request starts"""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self.slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self.slots.release()
+
+
+class ContentEnricher:
+    """Fetches full article pages to replace NewsAPI's truncated content.
+
+    Pages are fetched by a bounded global worker pool, with a per-host
+    concurrency cap and request rate, robots.txt rules (cached per host),
+    and conditional GETs using each article's stored ETag/Last-Modified.
+    Enriched articles have their analysis cleared so the next analysis run
+    picks them up again. Only public internet addresses are fetched, on
+    every hop. Runs started from the API go to a background thread
+    (``start``), since a pass is paced per host and can take minutes.
+    """
+
+    def __init__(self, max_workers: int = 8, per_host_concurrency: int = 2,
+                 per_host_interval: float = 1.0, timeout: float = 10.0,
+                 robots_ttl: float = 3600.0, max_page_bytes: int = 2_000_000):
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+        self.robots_ttl = robots_ttl
+        self.max_page_bytes = max_page_bytes
+
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = USER_AGENT
+        adapter = _PublicOnlyAdapter()
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._hosts: Dict[str, _HostLimiter] = {}
+        self._robots: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+        self._run_lock = threading.Lock()
+        self._run_thread = None
+        self._run_started: Optional[datetime] = None
+        self.last_run: Optional[Dict] = None
+
+    def _host_limiter(self, host: str) -> _HostLimiter:
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = _HostLimiter(self.per_host_concurrency, self.per_host_interval)
+                self._hosts[host] = limiter
+            return limiter
+
+    def _robots_allows(self, url: str) -> bool:
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._robots.get(origin)
+        if cached is not None and cached[0] > now:
+            return cached[1].can_fetch(USER_AGENT, url)
+
+        parser = RobotFileParser()
+        try:
+            with self._host_limiter(parts.netloc):
+                response = self._session.get(f'{origin}/robots.txt', timeout=self.timeout)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except requests.RequestException:
+            # Unreachable robots.txt: treat like a missing one
+            parser.allow_all = True
+
+        with self._lock:
+            self._robots[origin] = (now + self.robots_ttl, parser)
+        return parser.can_fetch(USER_AGENT, url)
+
+    def fetch_page(self, url: str, etag: Optional[str] = None,
+                   last_modified: Optional[str] = None) -> Dict:
+        """Fetch and extract one page. Returns a result dict with a ``status`` key"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return {'status': 'skipped'}
+        # Early out; the connection-level check is what enforces it (redirects, DNS changes)
+        if not host_is_public(parts.hostname):
+            return {'status': 'blocked'}
+        if not self._robots_allows(url):
+            return {'status': 'disallowed'}
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            with self._host_limiter(parts.netloc):
+                response = self._session.get(url, headers=headers, timeout=self.timeout, stream=True)
+                try:
+                    if response.status_code == 304:
+                        return {'status': 'not_modified'}
+                    response.raise_for_status()
+                    if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                        return {'status': 'skipped'}
+                    body = response.raw.read(self.max_page_bytes + 1, decode_content=True)
+                finally:
+                    response.close()
+        except requests.RequestException as e:
+            return {'status': 'error', 'error': str(e)}
+
+        if len(body) > self.max_page_bytes:
+            return {'status': 'skipped'}
+
+        # requests falls back to ISO-8859-1 for text/* without a charset; most pages are UTF-8
+        content_type = response.headers.get('Content-Type', '')
+        encoding = response.encoding if 'charset' in content_type.lower() else 'utf-8'
+        text = extract_main_text(body.decode(encoding, errors='replace'))
+        return {
+            'status': 'fetched',
+            'text': text,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+
+    def enrich(self, article_ids: Optional[List[int]] = None, limit: int = 50) -> Dict:
+        """Enrich stored articles (by id, or the newest not-yet-enriched ones)"""
+        started = time.perf_counter()
+        query = Article.query
+        if article_ids:
+            query = query.filter(Article.id.in_(article_ids))
+        else:
+            query = query.filter(Article.enriched_at.is_(None))
+        articles = query.order_by(Article.published_date.desc()).limit(limit).all()
+
+        stats = {'requested': len(articles), 'updated': 0, 'fetched': 0, 'not_modified': 0,
+                 'disallowed': 0, 'skipped': 0, 'blocked': 0, 'error': 0}
+        by_id = {article.id: article for article in articles}
+        updated = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_page, a.url, a.http_etag, a.http_last_modified): a.id
+                for a in articles
+            }
+            for future in as_completed(futures):
+                article = by_id[futures[future]]
+                result = future.result()
+                stats[result['status']] += 1
+                article.enriched_at = datetime.utcnow()
+
+                if result['status'] != 'fetched':
+                    continue
+                article.http_etag = result['etag']
+                article.http_last_modified = result['last_modified']
+                # Only replace content when the page gave us more than the API did
+                if len(result['text']) > len(article.content or ''):
+                    article.content = result['text']
+                    # Queue for re-analysis on the full text
+                    article.sentiment = None
+                    article.summary = None
+                    updated.append(article)
+
+        db.session.commit()
+        article_events.publish(ARTICLE_UPDATED, updated)
+
+        elapsed = time.perf_counter() - started
+        stats['updated'] = len(updated)
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['pages_per_second'] = round(len(articles) / elapsed, 2) if elapsed > 0 else 0.0
+        return stats
+
+    def start(self, app, article_ids: Optional[List[int]] = None, limit: int = 50) -> bool:
+        """Run ``enrich`` in a background thread. Returns False if a run is already going"""
+        with self._run_lock:
+            if self.is_running():
+                return False
+            self._run_started = datetime.utcnow()
+            self._run_thread = threading.Thread(
+                target=self._run, args=(app, article_ids, limit), name='content-enricher', daemon=True
+            )
+            self._run_thread.start()
+        return True
+
+    def is_running(self) -> bool:
+        return self._run_thread is not None and self._run_thread.is_alive()
+
+    def status(self) -> Dict:
+        return {
+            'running': self.is_running(),
+            'started_at': self._run_started.isoformat() if self._run_started else None,
+            'last_run': self.last_run
+        }
+
+    def _run(self, app, article_ids: Optional[List[int]], limit: int):
+        with app.app_context():
+            try:
+                self.last_run = self.enrich(article_ids=article_ids, limit=limit)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error enriching articles: {e}")
+                self.last_run = {'error': str(e)}
+            finally:
+                db.session.remove()
+
+
+content_enricher = ContentEnricher()
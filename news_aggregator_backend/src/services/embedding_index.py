@@ -0,0 +1,430 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from src.models.user import db
+from src.models.article import Article
+from src.models.compression import decompress_text
+from src.services.article_events import (
+    article_events, ARTICLE_CREATED, ARTICLE_UPDATED, ARTICLE_DELETED
+)
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'embeddings')
+
+# Characters of body text embedded after the title; small encoders truncate anyway
+EMBED_CONTENT_CHARS = 1000
+
+
+class TextEncoder:
+    """Sentence embeddings from a local transformers checkpoint (mean-pooled, L2-normalized).
+
+    The model is loaded lazily from ``model_path`` with ``local_files_only``,
+    so nothing is ever downloaded. torch and transformers are optional:
+    without them (or without a model path) ``available()`` is False and the
+    semantic endpoints report that they're not configured.
+    """
+
+    def __init__(self, model_path: Optional[str], batch_size: int = 32, max_length: int = 256,
+                 num_threads: Optional[int] = None):
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.num_threads = num_threads
+
+        self.error = None
+        self._model = None
+        self._tokenizer = None
+        self._torch = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self._load()
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(os.path.normpath(self.model_path)) if self.model_path else ''
+
+    @property
+    def dim(self) -> int:
+        self._load()
+        return self._model.config.hidden_size
+
+    def _load(self) -> bool:
+        if self._model is not None:
+            return True
+        if self.error is not None:
+            return False
+
+        with self._lock:
+            if self._model is not None:
+                return True
+            if not self.model_path or not os.path.isdir(self.model_path):
+                self.error = 'EMBEDDING_MODEL_PATH is not set to a local model directory'
+                return False
+            try:
+                import torch
+                from transformers import AutoModel, AutoTokenizer
+            except ImportError as e:
+                self.error = f'Embedding dependencies are not installed: {e}'
+                return False
+
+            try:
+                if self.num_threads:
+                    torch.set_num_threads(self.num_threads)
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_path, local_files_only=True)
+                model = AutoModel.from_pretrained(self.model_path, local_files_only=True)
+                model.eval()
+                self._torch = torch
+                self._model = model
+                return True
+            except Exception as e:
+                self.error = f'Could not load embedding model from {self.model_path}: {e}'
+                print(self.error)
+                return False
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into an (n, dim) float32 matrix of unit vectors"""
+        if not self._load():
+            raise RuntimeError(self.error)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        torch = self._torch
+        # Batch similar lengths together to keep padding small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                inputs = self._tokenizer(
+                    [texts[i] or '' for i in batch], padding=True, truncation=True,
+                    max_length=self.max_length, return_tensors='pt'
+                )
+                hidden = self._model(**inputs).last_hidden_state
+                mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, dim=1)
+                out[batch] = pooled.numpy()
+
+        return out
+
+
+class VectorStore:
+    """Unit vectors in a float16 memory-mapped matrix, with an article id per row.
+
+    Rows are appended; re-embedding an article overwrites its row and
+    deleting one tombstones it (id -1). Search is an exact chunked
+    dot-product scan, or an hnswlib graph once the store has at least
+    ``ann_threshold`` rows and hnswlib is installed.
+    """
+
+    def __init__(self, directory: str, dim: int, model: str, ann_threshold: int = 50_000,
+                 search_chunk: int = 1024):
+        self.directory = directory
+        self.dim = dim
+        self.model = model
+        self.ann_threshold = ann_threshold
+        self.search_chunk = search_chunk
+
+        self._lock = threading.RLock()
+        self.count = 0
+        self.capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._rows: Dict[int, int] = {}
+        self._ann = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self):
+        meta = None
+        if os.path.exists(self._path('meta.json')):
+            with open(self._path('meta.json')) as f:
+                meta = json.load(f)
+
+        # Vectors from another model (or size) can't be compared with ours; start over
+        if meta is None or meta.get('dim') != self.dim or meta.get('model') != self.model:
+            for name in ('vectors.f16', 'ids.i64'):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self.count = 0
+            self._resize(1024)
+            self._save_meta()
+            return
+
+        self.count = meta['count']
+        self.capacity = meta['capacity']
+        self._map_files()
+        ids = np.asarray(self._ids[:self.count])
+        self._rows = {int(article_id): row for row, article_id in enumerate(ids.tolist()) if article_id >= 0}
+
+    def _map_files(self):
+        self._vectors = np.memmap(self._path('vectors.f16'), dtype=np.float16, mode='r+',
+                                  shape=(self.capacity, self.dim))
+        self._ids = np.memmap(self._path('ids.i64'), dtype=np.int64, mode='r+', shape=(self.capacity,))
+
+    def _resize(self, capacity: int):
+        """Grow the backing files in place and re-map them"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._ids.flush()
+        for name, row_bytes in (('vectors.f16', self.dim * 2), ('ids.i64', 8)):
+            with open(self._path(name), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+
+        old_capacity, self.capacity = self.capacity, capacity
+        self._map_files()
+        # New id slots must read as tombstones, not article 0
+        self._ids[old_capacity:] = -1
+
+    def _save_meta(self):
+        with open(self._path('meta.json.tmp'), 'w') as f:
+            json.dump({'dim': self.dim, 'model': self.model, 'count': self.count,
+                       'capacity': self.capacity}, f)
+        os.replace(self._path('meta.json.tmp'), self._path('meta.json'))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._rows
+
+    def get(self, article_id: int) -> Optional[np.ndarray]:
+        row = self._rows.get(article_id)
+        return None if row is None else np.asarray(self._vectors[row], dtype=np.float32)
+
+    def add(self, article_ids: List[int], vectors: np.ndarray):
+        with self._lock:
+            rows = []
+            for article_id in article_ids:
+                row = self._rows.get(article_id)
+                if row is None:
+                    if self.count == self.capacity:
+                        self._resize(self.capacity * 2)
+                    row = self.count
+                    self.count += 1
+                    self._rows[article_id] = row
+                    self._ids[row] = article_id
+                rows.append(row)
+
+            self._vectors[rows] = vectors.astype(np.float16)
+            self._vectors.flush()
+            self._ids.flush()
+            self._save_meta()
+
+            if self._ann is not None:
+                self._ann_add(article_ids, vectors)
+
+    def remove(self, article_ids: Iterable[int]):
+        with self._lock:
+            for article_id in article_ids:
+                row = self._rows.pop(article_id, None)
+                if row is None:
+                    continue
+                self._ids[row] = -1
+                if self._ann is not None:
+                    try:
+                        self._ann.mark_deleted(article_id)
+                    except RuntimeError:
+                        pass
+            self._ids.flush()
+
+    def search(self, query: np.ndarray, k: int, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Top-k (article_id, cosine similarity) pairs for a unit query vector"""
+        if not self._rows:
+            return []
+        want = k + (1 if exclude is not None else 0)
+        if self._ann is not None:
+            with self._lock:
+                hits = self._search_ann(query, want)
+        else:
+            hits = self.search_exact(query, want)
+        return [(article_id, score) for article_id, score in hits if article_id != exclude][:k]
+
+    def search_exact(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Brute-force scan: small float16 chunks are widened into a reused buffer and scored with BLAS"""
+        query = np.asarray(query, dtype=np.float32)
+
+        with self._lock:
+            count = self.count
+            scores = np.empty(count, dtype=np.float32)
+            buffer = np.empty((min(self.search_chunk, count), self.dim), dtype=np.float32)
+            for start in range(0, count, self.search_chunk):
+                end = min(start + self.search_chunk, count)
+                block = buffer[:end - start]
+                np.copyto(block, self._vectors[start:end])
+                np.dot(block, query, out=scores[start:end])
+            ids = np.asarray(self._ids[:count])
+
+        scores[ids < 0] = -np.inf
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def build_ann(self) -> bool:
+        """Build the hnswlib graph over the stored vectors. False if hnswlib isn't installed.
+
+        The graph isn't persisted; it's rebuilt at startup once the store is
+        large enough. Rows are read without holding the lock, and anything
+        added or removed meanwhile is applied before the graph is swapped in.
+        """
+        try:
+            import hnswlib
+        except ImportError:
+            return False
+
+        with self._lock:
+            built_count = self.count
+            capacity = self.capacity
+
+        index = hnswlib.Index(space='ip', dim=self.dim)
+        index.init_index(max_elements=capacity, ef_construction=200, M=16, allow_replace_deleted=True)
+        for start in range(0, built_count, self.search_chunk):
+            end = min(start + self.search_chunk, built_count)
+            ids = np.asarray(self._ids[start:end])
+            live = ids >= 0
+            if live.any():
+                index.add_items(np.asarray(self._vectors[start:end], dtype=np.float32)[live], ids[live])
+        index.set_ef(128)
+
+        with self._lock:
+            self._ann = index
+            new_ids = np.asarray(self._ids[built_count:self.count])
+            live = new_ids >= 0
+            if live.any():
+                vectors = np.asarray(self._vectors[built_count:self.count], dtype=np.float32)[live]
+                self._ann_add(new_ids[live].tolist(), vectors)
+            for label in index.get_ids_list():
+                if label not in self._rows:
+                    index.mark_deleted(label)
+        return True
+
+    def _ann_add(self, article_ids: List[int], vectors: np.ndarray):
+        if self._ann.get_max_elements() < self.capacity:
+            self._ann.resize_index(self.capacity)
+        self._ann.add_items(vectors.astype(np.float32), np.asarray(article_ids, dtype=np.int64),
+                            replace_deleted=True)
+
+    def _search_ann(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        k = min(k, len(self._rows))
+        labels, distances = self._ann.knn_query(np.asarray(query, dtype=np.float32).reshape(1, -1), k=k)
+        # hnswlib's inner-product "distance" is 1 - dot
+        return [(int(label), float(1.0 - distance)) for label, distance in zip(labels[0], distances[0])]
+
+
+class SemanticIndex:
+    """Keeps article embeddings current and answers related/semantic-search queries.
+
+    New and updated articles are queued by the article event listeners and
+    embedded in batches by a background worker; on startup the worker also
+    backfills any stored articles that have no vector yet.
+    """
+
+    def __init__(self, encoder: TextEncoder, directory: str = DEFAULT_INDEX_DIR,
+                 backfill_batch: int = 256, max_queue: int = 10_000):
+        self.encoder = encoder
+        self.directory = directory
+        self.backfill_batch = backfill_batch
+
+        self.app = None
+        self.store: Optional[VectorStore] = None
+        self._queue: 'queue.Queue[Tuple[int, str]]' = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def init_app(self, app):
+        """Bind to the Flask app and start the embedding worker (if a model is configured)"""
+        self.app = app
+        if self._thread is not None or not self.encoder.available():
+            return
+        self.store = VectorStore(self.directory, self.encoder.dim, self.encoder.name)
+        self._thread = threading.Thread(target=self._run, name='embedding-worker', daemon=True)
+        self._thread.start()
+
+    def available(self) -> bool:
+        return self.store is not None
+
+    @staticmethod
+    def article_text(title: str, content: Optional[str]) -> str:
+        return f"{title}. {(content or '')[:EMBED_CONTENT_CHARS]}"
+
+    def enqueue_articles(self, articles: Iterable[Article]):
+        if self.store is None:
+            return
+        for article in articles:
+            try:
+                self._queue.put_nowait((article.id, self.article_text(article.title, article.content)))
+            except queue.Full:
+                # The startup backfill picks it up next time
+                print(f"Embedding queue full, skipping article {article.id}")
+
+    def remove_articles(self, articles: Iterable[Article]):
+        if self.store is not None:
+            self.store.remove([article.id for article in articles])
+
+    def related(self, article: Article, limit: int = 10) -> List[Tuple[int, float]]:
+        vector = self.store.get(article.id)
+        if vector is None:
+            vector = self.encoder.encode([self.article_text(article.title, article.content)])[0]
+            self.store.add([article.id], vector[None, :])
+        return self.store.search(vector, limit, exclude=article.id)
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        return self.store.search(self.encoder.encode([query])[0], limit)
+
+    def _run(self):
+        try:
+            self._backfill()
+            if len(self.store) >= self.store.ann_threshold:
+                self.store.build_ann()
+        except Exception as e:
+            print(f"Embedding backfill failed: {e}")
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.encoder.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._embed(batch)
+            except Exception as e:
+                print(f"Error embedding articles: {e}")
+
+    def _embed(self, items: List[Tuple[int, str]]):
+        latest = dict(items)
+        ids = list(latest)
+        self.store.add(ids, self.encoder.encode([latest[i] for i in ids]))
+
+    def _backfill(self):
+        with self.app.app_context():
+            last_id = 0
+            while True:
+                rows = db.session.query(Article.id, Article.title, Article.content_data).filter(
+                    Article.id > last_id
+                ).order_by(Article.id).limit(self.backfill_batch).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                missing = [
+                    (article_id, self.article_text(title, decompress_text(content)))
+                    for article_id, title, content in rows if article_id not in self.store
+                ]
+                if missing:
+                    self._embed(missing)
+
+
+semantic_index = SemanticIndex(TextEncoder(os.getenv('EMBEDDING_MODEL_PATH')))
+article_events.subscribe(ARTICLE_CREATED, semantic_index.enqueue_articles)
+article_events.subscribe(ARTICLE_UPDATED, semantic_index.enqueue_articles)
+article_events.subscribe(ARTICLE_DELETED, semantic_index.remove_articles)
@@ -0,0 +1,356 @@
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+import threading
+import time
+
+from src.models.user import db
+from src.models.article import Article
+from src.models.user_interest import UserInterest
+from src.models.reading_history import ReadingHistory
+from src.models.compression import decompress_text
+from src.services.ai_analyzer import NewsAIAnalyzer
+from src.services.article_events import (
+    article_events, ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_UPDATED, ARTICLE_DELETED
+)
+
+# Scoring weights for the different kinds of interest match
+KEYWORD_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.5
+SOURCE_WEIGHT = 1.0
+
+
+class _IndexedArticle:
+    """Compact per-article record kept in the feed index"""
+
+    __slots__ = ('id', 'category', 'source', 'published_ts', 'terms')
+
+    def __init__(self, id: int, category: Optional[str], source: Optional[str],
+                 published_ts: float, terms: frozenset):
+        self.id = id
+        self.category = category
+        self.source = source
+        self.published_ts = published_ts
+        self.terms = terms
+
+
+class _UserProfile:
+    """A user's interests compiled into stemmed term sets, plus cached candidates"""
+
+    __slots__ = ('keywords', 'terms', 'categories', 'sources', 'candidates')
+
+    def __init__(self, keywords: List[Tuple[str, ...]], categories: Set[str], sources: Set[str]):
+        self.keywords = keywords
+        self.terms = {term for keyword in keywords for term in keyword}
+        self.categories = categories
+        self.sources = sources
+        # article id -> base score (recency is applied at read time)
+        self.candidates: Dict[int, float] = {}
+
+
+class FeedEngine:
+    """Personalized feed generation over an in-memory inverted index.
+
+    The index maps stemmed terms to the ids of recent articles. Each active
+    user has a cached candidate set that is scored once when the user is
+    first seen and then kept up to date as new articles are indexed, so a
+    feed request only has to rank cached candidates.
+    """
+
+    def __init__(self, analyzer: NewsAIAnalyzer = None, window_days: int = 14,
+                 max_articles: int = 100_000, max_cached_users: int = 10_000,
+                 max_candidates: int = 1_000, half_life_hours: float = 48.0):
+        self.analyzer = analyzer
+        self.window_days = window_days
+        self.max_articles = max_articles
+        self.max_cached_users = max_cached_users
+        self.max_candidates = max_candidates
+        self.half_life_hours = half_life_hours
+
+        self._lock = threading.RLock()
+        self._built = False
+        self._articles: Dict[int, _IndexedArticle] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._by_category: Dict[str, Set[int]] = defaultdict(set)
+        self._by_source: Dict[str, Set[int]] = defaultdict(set)
+
+        # Per-user candidate cache (LRU) and reverse maps used to route a
+        # newly indexed article only to users it can possibly match
+        self._profiles: 'OrderedDict[int, _UserProfile]' = OrderedDict()
+        self._term_users: Dict[str, Set[int]] = defaultdict(set)
+        self._category_users: Dict[str, Set[int]] = defaultdict(set)
+        self._source_users: Dict[str, Set[int]] = defaultdict(set)
+        # article id -> cached users holding it as a candidate, so removing
+        # an article doesn't have to visit every profile
+        self._candidate_users: Dict[int, Set[int]] = defaultdict(set)
+
+    def _get_analyzer(self) -> NewsAIAnalyzer:
+        if self.analyzer is None:
+            self.analyzer = NewsAIAnalyzer()
+        return self.analyzer
+
+    def build(self):
+        """(Re)build the inverted index from recent articles in the database"""
+        cutoff = datetime.utcnow() - timedelta(days=self.window_days)
+        rows = db.session.query(
+            Article.id, Article.title, Article.content_data, Article.category,
+            Article.source, Article.published_date
+        ).filter(
+            Article.published_date >= cutoff
+        ).order_by(Article.published_date.desc()).limit(self.max_articles).all()
+
+        with self._lock:
+            self._articles.clear()
+            self._postings.clear()
+            self._by_category.clear()
+            self._by_source.clear()
+            self._clear_profiles()
+            for id, title, content_data, category, source, published_date in rows:
+                self._add_to_index(self._make_record(
+                    id, title, decompress_text(content_data), category, source, published_date
+                ))
+            self._built = True
+
+    def ensure_built(self):
+        if not self._built:
+            self.build()
+
+    def index_articles(self, articles: Iterable[Article]):
+        """Add newly stored articles to the index and to matching users' candidates"""
+        if not self._built:
+            # Picked up from the database when the index is first built
+            return
+
+        records = [
+            self._make_record(a.id, a.title, a.content, a.category, a.source, a.published_date)
+            for a in articles
+        ]
+
+        with self._lock:
+            for record in records:
+                self.remove_article(record.id)
+                self._add_to_index(record)
+                for user_id in self._interested_users(record):
+                    profile = self._profiles[user_id]
+                    score = self._base_score(profile, record)
+                    if score > 0:
+                        profile.candidates[record.id] = score
+                        self._candidate_users[record.id].add(user_id)
+                        self._trim_candidates(user_id, profile)
+            self._prune()
+
+    def remove_article(self, article_id: int):
+        """Drop an article from the index and from the cached candidate sets holding it"""
+        with self._lock:
+            record = self._articles.pop(article_id, None)
+            if record is None:
+                return
+            for term in record.terms:
+                self._discard(self._postings, term, article_id)
+            self._discard(self._by_category, record.category, article_id)
+            self._discard(self._by_source, record.source, article_id)
+            for user_id in self._candidate_users.pop(article_id, ()):
+                self._profiles[user_id].candidates.pop(article_id, None)
+
+    def remove_articles(self, articles: Iterable[Article]):
+        for article in articles:
+            self.remove_article(article.id)
+
+    def _make_record(self, id, title, content, category, source, published_date) -> _IndexedArticle:
+        terms = frozenset(self._get_analyzer().extract_terms(f"{title} {content or ''}"))
+        published_date = published_date or datetime.utcnow()
+        if published_date.tzinfo is None:
+            # Stored datetimes are naive UTC
+            published_date = published_date.replace(tzinfo=timezone.utc)
+        published_ts = published_date.timestamp()
+        return _IndexedArticle(id, category, source, published_ts, terms)
+
+    def _add_to_index(self, record: _IndexedArticle):
+        self._articles[record.id] = record
+        for term in record.terms:
+            self._postings[term].add(record.id)
+        if record.category:
+            self._by_category[record.category].add(record.id)
+        if record.source:
+            self._by_source[record.source].add(record.id)
+
+    def _prune(self):
+        """Keep the index bounded by evicting the oldest articles"""
+        excess = len(self._articles) - self.max_articles
+        if excess <= 0:
+            return
+        oldest = heapq.nsmallest(excess, self._articles.values(), key=lambda r: r.published_ts)
+        for record in oldest:
+            self.remove_article(record.id)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], key, value):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(value)
+            if not ids:
+                del index[key]
+
+    def invalidate_user(self, user_id: int):
+        """Forget a user's cached profile (call when their interests change)"""
+        with self._lock:
+            profile = self._profiles.pop(user_id, None)
+            if profile is not None:
+                self._unregister(user_id, profile)
+
+    def _clear_profiles(self):
+        self._profiles.clear()
+        self._term_users.clear()
+        self._category_users.clear()
+        self._source_users.clear()
+        self._candidate_users.clear()
+
+    def _get_profile(self, user_id: int) -> _UserProfile:
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            if profile is not None:
+                self._profiles.move_to_end(user_id)
+                return profile
+
+        interests = UserInterest.query.filter_by(user_id=user_id).all()
+        analyzer = self._get_analyzer()
+        keywords = []
+        for interest in interests:
+            terms = tuple(dict.fromkeys(analyzer.extract_terms(interest.keyword)))
+            if terms:
+                keywords.append(terms)
+        profile = _UserProfile(
+            keywords,
+            {i.category for i in interests if i.category},
+            {i.source for i in interests if i.source}
+        )
+
+        with self._lock:
+            self._profiles[user_id] = profile
+            self._register(user_id, profile)
+            self._score_candidates(user_id, profile)
+            while len(self._profiles) > self.max_cached_users:
+                evicted_id, evicted = self._profiles.popitem(last=False)
+                self._unregister(evicted_id, evicted)
+        return profile
+
+    def _register(self, user_id: int, profile: _UserProfile):
+        for term in profile.terms:
+            self._term_users[term].add(user_id)
+        for category in profile.categories:
+            self._category_users[category].add(user_id)
+        for source in profile.sources:
+            self._source_users[source].add(user_id)
+
+    def _unregister(self, user_id: int, profile: _UserProfile):
+        for term in profile.terms:
+            self._discard(self._term_users, term, user_id)
+        for category in profile.categories:
+            self._discard(self._category_users, category, user_id)
+        for source in profile.sources:
+            self._discard(self._source_users, source, user_id)
+        for article_id in profile.candidates:
+            self._discard(self._candidate_users, article_id, user_id)
+
+    def _interested_users(self, record: _IndexedArticle) -> Set[int]:
+        users = set()
+        for term in record.terms:
+            users |= self._term_users.get(term, set())
+        users |= self._category_users.get(record.category, set())
+        users |= self._source_users.get(record.source, set())
+        return users
+
+    def _score_candidates(self, user_id: int, profile: _UserProfile):
+        candidate_ids = set()
+        for term in profile.terms:
+            candidate_ids |= self._postings.get(term, set())
+        for category in profile.categories:
+            candidate_ids |= self._by_category.get(category, set())
+        for source in profile.sources:
+            candidate_ids |= self._by_source.get(source, set())
+
+        for article_id in candidate_ids:
+            score = self._base_score(profile, self._articles[article_id])
+            if score > 0:
+                profile.candidates[article_id] = score
+                self._candidate_users[article_id].add(user_id)
+        self._trim_candidates(user_id, profile)
+
+    def _trim_candidates(self, user_id: int, profile: _UserProfile):
+        # Allow some slack so trimming isn't paid on every insert
+        if len(profile.candidates) <= self.max_candidates * 1.25:
+            return
+        keep = dict(heapq.nlargest(
+            self.max_candidates, profile.candidates.items(),
+            key=lambda item: (item[1], self._articles[item[0]].published_ts)
+        ))
+        for article_id in profile.candidates.keys() - keep.keys():
+            self._discard(self._candidate_users, article_id, user_id)
+        profile.candidates = keep
+
+    @staticmethod
+    def _base_score(profile: _UserProfile, record: _IndexedArticle) -> float:
+        score = 0.0
+        for keyword in profile.keywords:
+            matched = sum(1 for term in keyword if term in record.terms)
+            if matched:
+                score += KEYWORD_WEIGHT * matched / len(keyword)
+        if record.category in profile.categories:
+            score += CATEGORY_WEIGHT
+        if record.source in profile.sources:
+            score += SOURCE_WEIGHT
+        return score
+
+    def get_feed(self, user_id: int, page: int = 1, per_page: int = 20) -> Dict:
+        """Rank a user's cached candidates, excluding articles they've already read"""
+        started = time.perf_counter()
+        self.ensure_built()
+        profile = self._get_profile(user_id)
+
+        read_ids = {
+            row[0] for row in db.session.query(ReadingHistory.article_id).filter(
+                ReadingHistory.user_id == user_id
+            )
+        }
+
+        now = time.time()
+        with self._lock:
+            if profile.candidates:
+                personalized = True
+                scored = (
+                    (base * self._decay(self._articles[aid].published_ts, now), aid)
+                    for aid, base in profile.candidates.items()
+                    if aid not in read_ids
+                )
+            else:
+                # No interests (or no matches yet): fall back to recency
+                personalized = False
+                scored = (
+                    (self._decay(record.published_ts, now), aid)
+                    for aid, record in self._articles.items()
+                    if aid not in read_ids
+                )
+            top = heapq.nlargest(page * per_page, scored)
+
+        page_items = top[(page - 1) * per_page:]
+        scores = {aid: score for score, aid in page_items}
+        articles = Article.query.filter(Article.id.in_(list(scores))).all() if scores else []
+        articles.sort(key=lambda a: scores[a.id], reverse=True)
+
+        return {
+            'articles': [dict(a.to_dict(), score=round(scores[a.id], 4)) for a in articles],
+            'personalized': personalized,
+            'generated_in_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _decay(self, published_ts: float, now: float) -> float:
+        age_hours = max(0.0, (now - published_ts) / 3600)
+        return 0.5 ** (age_hours / self.half_life_hours)
+
+
+feed_engine = FeedEngine()
+article_events.subscribe(ARTICLE_CREATED, feed_engine.index_articles)
+article_events.subscribe(ARTICLE_ANALYZED, feed_engine.index_articles)
+article_events.subscribe(ARTICLE_UPDATED, feed_engine.index_articles)
+article_events.subscribe(ARTICLE_DELETED, feed_engine.remove_articles)
@@ -0,0 +1,169 @@
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import threading
+
+from src.models.article import Article
+from src.services.article_events import (
+    article_events, ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_UPDATED, ARTICLE_DELETED
+)
+
+# Filters the hot set can answer; anything else (search) goes to SQLite
+HOT_FILTERS = ('category', 'source', 'sentiment')
+
+
+def _sort_key(article: Article) -> Tuple[datetime, int]:
+    return (article.published_date or datetime.min, article.id)
+
+
+class HotArticle:
+    """A hot-set entry: the filter fields plus the article's JSON minus its view count.
+
+    ``view_count`` sorts last in the serialized keys, so the fragment is
+    the object up to that key and the live count is appended on output.
+    """
+
+    __slots__ = ('key', 'category', 'source', 'sentiment', 'json', 'view_count')
+
+    def __init__(self, article: Article):
+        data = article.to_dict()
+        self.key = _sort_key(article)
+        self.category = article.category
+        self.source = article.source
+        self.sentiment = article.sentiment
+        self.view_count = data.pop('view_count')
+        # Same encoding as jsonify (sorted keys, compact, ASCII-escaped)
+        self.json = json.dumps(data, sort_keys=True, separators=(',', ':'))[:-1].encode()
+
+    def to_json(self) -> bytes:
+        return b'%s,"view_count":%d}' % (self.json, self.view_count)
+
+
+class HotArticleSet:
+    """The newest ``size`` articles kept pre-serialized, for the first pages of /articles.
+
+    Entries are ``__slots__`` records sorted by (published_date, id), each
+    holding its JSON fragment, so a page is a slice and a byte join with
+    no ORM objects or ``to_dict`` calls. The set always holds an exact
+    prefix of the newest articles: article events insert, replace or
+    drop entries, and once deletions shrink it below half the set is
+    reloaded on the next read. Pages that reach past it are left to the
+    database.
+    """
+
+    def __init__(self, size: int = 500):
+        self.size = size
+        self._lock = threading.Lock()
+        self._built = False
+        # Ascending by key; iterated from the end for newest first
+        self._keys: List[Tuple[datetime, int]] = []
+        self._records: List[HotArticle] = []
+        self._by_id: Dict[int, HotArticle] = {}
+        # True when the set holds every article, so it can also take older ones
+        self._complete = False
+        self.stats = {'hits': 0, 'misses': 0, 'rebuilds': 0}
+
+    def page(self, filters: Dict[str, str], page: int, per_page: int) -> Optional[List[bytes]]:
+        """JSON for one newest-first page of matching articles, or None when the set can't answer"""
+        self._ensure_built()
+        start = (page - 1) * per_page
+        end = start + per_page
+        with self._lock:
+            matches = []
+            for record in reversed(self._records):
+                if all(getattr(record, field) == value for field, value in filters.items()):
+                    matches.append(record)
+                    if len(matches) == end:
+                        break
+            if len(matches) < end and not self._complete:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return [record.to_json() for record in matches[start:end]]
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'size': self.size, 'cached': len(self._records), 'complete': self._complete}
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            articles = Article.query.order_by(
+                Article.published_date.desc(), Article.id.desc()
+            ).limit(self.size).all()
+            records = sorted((HotArticle(article) for article in articles), key=lambda r: r.key)
+            self._records = records
+            self._keys = [record.key for record in records]
+            self._by_id = {record.key[1]: record for record in records}
+            self._complete = len(records) < self.size
+            self._built = True
+            self.stats['rebuilds'] += 1
+
+    def index_articles(self, articles: Iterable[Article]):
+        """Event callback: add or refresh stored, analyzed or updated articles"""
+        with self._lock:
+            if not self._built:
+                return
+            cutoff = self._keys[0] if self._keys and not self._complete else None
+            held = set(self._by_id)
+        # Serialize only what can land in the set (bulk updates mostly touch older articles)
+        records = [
+            HotArticle(article) for article in articles
+            if cutoff is None or article.id in held or _sort_key(article) >= cutoff
+        ]
+        with self._lock:
+            if not self._built:
+                return
+            for record in records:
+                self._remove(record.key[1])
+                # Older than everything held: only kept if the set has every article
+                if self._keys and record.key < self._keys[0] and not self._complete:
+                    continue
+                index = bisect_left(self._keys, record.key)
+                self._keys.insert(index, record.key)
+                self._records.insert(index, record)
+                self._by_id[record.key[1]] = record
+            overflow = len(self._records) - self.size
+            if overflow > 0:
+                for record in self._records[:overflow]:
+                    del self._by_id[record.key[1]]
+                del self._keys[:overflow]
+                del self._records[:overflow]
+                self._complete = False
+
+    def remove_articles(self, articles: Iterable[Article]):
+        ids = [article.id for article in articles]
+        with self._lock:
+            if not self._built:
+                return
+            for article_id in ids:
+                self._remove(article_id)
+            if not self._complete and len(self._records) < self.size // 2:
+                self._built = False
+
+    def add_views(self, views: Dict[int, int]):
+        """Apply a batch of flushed view counts (article id -> new views)"""
+        with self._lock:
+            for article_id, count in views.items():
+                record = self._by_id.get(article_id)
+                if record is not None:
+                    record.view_count += count
+
+    def _remove(self, article_id: int):
+        record = self._by_id.pop(article_id, None)
+        if record is None:
+            return
+        index = bisect_left(self._keys, record.key)
+        del self._keys[index]
+        del self._records[index]
+
+
+hot_articles = HotArticleSet(size=int(os.getenv('HOT_ARTICLES_SIZE', '500')))
+article_events.subscribe(ARTICLE_CREATED, hot_articles.index_articles)
+article_events.subscribe(ARTICLE_ANALYZED, hot_articles.index_articles)
+article_events.subscribe(ARTICLE_UPDATED, hot_articles.index_articles)
+article_events.subscribe(ARTICLE_DELETED, hot_articles.remove_articles)
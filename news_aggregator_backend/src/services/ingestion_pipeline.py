@@ -0,0 +1,312 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+import queue
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.article import Article, db
+from src.services.ai_analyzer import NewsAIAnalyzer
+from src.services.article_store import store_articles
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class Stage:
+    """One pipeline step: a bounded inbox drained by a fixed number of workers.
+
+    ``fn(item)`` returns an iterable of outputs, each pushed into the next
+    stage's inbox. A full downstream inbox blocks the workers, which is
+    what propagates backpressure back towards the fetchers. With
+    ``on_idle``, a worker that waits ``idle_timeout`` seconds without
+    input calls it before waiting again.
+    """
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1, queue_size: int = 100,
+                 on_close: Optional[Callable] = None, on_idle: Optional[Callable] = None,
+                 idle_timeout: float = 1.0):
+        self.name = name
+        self.fn = fn
+        self.on_close = on_close
+        self.on_idle = on_idle
+        self.idle_timeout = idle_timeout
+        self.workers = workers
+        self.inbox: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.next_stage: Optional['Stage'] = None
+        self.app = None
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self, app):
+        self.app = app
+        self.started_at = time.time()
+        self._running = self.workers
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'ingest-{self.name}-{i}', daemon=True).start()
+
+    def close(self):
+        """Signal end of input; one sentinel per worker"""
+        for _ in range(self.workers):
+            self.inbox.put(_DONE)
+
+    def _emit(self, item):
+        with self._lock:
+            self.emitted += 1
+        if self.next_stage is not None:
+            self.next_stage.inbox.put(item)
+
+    def _work(self):
+        with self.app.app_context():
+            while True:
+                try:
+                    item = self.inbox.get(timeout=self.idle_timeout if self.on_idle else None)
+                except queue.Empty:
+                    try:
+                        self.on_idle()
+                    except Exception as e:
+                        with self._lock:
+                            self.errors += 1
+                        print(f"Ingestion stage {self.name} failed while idle: {e}")
+                    continue
+                if item is _DONE:
+                    break
+
+                started = time.perf_counter()
+                try:
+                    for output in self.fn(item) or ():
+                        self._emit(output)
+                except Exception as e:
+                    with self._lock:
+                        self.errors += 1
+                    print(f"Ingestion stage {self.name} failed on an item: {e}")
+                finally:
+                    with self._lock:
+                        self.processed += 1
+                        self.busy_seconds += time.perf_counter() - started
+
+            self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            if self.on_close is not None:
+                try:
+                    self.on_close()
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Ingestion stage {self.name} failed while closing: {e}")
+            self.finished_at = time.time()
+            if self.next_stage is not None:
+                self.next_stage.close()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def stats(self) -> Dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'queue_depth': self.inbox.qsize(),
+            'queue_capacity': self.inbox.maxsize,
+            'processed': self.processed,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'items_per_second': round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'done': self.done
+        }
+
+
+class IngestionPipeline:
+    """fetch -> normalize -> dedupe -> analyze -> batch-store, joined by bounded queues.
+
+    Network-bound fetching, CPU-bound analysis and the single database
+    writer run concurrently, so articles land in the database already
+    categorized, with sentiment, fake-news flag and summary. Only one run
+    is active at a time.
+    """
+
+    def __init__(self, fetcher, analyzer: NewsAIAnalyzer = None,
+                 fetch_workers: int = 2, analyze_workers: int = 4,
+                 store_batch_size: int = 50, store_max_wait: float = 1.0, queue_size: int = 200):
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.fetch_workers = fetch_workers
+        self.analyze_workers = analyze_workers
+        self.store_batch_size = store_batch_size
+        self.store_max_wait = store_max_wait
+        self.queue_size = queue_size
+
+        self._lock = threading.Lock()
+        self._stages: List[Stage] = []
+        self._run_started = None
+        self._seen_urls = set()
+        self._seen_lock = threading.Lock()
+        self._pending: List[Dict] = []
+        self._pending_since = 0.0
+        self.stored = 0
+        self.skipped = 0
+
+    def is_running(self) -> bool:
+        return bool(self._stages) and not self._stages[-1].done
+
+    def run(self, app, sources: Iterable[Dict]) -> bool:
+        """Start a run in the background. Returns False if one is already running"""
+        with self._lock:
+            if self.is_running():
+                return False
+
+            if self.analyzer is None:
+                self.analyzer = NewsAIAnalyzer()
+
+            self._seen_urls = set()
+            self._pending = []
+            self.stored = 0
+            self.skipped = 0
+            self._run_started = datetime.utcnow()
+
+            self._stages = [
+                Stage('fetch', self._fetch, self.fetch_workers, self.queue_size),
+                Stage('normalize', self._normalize, 1, self.queue_size),
+                Stage('dedupe', self._dedupe, 1, self.queue_size),
+                Stage('analyze', self._analyze, self.analyze_workers, self.queue_size),
+                Stage('store', self._store, 1, self.queue_size, on_close=self._flush,
+                      on_idle=self._flush_if_due, idle_timeout=self.store_max_wait),
+            ]
+            for stage, next_stage in zip(self._stages, self._stages[1:]):
+                stage.next_stage = next_stage
+            for stage in self._stages:
+                stage.start(app)
+
+            sources = list(sources)
+            threading.Thread(target=self._feed, args=(sources,), name='ingest-feed', daemon=True).start()
+            return True
+
+    def status(self) -> Dict:
+        return {
+            'running': self.is_running(),
+            'started_at': self._run_started.isoformat() if self._run_started else None,
+            'stored': self.stored,
+            'skipped': self.skipped,
+            'stages': [stage.stats() for stage in self._stages]
+        }
+
+    def _feed(self, sources: List[Dict]):
+        head = self._stages[0]
+        for source in sources:
+            head.inbox.put(source)
+        head.close()
+
+    def _fetch(self, source: Dict):
+        """Yield pages of raw article dicts for one source spec"""
+        kind = source.get('type')
+        if kind == 'sample':
+            yield source['articles']
+        elif kind == 'everything':
+            yield from self.fetcher.iter_everything_newsapi(
+                query=source['query'], language=source.get('language', 'en'),
+                max_articles=source.get('max_articles')
+            )
+        elif kind == 'top-headlines':
+            for page in self.fetcher.iter_newsapi_top_headlines(
+                category=source.get('category'), language=source.get('language', 'en'),
+                max_articles=source.get('max_articles')
+            ):
+                if source.get('category'):
+                    for article in page:
+                        article.setdefault('category', source['category'])
+                yield page
+
+    def _normalize(self, page: List[Dict]):
+        for article in page:
+            if not article.get('url') or not article.get('title'):
+                continue
+            yield {
+                'title': article['title'].strip(),
+                'url': article['url'].strip(),
+                'source': article.get('source') or 'Unknown',
+                'author': article.get('author'),
+                'published_date': article.get('published_date') or datetime.utcnow(),
+                'content': article.get('content') or article.get('description') or '',
+                'category': article.get('category'),
+                'image_url': article.get('image_url')
+            }
+
+    def _dedupe(self, article: Dict):
+        with self._seen_lock:
+            if article['url'] in self._seen_urls:
+                self.skipped += 1
+                return
+            self._seen_urls.add(article['url'])
+
+        if db.session.query(Article.id).filter(Article.url == article['url']).first() is not None:
+            self.skipped += 1
+            return
+        yield article
+
+    def _analyze(self, article: Dict):
+        analysis = self.analyzer.analyze_article(
+            title=article['title'],
+            content=article['content'],
+            source=article['source']
+        )
+        article['category'] = article.get('category') or analysis['category']
+        article['sentiment'] = analysis['sentiment']
+        article['is_fake'] = analysis['is_fake']
+        article['summary'] = analysis['summary']
+        yield article
+
+    def _store(self, article: Dict):
+        # The store stage has a single worker, so the pending batch is private to it
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.append(article)
+        # Flush full batches, or a partial one that has waited store_max_wait
+        if len(self._pending) >= self.store_batch_size:
+            self._flush()
+        else:
+            self._flush_if_due()
+        return ()
+
+    def _flush_if_due(self):
+        if self._pending and time.monotonic() - self._pending_since >= self.store_max_wait:
+            self._flush()
+
+    def _flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            stored, skipped = store_articles(batch)
+            self.stored += len(stored)
+            self.skipped += skipped
+        except IntegrityError:
+            # A URL stored by another writer since the dedupe check; keep the rest of the batch
+            db.session.rollback()
+            for article in batch:
+                self._store_one(article)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _store_one(self, article: Dict):
+        try:
+            stored, skipped = store_articles([article])
+            self.stored += len(stored)
+            self.skipped += skipped
+        except IntegrityError:
+            db.session.rollback()
+            self.skipped += 1
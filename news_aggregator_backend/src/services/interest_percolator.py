@@ -0,0 +1,237 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+import re
+import threading
+
+from src.models.user import db
+from src.models.article import Article
+from src.models.user_interest import UserInterest
+from src.models.notification import Notification
+from src.services.ai_analyzer import NewsAIAnalyzer
+from src.services.article_events import article_events, ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_DELETED
+
+# Words extract_terms drops for being too short; kept as upper-case acronym terms ("AI", "EU", "UK")
+_SHORT_WORD = re.compile(r'\b[A-Za-z]{1,2}\b')
+
+
+class _Query:
+    """A compiled interest: every keyword term, plus the category and source when given.
+
+    Interests that compile to the same query (same stemmed terms and
+    filters) share one record, so it's checked once per article for all
+    of their users.
+    """
+
+    __slots__ = ('key', 'terms', 'category', 'source', 'anchor', 'interests')
+
+    def __init__(self, key: Tuple, terms: Tuple[str, ...], category: Optional[str], source: Optional[str]):
+        self.key = key
+        self.terms = terms
+        self.category = category
+        self.source = source
+        # ('term' | 'category' | 'source', value) this query is indexed under
+        self.anchor: Optional[Tuple[str, str]] = None
+        # interest id -> (user id, keyword as entered)
+        self.interests: Dict[int, Tuple[int, str]] = {}
+
+    def matches(self, terms: frozenset, category: Optional[str], source: Optional[str]) -> bool:
+        return (
+            (self.category is None or self.category == category)
+            and (self.source is None or self.source == source)
+            and all(term in terms for term in self.terms)
+        )
+
+
+class InterestPercolator:
+    """Matches new articles against every user's interests at once.
+
+    Instead of running each interest as a search per article, interests
+    are compiled into queries and indexed under a single anchor: one of
+    their keyword terms (the one with the fewest queries already under
+    it, so common words don't collect long lists), or their category or
+    source when the keyword has no indexable terms. Keyword words of one
+    or two letters are acronym terms, matched against words written in
+    capitals in the article. An article's terms are extracted once; only the queries anchored on those terms, its
+    category or its source are candidates, and each is verified in full.
+    Matches are written as notification rows with one multi-row insert
+    per event batch. The index is built from the database once and then
+    updated per interest as users add or remove them.
+    """
+
+    def __init__(self, analyzer: NewsAIAnalyzer = None):
+        self.analyzer = analyzer
+
+        self._lock = threading.RLock()
+        self._built = False
+        self._queries: Dict[Tuple, _Query] = {}
+        self._by_interest: Dict[int, _Query] = {}
+        self._by_user: Dict[int, Set[int]] = defaultdict(set)
+        self._anchors: Dict[Tuple[str, str], Set[_Query]] = defaultdict(set)
+        self.stats = {'articles': 0, 'candidates': 0, 'notifications': 0}
+
+    def _get_analyzer(self) -> NewsAIAnalyzer:
+        if self.analyzer is None:
+            self.analyzer = NewsAIAnalyzer()
+        return self.analyzer
+
+    def init_app(self, app):
+        """Build in the background so the first ingested batch doesn't pay for it"""
+        def warm():
+            with app.app_context():
+                self.ensure_built()
+                db.session.remove()
+        threading.Thread(target=warm, name='interest-percolator-build', daemon=True).start()
+
+    def ensure_built(self):
+        """Compile every interest from the database (inside an app context) unless already built"""
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            rows = db.session.query(
+                UserInterest.id, UserInterest.user_id, UserInterest.keyword,
+                UserInterest.category, UserInterest.source
+            ).all()
+            for row in rows:
+                self._add(*row)
+            self._built = True
+
+    def add_interest(self, interest: UserInterest):
+        """Index a newly created interest"""
+        # Checked under the lock: an interest committed while the build runs is applied after it
+        with self._lock:
+            if self._built:
+                self._add(interest.id, interest.user_id, interest.keyword, interest.category, interest.source)
+
+    def remove_interest(self, interest_id: int):
+        with self._lock:
+            self._remove(interest_id)
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            for interest_id in list(self._by_user.get(user_id, ())):
+                self._remove(interest_id)
+
+    def match(self, terms: frozenset, category: Optional[str], source: Optional[str]) -> Dict[int, Tuple[int, str]]:
+        """Users with an interest matching an article: user id -> (interest id, keyword)"""
+        self.ensure_built()
+        with self._lock:
+            candidates = set()
+            for term in terms:
+                candidates.update(self._anchors.get(('term', term), ()))
+            candidates.update(self._anchors.get(('category', category), ()))
+            candidates.update(self._anchors.get(('source', source), ()))
+            self.stats['candidates'] += len(candidates)
+
+            users = {}
+            for query in candidates:
+                if query.matches(terms, category, source):
+                    for interest_id, (user_id, keyword) in query.interests.items():
+                        # Lowest interest id wins so repeated matching picks the same one
+                        if user_id not in users or interest_id < users[user_id][0]:
+                            users[user_id] = (interest_id, keyword)
+            return users
+
+    def percolate(self, articles: Iterable[Article]) -> int:
+        """Event callback: notify interested users of stored or analyzed articles; returns rows written"""
+        now = datetime.utcnow()
+        rows = []
+        for article in articles:
+            text = f"{article.title} {article.content or ''}"
+            terms = frozenset(self._get_analyzer().extract_terms(text)).union(
+                word for word in _SHORT_WORD.findall(text) if word.isupper()
+            )
+            for user_id, (interest_id, keyword) in self.match(terms, article.category, article.source).items():
+                rows.append({
+                    'user_id': user_id,
+                    'article_id': article.id,
+                    'interest_id': interest_id,
+                    'keyword': keyword,
+                    'created_at': now
+                })
+            self.stats['articles'] += 1
+        if not rows:
+            return 0
+
+        # Own connection: committing the session here would expire the publisher's articles.
+        # An article seen again after analysis keeps its first notification.
+        with db.engine.begin() as conn:
+            written = conn.execute(Notification.__table__.insert().prefix_with('OR IGNORE'), rows).rowcount
+        self.stats['notifications'] += written
+        return written
+
+    def remove_articles(self, articles: Iterable[Article]):
+        """Event callback: drop notifications for deleted or archived articles"""
+        ids = [article.id for article in articles]
+        with db.engine.begin() as conn:
+            conn.execute(Notification.__table__.delete().where(Notification.article_id.in_(ids)))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'interests': len(self._by_interest),
+                'queries': len(self._queries),
+                'anchors': len(self._anchors)
+            }
+
+    def _compile(self, keyword: str, category: Optional[str], source: Optional[str]) -> Optional[Tuple]:
+        analyzer = self._get_analyzer()
+        # Short stopwords only count in capitals: "US election" keeps "US", "rise of AI" drops "of"
+        acronyms = {
+            word.upper() for word in _SHORT_WORD.findall(keyword)
+            if word.isupper() or word.lower() not in analyzer.stop_words
+        }
+        terms = tuple(sorted(set(analyzer.extract_terms(keyword)) | acronyms))
+        if not terms and not category and not source:
+            # Only stopwords and no filters: it would match every article
+            return None
+        return (terms, category or None, source or None)
+
+    def _add(self, interest_id: int, user_id: int, keyword: str, category: Optional[str], source: Optional[str]):
+        self._remove(interest_id)
+        key = self._compile(keyword, category, source)
+        if key is None:
+            return
+        query = self._queries.get(key)
+        if query is None:
+            query = self._queries[key] = _Query(key, *key)
+            query.anchor = self._choose_anchor(query)
+            self._anchors[query.anchor].add(query)
+        query.interests[interest_id] = (user_id, keyword)
+        self._by_interest[interest_id] = query
+        self._by_user[user_id].add(interest_id)
+
+    def _choose_anchor(self, query: _Query) -> Tuple[str, str]:
+        if query.terms:
+            return min(
+                (('term', term) for term in query.terms),
+                key=lambda anchor: (len(self._anchors.get(anchor, ())), -len(anchor[1]))
+            )
+        if query.category:
+            return ('category', query.category)
+        return ('source', query.source)
+
+    def _remove(self, interest_id: int):
+        query = self._by_interest.pop(interest_id, None)
+        if query is None:
+            return
+        user_id, _ = query.interests.pop(interest_id)
+        user_interests = self._by_user[user_id]
+        user_interests.discard(interest_id)
+        if not user_interests:
+            del self._by_user[user_id]
+        if not query.interests:
+            del self._queries[query.key]
+            queries = self._anchors[query.anchor]
+            queries.discard(query)
+            if not queries:
+                del self._anchors[query.anchor]
+
+
+interest_percolator = InterestPercolator()
+article_events.subscribe(ARTICLE_CREATED, interest_percolator.percolate)
+article_events.subscribe(ARTICLE_ANALYZED, interest_percolator.percolate)
+article_events.subscribe(ARTICLE_DELETED, interest_percolator.remove_articles)
@@ -0,0 +1,115 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+import queue
+import threading
+import time
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls on one worker thread.
+
+    ``submit`` queues an item and returns a Future. The worker takes the
+    first waiting item, keeps collecting until ``max_batch_size`` items or
+    ``max_wait`` seconds after that first item (no wait at all while calls
+    arrive one at a time), then runs ``batch_fn`` once
+    over the whole batch and resolves each caller's future. ``batch_fn``
+    must return one result per item, in order; a result that is an
+    Exception fails only that caller. If ``batch_fn`` raises, the items
+    are retried one at a time.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait: float = 0.005, max_queue: int = 10_000, name: str = 'micro-batcher'):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self.name = name
+
+        self._queue: 'queue.Queue[tuple]' = queue.Queue(maxsize=max_queue)
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._last_batch = 0
+        self.stats = {'items': 0, 'batches': 0, 'max_batch': 0, 'errors': 0}
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; raises queue.Full if the worker is too far behind"""
+        if self._thread is None:
+            self._start()
+        future = Future()
+        self._queue.put_nowait((item, future))
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = 30.0) -> Any:
+        """Submit and wait for the result"""
+        return self.submit(item).result(timeout)
+
+    def get_stats(self) -> Dict:
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'avg_batch': round(self.stats['items'] / batches, 2) if batches else 0.0,
+            'pending': self._queue.qsize(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        # A lone caller (last batch was a single item, nothing else queued)
+        # shouldn't pay the wait; the window opens once callers overlap
+        wait = self.max_wait if self._last_batch > 1 or not self._queue.empty() else 0.0
+        deadline = time.monotonic() + wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Past the window: still take whatever is already waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _call(self, items: List[Any]) -> List[Any]:
+        results = self.batch_fn(items)
+        if len(results) != len(items):
+            raise RuntimeError(f'{self.name}: expected {len(items)} results, got {len(results)}')
+        return results
+
+    def _call_one(self, item: Any) -> Any:
+        try:
+            return self._call([item])[0]
+        except Exception as e:
+            return e
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self._call(items)
+            except Exception as e:
+                if len(items) == 1:
+                    results = [e]
+                else:
+                    # Don't let one bad item fail everyone it was batched with
+                    results = [self._call_one(item) for item in items]
+
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self.stats['errors'] += 1
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+            self._last_batch = len(items)
+            self.stats['items'] += len(items)
+            self.stats['batches'] += 1
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(items))
@@ -1,7 +1,36 @@
 import requests
 from datetime import datetime, timedelta
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Dict, Optional
+from src.services.response_cache import ResponseCache
+
+# Seconds each kind of upstream response stays fresh in the cache
+CACHE_TTLS = {
+    'newsapi:top-headlines': 300,
+    'newsapi:everything': 900,
+    'serpapi:google_news': 600,
+}
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'fetch_cache.db')
+REQUEST_TIMEOUT = 15
+
+NEWSAPI_TOP_HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
+NEWSAPI_EVERYTHING_URL = "https://newsapi.org/v2/everything"
+NEWSAPI_MAX_PAGE_SIZE = 100
+
+# Params that identify the caller rather than the query
+_CREDENTIAL_PARAMS = {'apiKey', 'api_key'}
+
+class _InFlight:
+    """An upstream request that concurrent identical callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
 
 class NewsFetcher:
     """Service to fetch news from various APIs"""
@@ -17,15 +46,143 @@ class NewsFetcher:
         # Optional: allow overriding backend base URL
         self.base_url_override = os.getenv('BASE_API_URL')
 
+        # Upper bound for paginated backfills
+        self.newsapi_max_articles = int(os.getenv('NEWSAPI_MAX_ARTICLES', 1000))
+
+        # Shared response cache; NEWS_CACHE_PATH='' keeps it memory-only
+        cache_path = os.getenv('NEWS_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.cache = ResponseCache(cache_path or None)
+        self.cache_ttls = dict(CACHE_TTLS)
+        self._inflight: Dict[str, _InFlight] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.cache_stats = {
+            'requests': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'coalesced': 0,
+            'upstream_calls': 0,
+            'upstream_errors': 0
+        }
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.cache_stats[stat] += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Cache counters plus derived hit ratio and upstream calls saved"""
+        with self._stats_lock:
+            stats = dict(self.cache_stats)
+        saved = stats['memory_hits'] + stats['disk_hits'] + stats['coalesced']
+        stats['upstream_calls_saved'] = saved
+        stats['hit_ratio'] = saved / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def _cache_key(self, kind: str, url: str, params: Dict) -> str:
+        normalized = sorted(
+            (key, str(value)) for key, value in params.items()
+            if key not in _CREDENTIAL_PARAMS and value is not None
+        )
+        raw = json.dumps([kind, url, normalized])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _get_json(self, kind: str, url: str, params: Dict) -> Dict:
+        """GET an upstream JSON endpoint through the cache.
+
+        Concurrent identical requests are coalesced: one caller makes the
+        upstream call and the rest wait for its result.
+        """
+        key = self._cache_key(kind, url, params)
+        self._count('requests')
+
+        tier, cached = self.cache.get(key)
+        if tier is not None:
+            self._count(f'{tier}_hits')
+            return cached
+
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._inflight[key] = flight
+
+        if not leader:
+            self._count('coalesced')
+            if not flight.done.wait(REQUEST_TIMEOUT * 2):
+                raise requests.Timeout(f'Timed out waiting for in-flight {kind} request')
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            # A previous leader may have filled the cache since our lookup
+            tier, cached = self.cache.get(key)
+            if tier is not None:
+                self._count(f'{tier}_hits')
+                flight.result = cached
+                return cached
+
+            self._count('upstream_calls')
+            response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            flight.result = response.json()
+            self.cache.set(key, kind, flight.result, self.cache_ttls.get(kind, 300))
+            return flight.result
+        except Exception as e:
+            self._count('upstream_errors')
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight.done.set()
+
     def fetch_from_newsapi(self, query: str = None, category: str = None, 
                           sources: str = None, language: str = 'en', 
                           page_size: int = 20) -> List[Dict]:
         """Fetch top headlines from NewsAPI"""
-        base_url = "https://newsapi.org/v2/top-headlines"
+        params = self._top_headlines_params(query, category, sources, language)
+        params['pageSize'] = page_size
+
+        try:
+            data = self._get_json('newsapi:top-headlines', NEWSAPI_TOP_HEADLINES_URL, params)
+            return self._normalize_newsapi_articles(data.get('articles', []))
+        except requests.RequestException as e:
+            print(f"Error fetching from NewsAPI: {e}")
+            return []
+
+    def fetch_everything_newsapi(self, query: str, language: str = 'en', 
+                                sort_by: str = 'publishedAt', page_size: int = 20) -> List[Dict]:
+        """Fetch news from NewsAPI's everything endpoint"""
+        params = self._everything_params(query, language, sort_by)
+        params['pageSize'] = page_size
+
+        try:
+            data = self._get_json('newsapi:everything', NEWSAPI_EVERYTHING_URL, params)
+            return self._normalize_newsapi_articles(data.get('articles', []))
+        except requests.RequestException as e:
+            print(f"Error fetching from NewsAPI everything: {e}")
+            return []
+
+    def iter_newsapi_top_headlines(self, query: str = None, category: str = None,
+                                   sources: str = None, language: str = 'en',
+                                   max_articles: int = None) -> Iterator[List[Dict]]:
+        """Stream top headlines page by page, up to ``max_articles``"""
+        params = self._top_headlines_params(query, category, sources, language)
+        return self._iter_newsapi_pages('newsapi:top-headlines', NEWSAPI_TOP_HEADLINES_URL, params, max_articles)
+
+    def iter_everything_newsapi(self, query: str, language: str = 'en',
+                                sort_by: str = 'publishedAt',
+                                max_articles: int = None) -> Iterator[List[Dict]]:
+        """Stream the everything endpoint page by page, up to ``max_articles``"""
+        params = self._everything_params(query, language, sort_by)
+        return self._iter_newsapi_pages('newsapi:everything', NEWSAPI_EVERYTHING_URL, params, max_articles)
+
+    def _top_headlines_params(self, query: str, category: str, sources: str, language: str) -> Dict:
         params = {
             'apiKey': self.newsapi_key,
-            'language': language,
-            'pageSize': page_size
+            'language': language
         }
         if query:
             params['q'] = query
@@ -33,65 +190,76 @@ class NewsFetcher:
             params['category'] = category
         if sources:
             params['sources'] = sources
+        return params
 
-        try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            articles = []
-            for article in data.get('articles', []):
-                if not article.get('content') or article.get('content') == '[Removed]':
-                    continue
-                articles.append({
-                    'title': article.get('title', ''),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', {}).get('name', 'Unknown'),
-                    'author': article.get('author'),
-                    'published_date': self._parse_date(article.get('publishedAt')),
-                    'content': article.get('content', ''),
-                    'image_url': article.get('urlToImage'),
-                    'description': article.get('description', '')
-                })
-            return articles
-        except requests.RequestException as e:
-            print(f"Error fetching from NewsAPI: {e}")
-            return []
-
-    def fetch_everything_newsapi(self, query: str, language: str = 'en', 
-                                sort_by: str = 'publishedAt', page_size: int = 20) -> List[Dict]:
-        """Fetch news from NewsAPI's everything endpoint"""
-        base_url = "https://newsapi.org/v2/everything"
+    def _everything_params(self, query: str, language: str, sort_by: str) -> Dict:
         from_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        params = {
+        return {
             'apiKey': self.newsapi_key,
             'q': query,
             'language': language,
             'sortBy': sort_by,
-            'pageSize': page_size,
             'from': from_date
         }
+
+    def _iter_newsapi_pages(self, kind: str, url: str, params: Dict,
+                            max_articles: int = None) -> Iterator[List[Dict]]:
+        """Walk ``page=`` through a NewsAPI listing, yielding normalized pages.
+
+        The next page is requested in the background while the caller is
+        still handling the current one, and at most two pages are held in
+        memory at a time.
+        """
+        max_articles = max_articles or self.newsapi_max_articles
+        page_size = min(NEWSAPI_MAX_PAGE_SIZE, max_articles)
+
+        def fetch(page):
+            return self._get_json(kind, url, dict(params, page=page, pageSize=page_size))
+
+        executor = ThreadPoolExecutor(max_workers=1)
         try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            articles = []
-            for article in data.get('articles', []):
-                if not article.get('content') or article.get('content') == '[Removed]':
-                    continue
-                articles.append({
-                    'title': article.get('title', ''),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', {}).get('name', 'Unknown'),
-                    'author': article.get('author'),
-                    'published_date': self._parse_date(article.get('publishedAt')),
-                    'content': article.get('content', ''),
-                    'image_url': article.get('urlToImage'),
-                    'description': article.get('description', '')
-                })
-            return articles
-        except requests.RequestException as e:
-            print(f"Error fetching from NewsAPI everything: {e}")
-            return []
+            page = 1
+            fetched = 0
+            future = executor.submit(fetch, page)
+            while future is not None:
+                try:
+                    data = future.result()
+                except requests.RequestException as e:
+                    # Includes NewsAPI refusing pages past the plan's result limit
+                    print(f"Error fetching page {page} from NewsAPI: {e}")
+                    return
+
+                raw_articles = data.get('articles', [])[:max_articles - fetched]
+                fetched += len(raw_articles)
+                total = min(data.get('totalResults', 0), max_articles)
+
+                # Prefetch the next page before handing this one to the caller
+                page += 1
+                future = executor.submit(fetch, page) if raw_articles and fetched < total else None
+
+                articles = self._normalize_newsapi_articles(raw_articles)
+                if articles:
+                    yield articles
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _normalize_newsapi_articles(self, raw_articles: List[Dict]) -> List[Dict]:
+        """Convert NewsAPI article objects to our article dicts, dropping removed ones"""
+        articles = []
+        for article in raw_articles:
+            if not article.get('content') or article.get('content') == '[Removed]':
+                continue
+            articles.append({
+                'title': article.get('title', ''),
+                'url': article.get('url', ''),
+                'source': (article.get('source') or {}).get('name', 'Unknown'),
+                'author': article.get('author'),
+                'published_date': self._parse_date(article.get('publishedAt')),
+                'content': article.get('content', ''),
+                'image_url': article.get('urlToImage'),
+                'description': article.get('description', '')
+            })
+        return articles
 
     def fetch_from_serpapi_google_news(self, query: str, gl: str = 'us', hl: str = 'en') -> List[Dict]:
         """Fetch news from Google News via SerpApi"""
@@ -104,9 +272,7 @@ class NewsFetcher:
             'api_key': self.serpapi_key
         }
         try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json('serpapi:google_news', base_url, params)
             articles = []
             for article in data.get('news_results', []):
                 articles.append({
@@ -144,17 +310,3 @@ class NewsFetcher:
             return datetime.now()
         except Exception:
             return None
-
-    def fetch_trending_topics(self) -> List[str]:
-        """Fetch trending topics from Google News (simplified)"""
-        try:
-            articles = self.fetch_from_serpapi_google_news("trending")
-            topics = []
-            for article in articles[:10]:
-                for word in article['title'].split():
-                    if len(word) > 4 and word.lower() not in ['news', 'says', 'after', 'with', 'from']:
-                        topics.append(word)
-            return list(set(topics))[:20]
-        except Exception as e:
-            print(f"Error fetching trending topics: {e}")
-            return []
@@ -0,0 +1,240 @@
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Optional
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import tempfile
+import threading
+import tracemalloc
+import uuid
+
+from flask import Response, abort, g, request
+
+# Path fragments for the ``scope`` filter of memory reports
+MEMORY_SCOPES = {
+    'analyzer': ['*/services/ai_analyzer.py', '*/services/sentiment_engine.py', '*/services/category_learner.py',
+                 '*/nltk/*', '*/textblob/*', '*/sklearn/*'],
+    'sqlalchemy': ['*/sqlalchemy/*', '*/flask_sqlalchemy/*'],
+}
+
+
+def admin_token() -> Optional[str]:
+    """The shared secret for profiling and admin endpoints; unset disables them"""
+    return os.getenv('ADMIN_TOKEN') or None
+
+
+def is_admin_request() -> bool:
+    token = admin_token()
+    supplied = request.headers.get('X-Admin-Token', '')
+    return token is not None and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def admin_required(view):
+    """404 (not 401/403) for everyone without the token, so the endpoints stay invisible"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            abort(404)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RequestProfiler:
+    """cProfile for single requests, opted into with ``?_profile=1`` plus the admin token.
+
+    The hooks are only installed when ADMIN_TOKEN is set, so without it
+    requests don't pay anything. A profiled response gets an
+    ``X-Profile-Id`` header and the stats are saved under ``directory``
+    (the newest ``keep`` are kept); ``?_profile=text`` returns the
+    cumulative-time report instead of the normal response. Only the
+    request thread is profiled, and one request at a time, since Python
+    allows a single active profiler.
+    """
+
+    def __init__(self, directory: Optional[str] = None, keep: int = 50, report_lines: int = 40):
+        self.directory = directory or os.getenv('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'news-profiles')
+        self.keep = keep
+        self.report_lines = report_lines
+        self._active = threading.Lock()
+
+    def init_app(self, app):
+        if admin_token() is None:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def list_profiles(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if filename.endswith('.prof'):
+                path = os.path.join(self.directory, filename)
+                profiles.append({
+                    'id': filename[:-len('.prof')],
+                    'size': os.path.getsize(path),
+                    'created_at': datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+                })
+        return profiles
+
+    def report(self, profile_id: str, sort: str = 'cumulative') -> Optional[str]:
+        path = self._path(profile_id)
+        if path is None or not os.path.exists(path):
+            return None
+        return self._format(pstats.Stats(path), sort)
+
+    def _path(self, profile_id: str) -> Optional[str]:
+        # Ids are generated here; reject anything that could escape the directory
+        if not profile_id or not all(c.isalnum() or c in '-_' for c in profile_id):
+            return None
+        return os.path.join(self.directory, f'{profile_id}.prof')
+
+    def _format(self, stats: pstats.Stats, sort: str) -> str:
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(self.report_lines)
+        return out.getvalue()
+
+    def _before_request(self):
+        mode = request.args.get('_profile')
+        if not mode or not is_admin_request():
+            return None
+        if not self._active.acquire(blocking=False):
+            g.profile_skipped = True
+            return None
+        profiler = cProfile.Profile()
+        g.profiler = profiler
+        g.profile_mode = mode
+        profiler.enable()
+        return None
+
+    def _after_request(self, response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            if g.pop('profile_skipped', False):
+                response.headers['X-Profile-Skipped'] = 'another request is being profiled'
+            return response
+        profiler.disable()
+        self._active.release()
+
+        profile_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{request.endpoint or 'unknown'}-{uuid.uuid4().hex[:8]}"
+        profile_id = profile_id.replace('.', '_')
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self._path(profile_id))
+        self._prune()
+
+        if g.pop('profile_mode', None) == 'text':
+            response = Response(self._format(pstats.Stats(profiler), request.args.get('_sort', 'cumulative')),
+                                mimetype='text/plain')
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    def _teardown_request(self, exc=None):
+        # The view raised before after_request could stop the profiler
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            self._active.release()
+
+    def _prune(self):
+        for stale in self.list_profiles()[self.keep:]:
+            os.remove(self._path(stale['id']))
+
+
+class MemoryTracker:
+    """tracemalloc snapshots kept in memory, for diffing memory growth between two points"""
+
+    def __init__(self, keep: int = 5, frames: int = 10):
+        self.keep = keep
+        self.frames = frames
+        self._snapshots: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def start(self, frames: Optional[int] = None) -> Dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.frames)
+        return self.status()
+
+    def stop(self) -> Dict:
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots = []
+        return self.status()
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            'tracing': tracemalloc.is_tracing(),
+            'frames': tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'snapshots': [{'id': s['id'], 'taken_at': s['taken_at']} for s in self._snapshots]
+        }
+
+    def snapshot(self, scope: str = 'all', limit: int = 25) -> Dict:
+        if not tracemalloc.is_tracing():
+            raise ValueError('tracemalloc is not running; start it first')
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        entry = {'id': uuid.uuid4().hex[:12], 'taken_at': datetime.utcnow().isoformat(), 'snapshot': snapshot}
+        with self._lock:
+            self._snapshots = (self._snapshots + [entry])[-self.keep:]
+        return {
+            'id': entry['id'],
+            'taken_at': entry['taken_at'],
+            'top': [self._stat_dict(stat) for stat in self._scoped(snapshot, scope).statistics('lineno')[:limit]]
+        }
+
+    def diff(self, from_id: Optional[str], to_id: Optional[str], scope: str = 'all',
+             group_by: str = 'lineno', limit: int = 25) -> Dict:
+        with self._lock:
+            snapshots = {s['id']: s for s in self._snapshots}
+            ordered = list(self._snapshots)
+        if len(ordered) < 2 and not (from_id and to_id):
+            raise ValueError('Need two snapshots to diff')
+        older = snapshots.get(from_id) if from_id else ordered[-2]
+        newer = snapshots.get(to_id) if to_id else ordered[-1]
+        if older is None or newer is None:
+            raise KeyError('Unknown snapshot id')
+
+        stats = self._scoped(newer['snapshot'], scope).compare_to(self._scoped(older['snapshot'], scope), group_by)
+        return {
+            'from': older['id'],
+            'to': newer['id'],
+            'scope': scope,
+            'size_diff_bytes': sum(stat.size_diff for stat in stats),
+            'count_diff': sum(stat.count_diff for stat in stats),
+            'top': [
+                {**self._stat_dict(stat), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in stats[:limit]
+            ]
+        }
+
+    @staticmethod
+    def _scoped(snapshot: tracemalloc.Snapshot, scope: str) -> tracemalloc.Snapshot:
+        if scope == 'all':
+            return snapshot
+        if scope not in MEMORY_SCOPES:
+            raise ValueError(f"Unknown scope '{scope}' (use all, {', '.join(MEMORY_SCOPES)})")
+        # A trace counts if any of its frames is in scope
+        return snapshot.filter_traces([
+            tracemalloc.Filter(True, pattern, all_frames=True) for pattern in MEMORY_SCOPES[scope]
+        ])
+
+    @staticmethod
+    def _stat_dict(stat) -> Dict:
+        return {
+            'location': [f'{frame.filename}:{frame.lineno}' for frame in stat.traceback],
+            'size': stat.size,
+            'count': stat.count
+        }
+
+
+request_profiler = RequestProfiler()
+memory_tracker = MemoryTracker()
@@ -0,0 +1,243 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Tuple
+import atexit
+import queue
+import signal
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from src.models.user import db, User
+from src.models.article import Article
+from src.models.reading_history import ReadingHistory
+from src.models.types import is_public_id
+from src.services.hot_articles import hot_articles
+
+
+class ReadingQueueFull(Exception):
+    """Raised when the event buffer can't take a batch without dropping events"""
+
+
+class ReadingEventBuffer:
+    """Buffers article-open events in memory and writes them in bulk.
+
+    Events go onto a bounded queue and are flushed by a background thread
+    every ``flush_interval`` seconds (or sooner once ``flush_batch`` events
+    are waiting) as one multi-row INSERT into ``reading_history`` plus one
+    batched ``view_count`` update. Repeated opens of the same article by the
+    same user inside ``dedupe_window`` seconds are counted once. Whatever is
+    still queued is flushed when the process exits, including on SIGTERM
+    (``docker stop``), which skips atexit hooks unless handled.
+
+    A batch that fails to write is split in halves until the failing events
+    are isolated, so one bad row doesn't hold back the rest. Failed events
+    are retried on later flushes and dropped after ``max_attempts``; when
+    the database itself is unavailable (locked, I/O error) the whole batch
+    is retried without splitting.
+    """
+
+    def __init__(self, max_queue: int = 10_000, flush_interval: float = 2.0,
+                 flush_batch: int = 1_000, dedupe_window: float = 1800.0, max_attempts: int = 5):
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.dedupe_window = dedupe_window
+        self.max_attempts = max_attempts
+
+        self.app = None
+        self._queue: 'queue.Queue[Tuple[int, str, datetime]]' = queue.Queue(maxsize=max_queue)
+        self._submit_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        # (user_id, article public id) -> monotonic time of the last accepted open
+        self._recent: Dict[Tuple[int, str], float] = {}
+        # Queued event -> failed writes so far
+        self._attempts: Dict[Tuple[int, str, datetime], int] = {}
+
+        self.stats = {
+            'accepted': 0, 'duplicates': 0, 'written': 0, 'dropped_unknown': 0, 'dropped_failed': 0, 'flushes': 0
+        }
+
+    def init_app(self, app):
+        """Bind to the Flask app and start the background flusher"""
+        self.app = app
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='reading-event-flusher', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+            self._handle_signals()
+
+    def submit(self, events: List[Dict]) -> Dict[str, int]:
+        """Queue a batch of {user_id, article_id, read_at?} events"""
+        now = time.monotonic()
+        with self._submit_lock:
+            if self._queue.qsize() + len(events) > self.max_queue:
+                raise ReadingQueueFull()
+
+            accepted = duplicates = 0
+            for event in events:
+                key = (event['user_id'], event['article_id'])
+                last_seen = self._recent.get(key)
+                if last_seen is not None and now - last_seen < self.dedupe_window:
+                    duplicates += 1
+                    continue
+                self._recent[key] = now
+                self._queue.put_nowait((event['user_id'], event['article_id'], event.get('read_at') or datetime.utcnow()))
+                accepted += 1
+
+            self.stats['accepted'] += accepted
+            self.stats['duplicates'] += duplicates
+
+        if self._queue.qsize() >= self.flush_batch:
+            self._wakeup.set()
+        return {'accepted': accepted, 'duplicates': duplicates}
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """Write everything currently queued. Returns the number of rows inserted"""
+        with self._flush_lock:
+            events = []
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not events:
+                return 0
+
+            with self.app.app_context():
+                written, failed = self._write_isolating(events)
+            if self._attempts:
+                failed_set = set(failed)
+                for event in events:
+                    if event not in failed_set:
+                        self._attempts.pop(event, None)
+            if failed:
+                self._requeue(failed)
+
+            self.stats['written'] += written
+            self.stats['dropped_unknown'] += len(events) - len(failed) - written
+            self.stats['flushes'] += 1
+            return written
+
+    def shutdown(self):
+        """Stop the flusher and write out any remaining events"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        if self.app is not None:
+            self.flush()
+
+    def _handle_signals(self):
+        """Flush on SIGTERM/SIGINT before the previous handler (or a plain exit) runs"""
+        if threading.current_thread() is not threading.main_thread():
+            # signal.signal only works in the main thread
+            return
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(signum)
+
+            def handler(signum, frame, previous=previous):
+                self.shutdown()
+                if callable(previous):
+                    previous(signum, frame)
+                elif previous != signal.SIG_IGN:
+                    raise SystemExit(128 + signum)
+
+            signal.signal(signum, handler)
+
+    def _write_isolating(self, events: List[Tuple[int, str, datetime]]) -> Tuple[int, List]:
+        """Write a batch, bisecting it on failure; returns (rows written, events that failed)"""
+        try:
+            return self._write(events), []
+        except OperationalError as e:
+            # Locked or unavailable database: splitting won't help, retry it all later
+            db.session.rollback()
+            print(f"Error flushing reading events: {e}")
+            return 0, events
+        except Exception as e:
+            db.session.rollback()
+            if len(events) == 1:
+                print(f"Error writing reading event {events[0]}: {e}")
+                return 0, events
+            middle = len(events) // 2
+            written_first, failed_first = self._write_isolating(events[:middle])
+            written_second, failed_second = self._write_isolating(events[middle:])
+            return written_first + written_second, failed_first + failed_second
+
+    def _write(self, events: List[Tuple[int, str, datetime]]) -> int:
+        public_ids = {public_id for _, public_id, _ in events if is_public_id(public_id)}
+        user_ids = {user_id for user_id, _, _ in events}
+
+        id_map = dict(
+            db.session.query(Article.public_id, Article.id).filter(Article.public_id.in_(public_ids))
+        ) if public_ids else {}
+        known_users = {
+            row[0] for row in db.session.query(User.id).filter(User.id.in_(user_ids))
+        }
+
+        rows = [
+            {'user_id': user_id, 'article_id': id_map[public_id], 'read_at': read_at}
+            for user_id, public_id, read_at in events
+            if public_id in id_map and user_id in known_users
+        ]
+        if not rows:
+            return 0
+
+        db.session.execute(db.insert(ReadingHistory), rows)
+
+        views = Counter(row['article_id'] for row in rows)
+        articles = Article.__table__
+        db.session.execute(
+            articles.update()
+            .where(articles.c.id == db.bindparam('b_id'))
+            .values(view_count=articles.c.view_count + db.bindparam('b_views')),
+            [{'b_id': article_id, 'b_views': count} for article_id, count in views.items()]
+        )
+        db.session.commit()
+        hot_articles.add_views(views)
+        return len(rows)
+
+    def _requeue(self, events):
+        """Put failed events back for the next flush, dropping those out of attempts"""
+        for i, event in enumerate(events):
+            attempts = self._attempts.get(event, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(event, None)
+                self.stats['dropped_failed'] += 1
+                print(f"Dropping reading event {event} after {attempts} failed writes")
+                continue
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                dropped = len(events) - i
+                print(f"Reading event queue full while retrying a failed flush; {dropped} events dropped")
+                self.stats['dropped_failed'] += dropped
+                for event in events[i:]:
+                    self._attempts.pop(event, None)
+                break
+            self._attempts[event] = attempts
+
+    def _prune_recent(self):
+        cutoff = time.monotonic() - self.dedupe_window
+        with self._submit_lock:
+            stale = [key for key, seen in self._recent.items() if seen < cutoff]
+            for key in stale:
+                del self._recent[key]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            self._prune_recent()
+
+
+reading_event_buffer = ReadingEventBuffer()
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """Two-tier TTL cache for upstream API responses.
+
+    A bounded in-memory LRU sits in front of a small SQLite file, so cached
+    responses survive restarts and are shared by every worker process on
+    the host.
+    """
+
+    def __init__(self, path: Optional[str], max_memory_entries: int = 512):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._memory: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, kind TEXT NOT NULL, '
+                    'expires_at REAL NOT NULL, body TEXT NOT NULL)'
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Tuple[Optional[str], Any]:
+        """Return (tier, value) where tier is 'memory', 'disk' or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return 'memory', entry[1]
+                del self._memory[key]
+
+        if not self.path:
+            return None, None
+
+        try:
+            row = self._connect().execute(
+                'SELECT expires_at, body FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Response cache read failed: {e}")
+            return None, None
+
+        if row is None or row[0] <= now:
+            return None, None
+
+        value = json.loads(row[1])
+        self._remember(key, row[0], value)
+        return 'disk', value
+
+    def set(self, key: str, kind: str, value: Any, ttl: float):
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, value)
+
+        if not self.path:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, kind, expires_at, body) VALUES (?, ?, ?, ?)',
+                    (key, kind, expires_at, json.dumps(value))
+                )
+                conn.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+        except sqlite3.Error as e:
+            print(f"Response cache write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
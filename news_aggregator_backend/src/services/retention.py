@@ -0,0 +1,332 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import aliased, load_only
+
+from src.models.user import db
+from src.models.article import Article
+from src.models.reading_history import ReadingHistory
+from src.models.archive import ARCHIVE_SCHEMA, archive_metadata, archived_articles, archived_reading_history
+from src.services.article_events import article_events, ARTICLE_DELETED
+
+
+class RetentionPolicy:
+    """Maximum article age in days: one default plus per-category overrides (0 keeps forever)"""
+
+    def __init__(self, default_days: int = 0, category_days: Optional[Dict[str, int]] = None):
+        self.default_days = default_days
+        self.category_days = category_days or {}
+
+    @classmethod
+    def from_env(cls) -> 'RetentionPolicy':
+        """RETENTION_DAYS=90 and RETENTION_CATEGORY_DAYS="sports=30,politics=365" """
+        category_days = {}
+        for entry in os.getenv('RETENTION_CATEGORY_DAYS', '').split(','):
+            category, _, days = entry.partition('=')
+            if category.strip() and days.strip():
+                category_days[category.strip()] = int(days)
+        return cls(int(os.getenv('RETENTION_DAYS', '0')), category_days)
+
+    def enabled(self) -> bool:
+        return self.default_days > 0 or any(days > 0 for days in self.category_days.values())
+
+    def expired(self, now: datetime):
+        """SQL condition matching the articles past their category's age limit"""
+        clauses = [
+            db.and_(Article.category == category, Article.published_date < now - timedelta(days=days))
+            for category, days in self.category_days.items() if days > 0
+        ]
+        if self.default_days > 0:
+            clause = Article.published_date < now - timedelta(days=self.default_days)
+            if self.category_days:
+                clause = db.and_(
+                    db.or_(Article.category.is_(None), Article.category.notin_(list(self.category_days))),
+                    clause
+                )
+            clauses.append(clause)
+        return db.or_(*clauses) if clauses else db.false()
+
+    def to_dict(self) -> Dict:
+        return {'default_days': self.default_days, 'category_days': self.category_days}
+
+
+class RetentionService:
+    """Moves articles past their retention age into an attached archive database.
+
+    The archive is a second SQLite file ATTACHed as ``archive`` on every
+    connection, so a batch is copied and deleted in one transaction and
+    archived rows stay queryable (``include_archived`` on /articles).
+    Batches are small, with a pause between them, so the write lock is
+    only held briefly and ingestion keeps going during a pass. Archived
+    articles are published as deleted so the in-memory indexes drop them,
+    and freed pages are returned to the filesystem with incremental
+    vacuum afterwards. That needs incremental auto-vacuum, which new
+    databases get from ``run_migrations``; converting an existing one is a
+    full VACUUM that locks the database, so it is never done by a pass,
+    only on request (``convert_to_incremental_vacuum``).
+    """
+
+    def __init__(self, policy: RetentionPolicy, archive_path: Optional[str] = None, batch_size: int = 200,
+                 pause: float = 0.05, interval: float = 3600.0, vacuum_step: int = 256):
+        self.policy = policy
+        self.archive_path = archive_path
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.vacuum_step = vacuum_step
+
+        self.app = None
+        self.attached = False
+        self.last_run: Optional[Dict] = None
+        self._run_lock = threading.Lock()
+        self._thread = None
+
+    def init_app(self, app):
+        """Attach the archive database and, when a policy is set, start the background archiver"""
+        self.app = app
+        with app.app_context():
+            engine = db.engine
+            if self.archive_path is None:
+                database = engine.url.database
+                if not database or database == ':memory:':
+                    return
+                self.archive_path = os.path.join(os.path.dirname(database), 'archive.db')
+            if not self.attached:
+                event.listen(engine, 'connect', self._attach)
+                # Pooled connections were opened before the listener existed
+                engine.dispose()
+                self._create_archive_tables()
+                self.attached = True
+
+        if self.policy.enabled() and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='article-retention', daemon=True)
+            self._thread.start()
+
+    def articles_with_archived(self):
+        """An Article entity over live and archived rows, plus the column telling them apart"""
+        live = db.select(*Article.__table__.columns, db.literal(False).label('archived'))
+        old = db.select(*archived_articles.columns, db.literal(True).label('archived'))
+        rows = live.union_all(old).subquery('all_articles')
+        return aliased(Article, rows), rows.c.archived
+
+    def run(self, max_batches: Optional[int] = None) -> Dict:
+        """One archiving pass (inside an app context); raises RuntimeError if one is already running"""
+        if not self.attached:
+            raise RuntimeError('No archive database attached')
+        if not self._run_lock.acquire(blocking=False):
+            raise RuntimeError('An archiving pass is already running')
+        try:
+            started = time.monotonic()
+            articles = history = batches = 0
+            while max_batches is None or batches < max_batches:
+                ids = [row[0] for row in db.session.query(Article.id).filter(
+                    self.policy.expired(datetime.utcnow())
+                ).order_by(Article.published_date).limit(self.batch_size)]
+                db.session.commit()
+                if not ids:
+                    break
+                history += self._archive_batch(ids)
+                articles += len(ids)
+                batches += 1
+                time.sleep(self.pause)
+
+            self.last_run = {
+                'finished_at': datetime.utcnow().isoformat(),
+                'articles': articles,
+                'reading_history': history,
+                'batches': batches,
+                'vacuumed_pages': self._incremental_vacuum() if articles and self.incremental_vacuum_enabled() else 0,
+                'seconds': round(time.monotonic() - started, 3)
+            }
+            return self.last_run
+        finally:
+            self._run_lock.release()
+
+    def status(self) -> Dict:
+        status = {
+            'enabled': self.policy.enabled(),
+            'policy': self.policy.to_dict(),
+            'archive_path': self.archive_path,
+            'running': self._run_lock.locked(),
+            'last_run': self.last_run
+        }
+        if self.attached:
+            status.update({
+                'incremental_vacuum': self.incremental_vacuum_enabled(),
+                'live_articles': db.session.query(db.func.count(Article.id)).scalar(),
+                'eligible_articles': db.session.query(db.func.count(Article.id)).filter(
+                    self.policy.expired(datetime.utcnow())
+                ).scalar(),
+                'archived_articles': db.session.query(db.func.count()).select_from(archived_articles).scalar(),
+                'archived_reading_history': db.session.query(db.func.count()).select_from(
+                    archived_reading_history
+                ).scalar()
+            })
+        return status
+
+    def _attach(self, dbapi_connection, connection_record):
+        dbapi_connection.execute(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (self.archive_path,))
+
+    def _create_archive_tables(self):
+        with db.engine.connect() as conn:
+            tables = conn.exec_driver_sql(f'SELECT count(*) FROM {ARCHIVE_SCHEMA}.sqlite_master').scalar()
+            if not tables:
+                # Only takes effect before the first table is created
+                conn.exec_driver_sql(f'PRAGMA {ARCHIVE_SCHEMA}.auto_vacuum = INCREMENTAL')
+            archive_metadata.create_all(conn)
+
+            # Columns added to articles by later migrations
+            existing = {row[1] for row in conn.exec_driver_sql(f'PRAGMA {ARCHIVE_SCHEMA}.table_info("articles")')}
+            for column in archived_articles.columns:
+                if column.name not in existing:
+                    conn.exec_driver_sql(
+                        f'ALTER TABLE {ARCHIVE_SCHEMA}.articles ADD COLUMN "{column.name}" '
+                        f'{column.type.compile(dialect=conn.dialect)}'
+                    )
+            if self._has_unique_constraints(conn):
+                self._rebuild_archived_articles(conn)
+            conn.commit()
+
+    def _has_unique_constraints(self, conn) -> bool:
+        """Whether archive.articles still has the unique constraints that earlier versions copied from articles"""
+        return any(
+            row[3] == 'u' for row in conn.exec_driver_sql(f'PRAGMA {ARCHIVE_SCHEMA}.index_list("articles")')
+        )
+
+    def _rebuild_archived_articles(self, conn):
+        """Recreate archive.articles without its unique constraints (SQLite can't drop them in place)"""
+        conn.exec_driver_sql(f'ALTER TABLE {ARCHIVE_SCHEMA}.articles RENAME TO articles_rebuild')
+        for index in archived_articles.indexes:
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS {ARCHIVE_SCHEMA}.{index.name}')
+        archived_articles.create(conn)
+        names = ', '.join(f'"{column.name}"' for column in archived_articles.columns)
+        conn.exec_driver_sql(
+            f'INSERT INTO {ARCHIVE_SCHEMA}.articles ({names}) '
+            f'SELECT {names} FROM {ARCHIVE_SCHEMA}.articles_rebuild'
+        )
+        conn.exec_driver_sql(f'DROP TABLE {ARCHIVE_SCHEMA}.articles_rebuild')
+
+    def _archive_batch(self, ids) -> int:
+        """Copy one batch and its reading history to the archive and delete it, in one transaction"""
+        # Only what the delete listeners read (id, public_id, source)
+        articles = Article.query.options(
+            load_only(Article.id, Article.public_id, Article.source)
+        ).filter(Article.id.in_(ids)).all()
+        for article in articles:
+            db.session.expunge(article)
+        db.session.commit()
+
+        # Take the write lock up front: upgrading a read transaction fails at once
+        # with "database is locked" if a writer got in first, instead of waiting
+        db.session.execute(db.text('BEGIN IMMEDIATE'))
+        self._renumber_archived(ids)
+        columns = Article.__table__.columns
+        db.session.execute(
+            archived_articles.insert().from_select(
+                [column.name for column in columns], db.select(*columns).where(Article.id.in_(ids))
+            )
+        )
+        history = ReadingHistory.__table__.columns
+        db.session.execute(
+            archived_reading_history.insert().from_select(
+                ['user_id', 'article_id', 'read_at'],
+                db.select(history.user_id, history.article_id, history.read_at).where(history.article_id.in_(ids))
+            )
+        )
+        moved_history = ReadingHistory.query.filter(
+            ReadingHistory.article_id.in_(ids)
+        ).delete(synchronize_session=False)
+        Article.query.filter(Article.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+        article_events.publish(ARTICLE_DELETED, articles)
+        return moved_history
+
+    def _renumber_archived(self, ids):
+        """Move archived articles whose id SQLite has since reused out of the way of ``ids``.
+
+        Rowids aren't AUTOINCREMENT, so once the newest article is archived
+        its id can be given to the next one stored. The older archived
+        article keeps its row and reading history under a new negative id,
+        which live articles never use.
+        """
+        clashing = [row[0] for row in db.session.execute(
+            db.select(archived_articles.c.id).where(archived_articles.c.id.in_(ids))
+        )]
+        if not clashing:
+            return
+        lowest = db.session.execute(db.select(db.func.min(archived_articles.c.id))).scalar()
+        for offset, old_id in enumerate(clashing, 1):
+            new_id = min(lowest, 0) - offset
+            db.session.execute(
+                archived_articles.update().where(archived_articles.c.id == old_id).values(id=new_id)
+            )
+            db.session.execute(
+                archived_reading_history.update().where(
+                    archived_reading_history.c.article_id == old_id
+                ).values(article_id=new_id)
+            )
+
+    def incremental_vacuum_enabled(self) -> bool:
+        with db.engine.connect() as conn:
+            return conn.exec_driver_sql('PRAGMA main.auto_vacuum').scalar() == 2
+
+    def convert_to_incremental_vacuum(self) -> Dict:
+        """Switch the main database to incremental auto-vacuum with a full VACUUM.
+
+        The VACUUM rewrites the whole file under an exclusive lock, blocking
+        every writer until it finishes, so run it in a maintenance window.
+        Raises RuntimeError while an archiving pass is running.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            raise RuntimeError('An archiving pass is running')
+        try:
+            if self.incremental_vacuum_enabled():
+                return {'converted': False, 'seconds': 0.0}
+            started = time.monotonic()
+            raw = db.engine.raw_connection()
+            try:
+                raw.driver_connection.executescript('PRAGMA main.auto_vacuum = INCREMENTAL; VACUUM main;')
+            finally:
+                raw.close()
+            return {'converted': True, 'seconds': round(time.monotonic() - started, 3)}
+        finally:
+            self._run_lock.release()
+
+    def _incremental_vacuum(self) -> int:
+        """Release free pages in small steps so writers aren't held up; returns pages released"""
+        raw = db.engine.raw_connection()
+        released = 0
+        try:
+            conn = raw.driver_connection
+            while True:
+                free = conn.execute('PRAGMA main.freelist_count').fetchone()[0]
+                if not free:
+                    break
+                # executescript steps the pragma to completion (execute() frees a single page)
+                conn.executescript(f'PRAGMA main.incremental_vacuum({self.vacuum_step})')
+                released += min(free, self.vacuum_step)
+                time.sleep(self.pause)
+        finally:
+            raw.close()
+        return released
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.run()
+            except Exception as e:
+                print(f"Error archiving old articles: {e}")
+            time.sleep(self.interval)
+
+
+retention_service = RetentionService(
+    RetentionPolicy.from_env(),
+    archive_path=os.getenv('ARCHIVE_DB_PATH') or None,
+    interval=float(os.getenv('RETENTION_INTERVAL_SECONDS', '3600'))
+)
@@ -0,0 +1,193 @@
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+import os
+import re
+import string
+
+import numpy as np
+
+NEGATIONS = ('no', 'not', "n't", 'never')
+
+# Polarity thresholds shared with the TextBlob path in NewsAIAnalyzer
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+_CONTRACTION = re.compile(r"n't\b")
+_TOKEN = re.compile(r"n't|'[a-z]+|[a-z0-9]+(?:[-'][a-z0-9]+)*|[^\w\s]")
+
+
+def default_lexicon_path() -> Optional[str]:
+    """Location of the pattern sentiment lexicon shipped with TextBlob"""
+    try:
+        import textblob
+    except ImportError:
+        return None
+    return os.path.join(os.path.dirname(textblob.__file__), 'en', 'en-sentiment.xml')
+
+
+def sentiment_label(polarity: float) -> str:
+    if polarity > POSITIVE_THRESHOLD:
+        return 'positive'
+    if polarity < NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+
+class LexiconSentimentEngine:
+    """Batch sentiment scoring over a precompiled word -> (polarity, subjectivity, intensity) table.
+
+    Uses the same lexicon and the same rules as TextBlob's pattern analyzer
+    (modifiers multiply the next word's scores, negation flips and halves
+    polarity, "!" boosts the previous assessment), but applies them with
+    array operations over all tokens of a batch at once instead of walking
+    each text in Python. Modifiers and negations only reach across one
+    short word ("not a good"), so long modifier chains can score slightly
+    differently from TextBlob.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        words = self._load(path)
+
+        # Id 0 is reserved for unknown tokens. Single characters and punctuation
+        # get ids too, so the "short word" gap rule can see them.
+        extra = [w for w in NEGATIONS + tuple(string.ascii_lowercase + string.digits + string.punctuation)
+                 if w not in words]
+        self.vocab: Dict[str, int] = {word: i for i, word in enumerate(list(words) + extra, start=1)}
+
+        size = len(self.vocab) + 1
+        self.polarity = np.zeros(size, dtype=np.float64)
+        self.subjectivity = np.zeros(size, dtype=np.float64)
+        self.intensity = np.ones(size, dtype=np.float64)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+        self.exclamation = np.zeros(size, dtype=bool)
+        self.short = np.zeros(size, dtype=bool)
+
+        for word, token_id in self.vocab.items():
+            self.short[token_id] = len(word.strip("'")) <= 1
+            self.negation[token_id] = word in NEGATIONS
+        for word, (p, s, i, is_modifier) in words.items():
+            token_id = self.vocab[word]
+            self.polarity[token_id] = p
+            self.subjectivity[token_id] = s
+            self.intensity[token_id] = i
+            self.known[token_id] = True
+            self.modifier[token_id] = is_modifier
+        self.exclamation[self.vocab['!']] = True
+
+    @staticmethod
+    def _load(path: str) -> Dict[str, tuple]:
+        """Average scores per part of speech, then across parts of speech (as pattern does)"""
+        senses: Dict[str, Dict[str, list]] = {}
+        for element in ElementTree.parse(path).getroot().iter('word'):
+            form = element.get('form')
+            if not form or ' ' in form:
+                continue
+            senses.setdefault(form.lower(), {}).setdefault(element.get('pos'), []).append((
+                float(element.get('polarity', 0.0)),
+                float(element.get('subjectivity', 0.0)),
+                float(element.get('intensity', 1.0))
+            ))
+
+        words = {}
+        adverbs = {}
+        for form, by_pos in senses.items():
+            per_pos = {pos: np.mean(scores, axis=0) for pos, scores in by_pos.items()}
+            p, s, i = np.mean(list(per_pos.values()), axis=0)
+            words[form] = (p, s, i, 'RB' in by_pos)
+            # Like TextBlob, score "terribly" as the adverb of "terrible"
+            if 'JJ' in per_pos:
+                stem = form[:-1] + 'i' if form.endswith('y') else form
+                stem = stem[:-2] if stem.endswith('le') else stem
+                adverbs[stem + 'ly'] = (*per_pos['JJ'], True)
+        words.update(adverbs)
+        return words
+
+    def tokenize(self, text: str) -> np.ndarray:
+        tokens = _TOKEN.findall(_CONTRACTION.sub(" n't", (text or '').lower()))
+        vocab = self.vocab
+        return np.fromiter((vocab.get(t, 0) for t in tokens), dtype=np.int32, count=len(tokens))
+
+    def score(self, text: str) -> Dict[str, object]:
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: List[str]) -> List[Dict[str, object]]:
+        """Score many texts in one vectorized pass. Returns {sentiment, polarity, subjectivity} dicts"""
+        if not texts:
+            return []
+
+        token_ids = [self.tokenize(text) for text in texts]
+        lengths = np.fromiter((len(ids) for ids in token_ids), dtype=np.int64, count=len(token_ids))
+        polarity, subjectivity = self._score_tokens(
+            np.concatenate(token_ids) if lengths.sum() else np.zeros(0, dtype=np.int32),
+            np.repeat(np.arange(len(texts)), lengths),
+            len(texts)
+        )
+
+        return [
+            {'sentiment': sentiment_label(p), 'polarity': float(p), 'subjectivity': float(s)}
+            for p, s in zip(polarity.tolist(), subjectivity.tolist())
+        ]
+
+    def _score_tokens(self, ids: np.ndarray, doc: np.ndarray, n_docs: int):
+        n = len(ids)
+        if n == 0:
+            return np.zeros(n_docs), np.zeros(n_docs)
+
+        known = self.known[ids]
+        short = self.short[ids]
+        is_modifier = self.modifier[ids] & known
+        is_negation = self.negation[ids]
+
+        # Index of the word governing each token: the previous token, or the
+        # one before it when the gap is a short unknown word ("not a good")
+        index = np.arange(n)
+        prev = index - 1
+        prev2 = index - 2
+        prev[1:][doc[1:] != doc[:-1]] = -1
+        prev[:1] = -1
+        prev2[2:][doc[2:] != doc[:-2]] = -1
+        prev2[:2] = -1
+        gap_is_small = (prev >= 0) & ~known[prev] & short[prev]
+
+        # Modifiers ("very good", "really not bad"): merged into the next known word
+        gap_for_modifier = gap_is_small | ((prev >= 0) & is_negation[prev])
+        mod_src = np.where(is_modifier[prev] & (prev >= 0), prev,
+                           np.where(gap_for_modifier & (prev2 >= 0) & is_modifier[prev2], prev2, -1))
+        modified = known & (mod_src >= 0)
+        absorbed = np.zeros(n, dtype=bool)
+        absorbed[mod_src[modified]] = True
+        assessed = known & ~absorbed
+
+        # Negation ("not good", "not a good")
+        negated = (prev >= 0) & is_negation[prev]
+        negated |= gap_is_small & (prev2 >= 0) & is_negation[prev2]
+
+        # A negated modifier weakens instead of strengthens ("not very good"),
+        # and the negation carries over to the merged word
+        intensity = self.intensity[ids[mod_src]]
+        factor = np.where(modified, np.where(negated[mod_src], 1.0 / intensity, intensity), 1.0)
+        negated[modified] |= negated[mod_src[modified]]
+
+        polarity = np.clip(self.polarity[ids] * factor, -1.0, 1.0)
+        subjectivity = np.clip(self.subjectivity[ids] * factor, -1.0, 1.0)
+
+        # "!" boosts the most recent assessment in the same document
+        last_assessed = np.maximum.accumulate(np.where(assessed, index, -1))
+        bangs = np.flatnonzero(self.exclamation[ids])
+        targets = last_assessed[bangs]
+        targets = targets[(targets >= 0) & (doc[np.maximum(targets, 0)] == doc[bangs])]
+        boost = np.ones(n)
+        np.multiply.at(boost, targets, 1.25)
+        polarity = np.clip(polarity * boost, -1.0, 1.0)
+
+        polarity = np.where(negated, polarity * -0.5, polarity)
+
+        counts = np.bincount(doc[assessed], minlength=n_docs)
+        denominator = np.maximum(counts, 1)
+        return (
+            np.bincount(doc[assessed], weights=polarity[assessed], minlength=n_docs) / denominator,
+            np.bincount(doc[assessed], weights=subjectivity[assessed], minlength=n_docs) / denominator
+        )
@@ -0,0 +1,294 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+import re
+import threading
+
+from sqlalchemy import case, func
+
+from src.models.article import Article, db
+from src.models.news_source import NewsSource
+from src.services.article_events import (
+    article_events, ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_UPDATED, ARTICLE_DELETED
+)
+
+# (display name, aliases, reliability prior) registered on first start
+SEED_SOURCES = [
+    ('BBC News', ['BBC'], 0.9),
+    ('CNN', [], 0.9),
+    ('Reuters', [], 0.9),
+    ('Associated Press', ['AP', 'AP News'], 0.9),
+    ('The Guardian', [], 0.9),
+    ('The New York Times', ['NYTimes', 'NYT'], 0.9),
+    ('The Washington Post', [], 0.9),
+    ('NPR', [], 0.9),
+    ('PBS', ['PBS NewsHour'], 0.9),
+    ('Al Jazeera English', ['Al Jazeera'], 0.6),
+    ('TechCrunch', [], 0.6),
+    ('Ars Technica', [], 0.6),
+    ('The Verge', [], 0.6),
+    ('Wired', [], 0.6),
+]
+
+DEFAULT_PRIOR = 0.5
+RELIABLE_THRESHOLD = 0.7
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_source_key(name: str) -> str:
+    """'The Guardian', 'the-guardian' and 'THE GUARDIAN ' all become 'guardian'"""
+    words = _NON_ALNUM.sub(' ', (name or '').lower()).split()
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    return ' '.join(words)[:100]
+
+
+class SourceRecord:
+    """Immutable in-memory copy of a news_sources row"""
+
+    __slots__ = ('key', 'name', 'aliases', 'reliability_prior', 'article_count', 'fake_count',
+                 'positive_count', 'negative_count', 'neutral_count', 'reliability')
+
+    def __init__(self, key: str, name: str, aliases: List[str], reliability_prior: float,
+                 article_count: int = 0, fake_count: int = 0, positive_count: int = 0,
+                 negative_count: int = 0, neutral_count: int = 0, prior_weight: int = 20):
+        self.key = key
+        self.name = name
+        self.aliases = aliases
+        self.reliability_prior = reliability_prior
+        self.article_count = article_count
+        self.fake_count = fake_count
+        self.positive_count = positive_count
+        self.negative_count = negative_count
+        self.neutral_count = neutral_count
+        # The prior, discounted by the fake-flag rate. prior_weight pseudo-articles
+        # keep a handful of flags on a new source from swinging it too far.
+        self.reliability = reliability_prior * (1 - fake_count / (article_count + prior_weight))
+
+    @classmethod
+    def from_row(cls, row: NewsSource, prior_weight: int) -> 'SourceRecord':
+        return cls(row.key, row.name, row.alias_list(), row.reliability_prior, row.article_count,
+                   row.fake_count, row.positive_count, row.negative_count, row.neutral_count,
+                   prior_weight)
+
+    def to_dict(self) -> Dict:
+        analyzed = self.positive_count + self.negative_count + self.neutral_count
+        return {
+            'key': self.key,
+            'name': self.name,
+            'aliases': self.aliases,
+            'reliability_prior': self.reliability_prior,
+            'reliability': round(self.reliability, 4),
+            'article_count': self.article_count,
+            'fake_rate': round(self.fake_count / self.article_count, 4) if self.article_count else 0.0,
+            'sentiment_mix': {
+                'positive': round(self.positive_count / analyzed, 4) if analyzed else 0.0,
+                'negative': round(self.negative_count / analyzed, 4) if analyzed else 0.0,
+                'neutral': round(self.neutral_count / analyzed, 4) if analyzed else 0.0
+            }
+        }
+
+
+class SourceRegistry:
+    """Source reputation lookups from an in-memory map over the news_sources table.
+
+    Lookups are dict hits on the normalized name or an alias, falling back
+    to the longest matching leading words ("BBC Health" -> "bbc"), and are
+    memoized per raw source string. Article events mark their sources
+    dirty; a background worker then recomputes those sources' article,
+    fake-flag and sentiment counts in SQL, writes them to the table
+    (registering sources it hasn't seen) and swaps in a fresh map.
+    """
+
+    def __init__(self, refresh_interval: float = 5.0, prior_weight: int = 20,
+                 reliable_threshold: float = RELIABLE_THRESHOLD):
+        self.refresh_interval = refresh_interval
+        self.prior_weight = prior_weight
+        self.reliable_threshold = reliable_threshold
+
+        self.app = None
+        self._records: Dict[str, SourceRecord] = {}
+        self._index: Dict[str, SourceRecord] = {}
+        self._resolved: Dict[str, Optional[SourceRecord]] = {}
+        # Raw Article.source spellings seen for each key
+        self._raw_names: Dict[str, Set[str]] = {}
+
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.stats = {'refreshes': 0, 'last_refresh_at': None}
+
+        # Usable without a database (e.g. before init_app)
+        self._install([
+            SourceRecord(normalize_source_key(name), name,
+                         [normalize_source_key(alias) for alias in aliases], prior,
+                         prior_weight=prior_weight)
+            for name, aliases, prior in SEED_SOURCES
+        ])
+
+    def init_app(self, app):
+        """Seed the table, compute stats for all stored articles and start the refresher"""
+        self.app = app
+        with app.app_context():
+            self._seed()
+            self.refresh()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='source-registry', daemon=True)
+            self._thread.start()
+
+    def lookup(self, source: str) -> Optional[SourceRecord]:
+        try:
+            return self._resolved[source]
+        except KeyError:
+            pass
+
+        index = self._index
+        words = normalize_source_key(source).split()
+        record = None
+        for end in range(len(words), 0, -1):
+            record = index.get(' '.join(words[:end]))
+            if record is not None:
+                break
+
+        resolved = self._resolved
+        if len(resolved) >= 50_000:
+            resolved.clear()
+        resolved[source] = record
+        return record
+
+    def reliability(self, source: str) -> float:
+        record = self.lookup(source)
+        return record.reliability if record is not None else DEFAULT_PRIOR
+
+    def is_reliable(self, source: str) -> bool:
+        return self.reliability(source) >= self.reliable_threshold
+
+    def sources(self) -> List[SourceRecord]:
+        """All registered sources, most articles first"""
+        return sorted(self._records.values(), key=lambda r: (-r.article_count, r.name.lower()))
+
+    def mark_articles(self, articles: Iterable[Article]):
+        """Event callback: queue a stats refresh for these articles' sources"""
+        if self.app is None:
+            return
+        with self._dirty_lock:
+            self._dirty.update(article.source for article in articles if article.source)
+        self._wakeup.set()
+
+    def refresh(self, raw_names: Optional[Set[str]] = None):
+        """Recompute stats for the sources behind ``raw_names`` (all sources if None) and reload"""
+        if raw_names is not None:
+            keys = {self._key_for(name) for name in raw_names}
+            raw_names = set(raw_names)
+            for key in keys:
+                raw_names |= self._raw_names.get(key, set())
+
+        query = db.session.query(
+            Article.source,
+            func.count(Article.id),
+            func.sum(case((Article.is_fake.is_(True), 1), else_=0)),
+            func.sum(case((Article.sentiment == 'positive', 1), else_=0)),
+            func.sum(case((Article.sentiment == 'negative', 1), else_=0)),
+            func.sum(case((Article.sentiment == 'neutral', 1), else_=0))
+        )
+        if raw_names is not None:
+            query = query.filter(Article.source.in_(raw_names))
+        rows = query.group_by(Article.source).all()
+
+        totals: Dict[str, List[int]] = {key: [0, 0, 0, 0, 0] for key in keys} if raw_names is not None else {}
+        names: Dict[str, str] = {}
+        for source, *counts in rows:
+            key = self._key_for(source)
+            if not key:
+                continue
+            self._raw_names.setdefault(key, set()).add(source)
+            names.setdefault(key, source)
+            total = totals.setdefault(key, [0, 0, 0, 0, 0])
+            for i, count in enumerate(counts):
+                total[i] += count or 0
+        if raw_names is None:
+            # Sources whose articles are all gone
+            for key in self._records:
+                totals.setdefault(key, [0, 0, 0, 0, 0])
+        totals.pop('', None)
+
+        existing = {}
+        keys = list(totals)
+        for start in range(0, len(keys), 500):
+            for row in NewsSource.query.filter(NewsSource.key.in_(keys[start:start + 500])):
+                existing[row.key] = row
+
+        now = datetime.utcnow()
+        for key, (article_count, fake_count, positive, negative, neutral) in totals.items():
+            row = existing.get(key)
+            if row is None:
+                if not article_count:
+                    continue
+                row = NewsSource(key=key, name=names[key][:100], reliability_prior=DEFAULT_PRIOR)
+                db.session.add(row)
+            row.article_count = article_count
+            row.fake_count = fake_count
+            row.positive_count = positive
+            row.negative_count = negative
+            row.neutral_count = neutral
+            row.stats_updated_at = now
+        db.session.commit()
+
+        self._load()
+        self.stats['refreshes'] += 1
+        self.stats['last_refresh_at'] = now.isoformat()
+
+    def _key_for(self, source: str) -> str:
+        record = self.lookup(source)
+        return record.key if record is not None else normalize_source_key(source)
+
+    def _seed(self):
+        known = {row[0] for row in db.session.query(NewsSource.key)}
+        for name, aliases, prior in SEED_SOURCES:
+            key = normalize_source_key(name)
+            if key not in known:
+                db.session.add(NewsSource(
+                    key=key,
+                    name=name,
+                    aliases=','.join(normalize_source_key(alias) for alias in aliases),
+                    reliability_prior=prior
+                ))
+        db.session.commit()
+
+    def _load(self):
+        self._install([SourceRecord.from_row(row, self.prior_weight) for row in NewsSource.query.all()])
+
+    def _install(self, records: List[SourceRecord]):
+        index = {}
+        for record in records:
+            for alias in record.aliases:
+                index.setdefault(alias, record)
+        # Canonical keys win over aliases
+        for record in records:
+            index[record.key] = record
+        # Swap whole dicts so concurrent readers never see a half-built map
+        self._records = {record.key: record for record in records}
+        self._index = index
+        self._resolved = {}
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Let a burst of events (an ingestion batch) collect first
+            self._wakeup.clear()
+            self._wakeup.wait(self.refresh_interval)
+            with self._dirty_lock:
+                raw_names, self._dirty = self._dirty, set()
+            if not raw_names:
+                continue
+            try:
+                with self.app.app_context():
+                    self.refresh(raw_names)
+            except Exception as e:
+                print(f"Error refreshing source stats: {e}")
+
+
+source_registry = SourceRegistry()
+for event_type in (ARTICLE_CREATED, ARTICLE_ANALYZED, ARTICLE_UPDATED, ARTICLE_DELETED):
+    article_events.subscribe(event_type, source_registry.mark_articles)
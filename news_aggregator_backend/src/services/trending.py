@@ -0,0 +1,151 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import threading
+import time
+
+from src.models.article import Article, db
+from src.services.ai_analyzer import NewsAIAnalyzer
+
+# Headline filler that survives the stopword list but never makes a useful topic
+HEADLINE_STOPWORDS = {'news', 'says', 'said', 'new', 'update', 'live', 'latest', 'report', 'video', 'watch'}
+
+
+class TrendingService:
+    """Trending headline terms, refreshed in the background (stale-while-revalidate).
+
+    Readers always get the last good snapshot immediately. A snapshot older
+    than ``refresh_interval`` triggers one background refresh; if the
+    upstream call fails or comes back empty, the previous snapshot keeps
+    being served. Before the first successful upstream call, topics are
+    built from recently stored headlines.
+    """
+
+    def __init__(self, fetcher, analyzer: NewsAIAnalyzer = None, refresh_interval: float = 900.0,
+                 retry_interval: float = 60.0, top_n: int = 20, recent_hours: int = 48,
+                 query: str = 'trending'):
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.top_n = top_n
+        self.recent_hours = recent_hours
+        self.query = query
+
+        self.app = None
+        self._snapshot: Optional[Dict] = None
+        self._refreshed_at = 0.0
+        self._attempted_at = None
+        self._refreshing = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.last_error = None
+
+    def init_app(self, app):
+        """Bind to the Flask app and start the periodic refresher"""
+        self.app = app
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='trending-refresher', daemon=True)
+            self._thread.start()
+
+    def get(self) -> Dict:
+        """Return the current snapshot without waiting on the upstream API"""
+        age = time.monotonic() - self._refreshed_at
+        if self._snapshot is None or age >= self.refresh_interval:
+            self.refresh_async()
+
+        snapshot = self._snapshot or {'topics': [], 'source': None, 'generated_at': None}
+        return {
+            **snapshot,
+            'stale': self._snapshot is None or age >= self.refresh_interval,
+            'last_error': self.last_error
+        }
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running"""
+        if self.app is None or self._refreshing.locked():
+            return
+        # Don't hammer a failing upstream on every page view
+        if self._attempted_at is not None and time.monotonic() - self._attempted_at < self.retry_interval:
+            return
+        threading.Thread(target=self.refresh, name='trending-refresh', daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Rebuild the snapshot. Returns False if another refresh is running or nothing was built"""
+        if not self._refreshing.acquire(blocking=False):
+            return False
+        self._attempted_at = time.monotonic()
+        try:
+            if self.analyzer is None:
+                self.analyzer = NewsAIAnalyzer()
+
+            source = 'google_news'
+            titles = [a['title'] for a in self.fetcher.fetch_from_serpapi_google_news(self.query) if a.get('title')]
+            if not titles:
+                # Keep a real upstream snapshot; otherwise fall back to our own headlines
+                if self._snapshot is not None and self._snapshot['source'] == 'google_news':
+                    self.last_error = 'Upstream returned no headlines; serving previous snapshot'
+                    return False
+                source = 'stored_articles'
+                titles = self._recent_titles()
+
+            topics = self.rank_topics(titles)
+            if not topics:
+                return False
+
+            self._snapshot = {
+                'topics': topics,
+                'source': source,
+                'generated_at': datetime.utcnow().isoformat()
+            }
+            self._refreshed_at = time.monotonic()
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Error refreshing trending topics: {e}")
+            return False
+        finally:
+            self._refreshing.release()
+
+    def rank_topics(self, titles: List[str]) -> List[Dict]:
+        """Rank stems by how many headlines mention them, shown in their most common spelling"""
+        headline_counts = Counter()
+        spellings = defaultdict(Counter)
+
+        for title in titles:
+            seen = set()
+            for word, stem in self.analyzer.extract_term_pairs(title):
+                if word.lower() in HEADLINE_STOPWORDS:
+                    continue
+                spellings[stem][word] += 1
+                if stem not in seen:
+                    seen.add(stem)
+                    headline_counts[stem] += 1
+
+        # Ties break alphabetically so the order is stable between refreshes
+        ranked = sorted(headline_counts.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {'topic': self._display_form(spellings[stem]), 'count': count}
+            for stem, count in ranked[:self.top_n]
+        ]
+
+    def _display_form(self, spellings: Counter) -> str:
+        return min(spellings.items(), key=lambda item: (-item[1], item[0]))[0]
+
+    def _recent_titles(self) -> List[str]:
+        cutoff = datetime.utcnow() - timedelta(hours=self.recent_hours)
+        with self.app.app_context():
+            rows = db.session.query(Article.title).filter(
+                Article.published_date >= cutoff
+            ).order_by(Article.published_date.desc()).limit(500).all()
+            if not rows:
+                rows = db.session.query(Article.title).order_by(
+                    Article.published_date.desc()
+                ).limit(500).all()
+        return [row[0] for row in rows]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.refresh_interval)